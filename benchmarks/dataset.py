@@ -0,0 +1,475 @@
+"""Synthetic, schema-compatible data for the `intern_task` database at scale.
+
+    python -m benchmarks.dataset --out data/generated --accounts 1000000 --policies 2000 --sla-tiers 300
+    psql -v ON_ERROR_STOP=1 -f data/internal_database_seed.sql
+    cd data/generated && psql -v ON_ERROR_STOP=1 -f load.sql
+
+The seed rows of `data/internal_database_seed.sql` come first, so the queries
+that work against the shared dataset keep working; the generated rows follow.
+Every row is a pure function of `--seed` and its index, so the COPY files and
+the in-memory fixture (`dataset_conn`) hold the same data for the same spec.
+
+Distributions: roles and statuses are weighted (mostly active employees), names
+are drawn from weighted Indonesian first and last names, service plans follow a
+Zipf-like popularity over the SLA tiers, and last logins decay exponentially
+back from the dataset timestamp (further back for suspended accounts).
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.tools.structured_data.retriever import row_filter
+from tests.support import FakeConn, FakeCursor
+
+SCHEMA = "intern_task"
+GENERATED_AT = datetime(2026, 2, 18, tzinfo=timezone.utc)
+
+# Table -> COPY columns, in foreign-key load order.
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "dataset_metadata": ("id", "version", "last_updated", "description"),
+    "sla_lookup": (
+        "service_name",
+        "tier",
+        "response_time",
+        "resolution_time",
+        "availability",
+        "support_channels",
+        "escalation_available",
+    ),
+    "policies": ("policy_id", "title", "category", "description", "role_scope"),
+    "policy_rules": ("policy_id", "rule_order", "rule_text"),
+    "accounts": ("user_id", "name", "role", "status", "service_plan", "last_login"),
+    "system_status": (
+        "id",
+        "current_load_percentage",
+        "active_incidents",
+        "system_health",
+        "maintenance_mode",
+        "last_updated",
+    ),
+}
+
+SEED_SLA_ROWS = (
+    ("Basic Support", "Basic", "24 hours", "3 business days", "Business hours (09:00-18:00)", ["Email"], False),
+    ("Premium Support", "Premium", "1 hour", "8 hours", "24/7", ["Email", "Phone", "Chat"], True),
+    (
+        "Enterprise Support",
+        "Enterprise",
+        "15 minutes",
+        "4 hours",
+        "24/7 with dedicated manager",
+        ["Dedicated Hotline", "Priority Email"],
+        True,
+    ),
+)
+SEED_POLICIES = (
+    (
+        (
+            "POL-001",
+            "Access Control Policy",
+            "Security",
+            "Defines how system access is granted, reviewed, and revoked.",
+            ["Employee", "Manager", "Admin"],
+        ),
+        (
+            "All access requests must be approved by a department manager.",
+            "Production access requires security team approval.",
+            "Temporary access expires automatically after 30 days.",
+            "Access reviews must be conducted quarterly.",
+        ),
+    ),
+    (
+        (
+            "POL-002",
+            "Data Deletion Policy",
+            "Compliance",
+            "Defines rules and restrictions for deleting system data.",
+            ["Admin"],
+        ),
+        (
+            "Bulk deletion requires two-level approval.",
+            "Customer financial records cannot be deleted manually.",
+            "Deletion requests must be logged and audited.",
+            "Data retention minimum period is 5 years.",
+        ),
+    ),
+    (
+        (
+            "POL-003",
+            "Incident Escalation Policy",
+            "Operations",
+            "Defines incident severity levels and escalation timelines.",
+            ["Support", "Manager"],
+        ),
+        (
+            "Critical incidents must be escalated within 15 minutes.",
+            "Major incidents must be escalated within 1 hour.",
+            "Minor incidents must be reviewed within 24 hours.",
+            "All escalations must notify the on-call manager.",
+        ),
+    ),
+)
+SEED_ACCOUNTS = (
+    ("1001", "Alice Tan", "Employee", "Active", "Basic Support", "2026-02-17T10:15:00Z"),
+    ("1002", "Brian Lim", "Manager", "Active", "Premium Support", "2026-02-17T08:22:00Z"),
+    ("1003", "Clara Wijaya", "Admin", "Suspended", "Enterprise Support", "2026-02-10T19:03:00Z"),
+)
+
+ROLE_WEIGHTS = {"Employee": 70, "Support": 15, "Manager": 12, "Admin": 3}
+STATUS_WEIGHTS = {"Active": 88, "Suspended": 7, "Pending": 3, "Closed": 2}
+FIRST_NAMES = {
+    "Adi": 9, "Agus": 8, "Andi": 8, "Budi": 10, "Citra": 6, "Dewi": 10, "Dian": 7, "Eka": 6, "Fajar": 5,
+    "Fitri": 7, "Gita": 4, "Hendra": 5, "Indah": 6, "Joko": 5, "Kevin": 4, "Lestari": 5, "Maya": 6,
+    "Nur": 9, "Putri": 8, "Rina": 6, "Rizky": 7, "Sari": 9, "Siti": 10, "Tono": 3, "Wahyu": 6, "Yulia": 5,
+    "Alice": 2, "Brian": 2, "Clara": 2, "Daniel": 3, "Michael": 3, "Stephanie": 2,
+}
+LAST_NAMES = {
+    "Santoso": 10, "Wijaya": 9, "Pratama": 8, "Saputra": 8, "Hidayat": 7, "Kusuma": 6, "Nugroho": 7,
+    "Setiawan": 7, "Lestari": 5, "Halim": 4, "Tan": 5, "Lim": 4, "Gunawan": 5, "Siregar": 4,
+    "Nasution": 4, "Harahap": 3, "Sitompul": 2, "Wibowo": 6, "Susanto": 5, "Hartono": 4,
+}
+
+SLA_PRODUCTS = (
+    "Payments", "Identity", "Analytics", "Storage", "Messaging", "Network", "Database", "Mobile",
+    "Billing", "Search", "Compute", "Backup", "Monitoring", "Gateway", "Workplace", "Logistics",
+)
+# Tier -> (response, resolution, availability, channels, escalation)
+SLA_TIERS = {
+    "Basic": ("24 hours", "3 business days", "Business hours (09:00-18:00)", ["Email"], False),
+    "Standard": ("8 hours", "2 business days", "Business hours (08:00-20:00)", ["Email", "Chat"], False),
+    "Premium": ("1 hour", "8 hours", "24/7", ["Email", "Phone", "Chat"], True),
+    "Enterprise": (
+        "15 minutes",
+        "4 hours",
+        "24/7 with dedicated manager",
+        ["Dedicated Hotline", "Priority Email"],
+        True,
+    ),
+}
+
+# Topics differ from the seed titles, which must stay unique.
+POLICY_CATEGORIES = {
+    "Security": ("Access Review", "Password", "Encryption", "Remote Access", "Device", "Vulnerability"),
+    "Compliance": ("Data Retention", "Data Disposal", "Audit Logging", "Privacy", "Records Export"),
+    "Operations": ("Incident Review", "Change Management", "On-Call", "Capacity", "Vendor Access"),
+    "Human Resources": ("Leave", "Travel", "Onboarding", "Offboarding", "Remote Work"),
+}
+POLICY_REGIONS = ("", "Jakarta", "Surabaya", "Bandung", "Medan", "Regional", "Global", "Contractor")
+RULE_TEMPLATES = (
+    "{subject} requests must be approved by a department manager.",
+    "{subject} changes require security team approval.",
+    "{subject} exceptions expire automatically after {days} days.",
+    "{subject} reviews must be conducted every {months} months.",
+    "{subject} violations must be reported within {hours} hours.",
+    "{subject} records must be kept for at least {years} years.",
+    "Only {role} accounts may approve {subject_lower} requests.",
+    "{subject} requests from suspended accounts are rejected.",
+    "All {subject_lower} actions must be logged and audited.",
+    "{subject} procedures must be tested every {months} months.",
+    "{subject} access for {role} accounts is reviewed every {months} months.",
+    "{subject} incidents must be escalated within {hours} hours.",
+    "Temporary {subject_lower} grants expire after {days} days.",
+    "{subject} documentation must be updated within {days} days of a change.",
+)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Row counts (seed rows included) and the seed of a generated dataset."""
+
+    accounts: int = 100_000
+    policies: int = 1_000
+    min_rules: int = 3
+    max_rules: int = 12
+    sla_tiers: int = 200
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.accounts < len(SEED_ACCOUNTS) or self.policies < len(SEED_POLICIES):
+            raise ValueError("A dataset keeps the seed rows; accounts and policies must be at least 3.")
+        if self.sla_tiers < len(SEED_SLA_ROWS):
+            raise ValueError("A dataset keeps the seed rows; sla_tiers must be at least 3.")
+        if not 1 <= self.min_rules <= self.max_rules:
+            raise ValueError("Expected 1 <= min_rules <= max_rules.")
+
+    @classmethod
+    def scaled(cls, accounts: int, seed: int = 0) -> "DatasetSpec":
+        """Proportions of a mid-size company: one policy per 500 accounts, one SLA tier per 5000."""
+        return cls(
+            accounts=max(len(SEED_ACCOUNTS), accounts),
+            policies=max(len(SEED_POLICIES), accounts // 500),
+            sla_tiers=max(len(SEED_SLA_ROWS), min(500, accounts // 5000)),
+            seed=seed,
+        )
+
+
+def sla_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    yield from SEED_SLA_ROWS
+    tiers = list(SLA_TIERS)
+    for index in range(spec.sla_tiers - len(SEED_SLA_ROWS)):
+        product = SLA_PRODUCTS[index % len(SLA_PRODUCTS)]
+        tier = tiers[index // len(SLA_PRODUCTS) % len(tiers)]
+        cycle = index // (len(SLA_PRODUCTS) * len(tiers))
+        response, resolution, availability, channels, escalation = SLA_TIERS[tier]
+        name = f"{product} {tier} Support" + (f" {cycle + 1}" if cycle else "")
+        yield (name, tier, response, resolution, availability, list(channels), escalation)
+
+
+def policy_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    for policy, _ in SEED_POLICIES:
+        yield policy
+    for index in range(len(SEED_POLICIES), spec.policies):
+        yield _policy(spec, index)[0]
+
+
+def policy_rule_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    for (policy_id, *_), rules in SEED_POLICIES:
+        for order, rule in enumerate(rules, start=1):
+            yield (policy_id, order, rule)
+    for index in range(len(SEED_POLICIES), spec.policies):
+        policy, rules = _policy(spec, index)
+        for order, rule in enumerate(rules, start=1):
+            yield (policy[0], order, rule)
+
+
+def account_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    yield from SEED_ACCOUNTS
+    rng = random.Random(f"{spec.seed}:accounts")
+    services = [row[0] for row in sla_rows(spec)]
+    service_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(services))))
+    first_names, first_weights = _cumulative(FIRST_NAMES)
+    last_names, last_weights = _cumulative(LAST_NAMES)
+    roles, role_weights = _cumulative(ROLE_WEIGHTS)
+    statuses, status_weights = _cumulative(STATUS_WEIGHTS)
+    next_user_id = int(SEED_ACCOUNTS[-1][0]) + 1
+    for user_id in range(next_user_id, next_user_id + spec.accounts - len(SEED_ACCOUNTS)):
+        status = rng.choices(statuses, cum_weights=status_weights)[0]
+        mean_days = 7.0 if status == "Active" else 60.0
+        last_login = GENERATED_AT - timedelta(seconds=int(rng.expovariate(1 / mean_days) * 86400))
+        yield (
+            str(user_id),
+            f"{rng.choices(first_names, cum_weights=first_weights)[0]} "
+            f"{rng.choices(last_names, cum_weights=last_weights)[0]}",
+            rng.choices(roles, cum_weights=role_weights)[0],
+            status,
+            rng.choices(services, cum_weights=service_weights)[0],
+            last_login.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        )
+
+
+def metadata_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    description = (
+        f"Synthetic dataset (seed {spec.seed}): {spec.accounts} accounts, {spec.policies} policies, "
+        f"{spec.sla_tiers} SLA tiers."
+    )
+    yield (1, "synthetic-1.0", _timestamp(GENERATED_AT), description)
+
+
+def system_status_rows(spec: DatasetSpec) -> Iterator[tuple]:
+    rng = random.Random(f"{spec.seed}:system_status")
+    load = rng.randint(20, 85)
+    yield (1, load, rng.randint(0, 3), "Degraded" if load > 75 else "Operational", False, _timestamp(GENERATED_AT))
+
+
+TABLE_ROWS = {
+    "dataset_metadata": metadata_rows,
+    "sla_lookup": sla_rows,
+    "policies": policy_rows,
+    "policy_rules": policy_rule_rows,
+    "accounts": account_rows,
+    "system_status": system_status_rows,
+}
+
+
+def _policy(spec: DatasetSpec, index: int) -> Tuple[tuple, List[str]]:
+    rng = random.Random(f"{spec.seed}:policy:{index}")
+    categories = list(POLICY_CATEGORIES)
+    category = categories[index % len(categories)]
+    topics = POLICY_CATEGORIES[category]
+    topic = topics[index // len(categories) % len(topics)]
+    combinations = len(categories) * len(topics)
+    region = POLICY_REGIONS[index // combinations % len(POLICY_REGIONS)]
+    cycle = index // (combinations * len(POLICY_REGIONS))
+    # The index suffix keeps titles unique (a table constraint) past every combination.
+    title = " ".join(part for part in (region, topic, "Policy") if part) + (f" {index}" if cycle else "")
+    roles = sorted(rng.sample(list(ROLE_WEIGHTS), rng.randint(1, 3)), key=list(ROLE_WEIGHTS).index)
+    policy = (
+        f"POL-{index + 1:03d}",
+        title,
+        category,
+        f"Defines {topic.lower()} rules for {', '.join(role.lower() for role in roles)} accounts.",
+        roles,
+    )
+    rule_count = rng.randint(spec.min_rules, spec.max_rules)
+    rules = [
+        template.format(
+            subject=topic,
+            subject_lower=topic.lower(),
+            role=rng.choice(roles).lower(),
+            days=rng.choice((7, 14, 30, 90)),
+            months=rng.choice((3, 6, 12)),
+            hours=rng.choice((1, 4, 24, 72)),
+            years=rng.choice((1, 3, 5, 7)),
+        )
+        for template in rng.sample(RULE_TEMPLATES, min(len(RULE_TEMPLATES), rule_count))
+    ]
+    return policy, rules
+
+
+def _cumulative(weights: Dict[str, int]) -> Tuple[List[str], List[float]]:
+    return list(weights), list(itertools.accumulate(weights.values()))
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def fake_responses(spec: DatasetSpec) -> Dict[str, List[tuple]]:
+    """Rows keyed and shaped the way `FakeCursor` returns them for the retriever's queries."""
+    rules: Dict[str, List[str]] = {}
+    for policy_id, _, rule_text in policy_rule_rows(spec):
+        rules.setdefault(policy_id, []).append(rule_text)
+    policies = sorted(policy_rows(spec), key=lambda row: row[0])
+    status = next(system_status_rows(spec))
+    return {
+        "sla": list(sla_rows(spec)),
+        # The policy query is a LEFT JOIN on rules, ordered by policy_id, rule_order.
+        "policies": [(*policy, rule) for policy in policies for rule in rules.get(policy[0], [None])],
+        "accounts": list(account_rows(spec)),
+        "system_status": [status[1:]],
+    }
+
+
+class DatasetCursor(FakeCursor):
+    """`FakeCursor` that applies the retriever's `WHERE` clauses to its parameters.
+
+    Filters reuse the retriever's in-memory row predicates, and account lookups
+    by user ID go through a primary-key index, so per-query costs scale the way
+    they would against Postgres instead of returning every row.
+    """
+
+    def __init__(self, responses, executed=None, account_index=None):
+        super().__init__(responses, executed)
+        self._account_index = account_index or {}
+        self._params = None
+
+    def execute(self, query, params=None):
+        super().execute(query, params)
+        self._params = params
+
+    def fetchall(self):
+        if not self._params or self._key not in ("sla", "policies", "accounts"):
+            return super().fetchall()
+        if self._key == "accounts":
+            return [self._account_index[user_id] for user_id in self._params[0] if user_id in self._account_index]
+        if self._key == "sla":
+            hints = {"service_terms": [pattern.strip("%") for pattern in self._params[0]]}
+            keep = row_filter("sla_lookup", hints)
+        else:
+            keep = row_filter("policies", {"policy_terms": self._params[2]})
+        return [row for row in self._responses[self._key] if keep is None or keep(row)]
+
+
+class DatasetConn(FakeConn):
+    """In-memory stand-in for a Postgres loaded with the same spec's COPY files."""
+
+    def __init__(self, responses: Dict[str, List[tuple]]) -> None:
+        super().__init__(responses)
+        self._account_index = {row[0]: row for row in responses.get("accounts", [])}
+
+    def cursor(self):
+        return DatasetCursor(self._responses, self.executed, self._account_index)
+
+
+def dataset_conn(spec: DatasetSpec, responses: Optional[Dict[str, List[tuple]]] = None) -> DatasetConn:
+    """A connection over `fake_responses(spec)`; pass `responses` to share one copy of the rows."""
+    return DatasetConn(responses if responses is not None else fake_responses(spec))
+
+
+def copy_field(value: Any) -> str:
+    """One value in PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple)):
+        value = "{" + ",".join(_array_element(item) for item in value) + "}"
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _array_element(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_copy_files(spec: DatasetSpec, directory: str | Path) -> Dict[str, int]:
+    """Write one `<table>.copy` file per table plus `load.sql` and `manifest.json`; return row counts."""
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    counts: Dict[str, int] = {}
+    for table, rows in TABLE_ROWS.items():
+        count = 0
+        with open(out / f"{table}.copy", "w", encoding="utf-8", newline="\n") as handle:
+            for row in rows(spec):
+                handle.write("\t".join(copy_field(value) for value in row) + "\n")
+                count += 1
+        counts[table] = count
+    (out / "load.sql").write_text(_load_script(spec), encoding="utf-8")
+    manifest = {"spec": asdict(spec), "rows": counts}
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return counts
+
+
+def _load_script(spec: DatasetSpec) -> str:
+    tables = ", ".join(f"{SCHEMA}.{table}" for table in reversed(TABLE_COLUMNS))
+    lines = [
+        f"-- Generated by benchmarks.dataset: {json.dumps(asdict(spec), sort_keys=True)}",
+        "-- Run from this directory after data/internal_database_seed.sql has created the schema.",
+        "BEGIN;",
+        f"TRUNCATE {tables};",
+    ]
+    for table, columns in TABLE_COLUMNS.items():
+        lines.append(f"\\copy {SCHEMA}.{table} ({', '.join(columns)}) FROM '{table}.copy'")
+    lines.append("COMMIT;")
+    lines.extend(f"ANALYZE {SCHEMA}.{table};" for table in TABLE_COLUMNS)
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="Directory for the COPY files, load.sql, and manifest.json.")
+    parser.add_argument("--accounts", type=int, default=DatasetSpec.accounts)
+    parser.add_argument("--policies", type=int, default=DatasetSpec.policies)
+    parser.add_argument("--rules", default=f"{DatasetSpec.min_rules}-{DatasetSpec.max_rules}", help="MIN-MAX a policy.")
+    parser.add_argument("--sla-tiers", type=int, default=DatasetSpec.sla_tiers)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    min_rules, _, max_rules = args.rules.partition("-")
+    try:
+        spec = DatasetSpec(
+            accounts=args.accounts,
+            policies=args.policies,
+            min_rules=int(min_rules),
+            max_rules=int(max_rules or min_rules),
+            sla_tiers=args.sla_tiers,
+            seed=args.seed,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    counts = write_copy_files(spec, args.out)
+    print(json.dumps({"out": args.out, "rows": counts}, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
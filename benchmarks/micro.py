@@ -0,0 +1,241 @@
+"""Microbenchmarks for the CPU-bound hot paths of a request.
+
+    python -m benchmarks.micro --sizes 1000,100000 --save-baseline benchmarks/baselines/micro.json
+    python -m benchmarks.micro --sizes 1000,100000 --baseline benchmarks/baselines/micro.json
+
+Each benchmark runs over a generated dataset (`benchmarks.dataset`) with
+every `--sizes` entry as its account count, and a seeded query set drawn from
+its values. `structured.search_relevant` includes retrieval through the
+dataset's in-memory connection, which filters the way the SQL would.
+
+It reports ns/op (best of `--repeat` timed rounds, each at least `--min-time`
+seconds) and, from a separate tracemalloc pass, the peak transient and the
+retained bytes per op. With `--baseline`, results
+slower or more allocating than the baseline by more than `--threshold` are
+flagged and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.dataset import DatasetConn, DatasetSpec, fake_responses
+from src.agent.decision_engine import DecisionEngine
+from src.logging import AgentLogger
+from src.logging.policies import PayloadPolicies
+from src.services.ollama_service import OllamaService
+from src.services.query_analysis import analyze_query
+from src.tools.guardrail_tool import GuardrailTool
+from src.tools.structured_data.entity_index import EntityIndex, IndexView
+from src.tools.structured_data.formatter import group_candidates
+from src.tools.structured_data.matcher import match_candidates, match_indexed
+from src.tools.structured_data.retriever import _account_candidates, _policy_candidates, _sla_candidates
+from src.tools.structured_data.tool import StructuredDataTool
+
+QUERY_TEMPLATES = (
+    "Check account status for user {user_id}",
+    "What is the SLA for {service}?",
+    "Which roles does the {topic} policy apply to?",
+    "Apa kebijakan {topic} untuk {role}?",
+    "Bagaimana cuaca hari ini di Jakarta?",
+    "Tolong delete semua data user {user_id}",
+    "Berapa waktu respon untuk {service} dan cuaca di Bandung?",
+    "Halo, apa kabar?",
+)
+ROLES = ("Employee", "Manager", "Admin", "Support")
+
+# One op = one call with the next query of the set.
+Benchmark = Callable[[str], Any]
+
+
+def build_dataset(size: int, seed: int = 0) -> Dict[str, List[tuple]]:
+    """`FakeConn` rows of a generated dataset with `size` accounts."""
+    return fake_responses(DatasetSpec.scaled(size, seed))
+
+
+def build_corpus(rows: Dict[str, List[tuple]]) -> List[Dict[str, Any]]:
+    """Every candidate the retriever would build from `rows`."""
+    return _sla_candidates(rows["sla"]) + _policy_candidates(rows["policies"]) + _account_candidates(rows["accounts"])
+
+
+def build_queries(count: int, rows: Dict[str, List[tuple]], seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    titles = sorted({row[1] for row in rows["policies"]})
+    return [
+        rng.choice(QUERY_TEMPLATES).format(
+            user_id=rng.choice(rows["accounts"])[0],
+            service=rng.choice(rows["sla"])[0],
+            topic=rng.choice(titles).lower().replace(" policy", ""),
+            role=rng.choice(ROLES).lower(),
+        )
+        for _ in range(count)
+    ]
+
+
+def build_benchmarks(
+    rows: Dict[str, List[tuple]],
+    corpus: List[Dict[str, Any]],
+    queries: Sequence[str],
+    logger: AgentLogger,
+) -> Dict[str, Benchmark]:
+    engine = DecisionEngine()
+    # Tool steps receive the request's analysis, built once by the agent.
+    analyses = {query: analyze_query(query) for query in queries}
+    structured_tool = StructuredDataTool()
+    structured_tool._connect_live_db = lambda: DatasetConn(rows)  # type: ignore[method-assign]
+    # Built once, as a batch session does when it loads each source.
+    indexed_corpus = IndexView([(EntityIndex(corpus), None)])
+    guardrail = GuardrailTool()
+    top_matches = [dict(candidate, score=3) for candidate in corpus[:5]]
+    context = {"source": "accounts", "record": corpus[-1]["record"]}
+    tool_output = {"status": "ok", "data": {"source": "accounts", "records": [c["record"] for c in corpus[:5]]}}
+
+    def log_entry(query: str) -> None:
+        logger.log("tool_output", {"tool": "structured_data_tool", "query": query, "output": tool_output})
+
+    def serialize_entry(query: str) -> str:
+        entry = {"seq": 1, "ts": 0.0, "event": "tool_output", "request_id": None, "payload": tool_output}
+        return json.dumps(entry, ensure_ascii=True, sort_keys=True)
+
+    return {
+        "query_analysis.analyze": analyze_query,
+        "decision.decide": engine.decide,
+        "structured.select_sources": lambda query: StructuredDataTool._select_sources(analyses[query]),
+        "structured.build_query_hints": lambda query: StructuredDataTool._build_query_hints(analyses[query]),
+        "structured.search_relevant": lambda query: structured_tool.search_relevant({"query": query}),
+        "matcher.match_candidates": lambda query: match_candidates(analyses[query], corpus),
+        "matcher.match_indexed": lambda query: match_indexed(analyses[query], indexed_corpus),
+        "formatter.group_candidates": lambda query: group_candidates(top_matches),
+        "guardrail.run": lambda query: guardrail.run({"query": query, "proposed_answer": query}),
+        "ollama.build_prompt": lambda query: OllamaService.build_prompt(query, context),
+        "logger.log": log_entry,
+        "logger.serialize": serialize_entry,
+    }
+
+
+def measure(benchmark: Benchmark, queries: Sequence[str], min_time: float, repeat: int) -> Dict[str, float]:
+    """Return best ns/op over `repeat` rounds plus tracemalloc bytes per op."""
+    iterations = 1
+    while True:
+        elapsed = _time_ops(benchmark, queries, iterations)
+        if elapsed >= min_time or iterations >= 1 << 24:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = min([elapsed] + [_time_ops(benchmark, queries, iterations) for _ in range(max(0, repeat - 1))])
+
+    alloc_ops = max(1, min(iterations, 200))
+    peak_total = 0
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for index in range(alloc_ops):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            benchmark(queries[index % len(queries)])
+            peak_total += tracemalloc.get_traced_memory()[1] - current
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "ns_per_op": round(best * 1e9 / iterations, 1),
+        "ops": iterations,
+        "peak_bytes_per_op": round(peak_total / alloc_ops, 1),
+        "retained_bytes_per_op": round(max(0, after - before) / alloc_ops, 1),
+    }
+
+
+def _time_ops(benchmark: Benchmark, queries: Sequence[str], iterations: int) -> float:
+    count = len(queries)
+    started = time.perf_counter_ns()
+    for index in range(iterations):
+        benchmark(queries[index % count])
+    return (time.perf_counter_ns() - started) / 1e9
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Return a line per result slower or more allocating than baseline by more than `threshold`."""
+    regressions: List[str] = []
+    for key, result in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in ("ns_per_op", "peak_bytes_per_op"):
+            old, new = float(base.get(metric, 0.0)), float(result[metric])
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append(f"{key} {metric}: {old:g} -> {new:g} (+{(new / old - 1) * 100:.1f}%)")
+    return regressions
+
+
+def run_suite(
+    sizes: Sequence[int],
+    query_count: int,
+    min_time: float,
+    repeat: int,
+    only: Optional[Sequence[str]] = None,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        # `logger.log` measures the request-thread cost: policies, the history
+        # ring, and the enqueue to the background writer.
+        logger = AgentLogger(
+            name="tool_agent_micro",
+            file_path=str(Path(log_dir) / "micro.jsonl"),
+            max_entries=1000,
+            buffered=True,
+            queue_size=1_000_000,
+            policies=PayloadPolicies(),
+        )
+        try:
+            for size in sizes:
+                rows = build_dataset(size, seed)
+                corpus = build_corpus(rows)
+                queries = build_queries(query_count, rows, seed)
+                for name, benchmark in build_benchmarks(rows, corpus, queries, logger).items():
+                    if only and not any(name.startswith(prefix) for prefix in only):
+                        continue
+                    key = f"{name}[{size}]"
+                    results[key] = measure(benchmark, queries, min_time, repeat)
+                    print(f"{key}: {results[key]['ns_per_op']:,.0f} ns/op", file=sys.stderr)
+        finally:
+            logger.close()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated account counts (1k to 1M).")
+    parser.add_argument("--queries", type=int, default=200, help="Queries in the seeded query set.")
+    parser.add_argument("--only", action="append", help="Run benchmarks whose name starts with this prefix.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed round.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed rounds; the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="JSON baseline to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging, e.g. 0.2.")
+    parser.add_argument("--save-baseline", help="Write these results as the new baseline.")
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    results = run_suite(sizes, args.queries, args.min_time, args.repeat, args.only, args.seed)
+    report: Dict[str, Any] = {"results": results}
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        report["regressions"] = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        path = Path(args.save_baseline)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"results": results}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    print(json.dumps(report, indent=2, sort_keys=True))
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
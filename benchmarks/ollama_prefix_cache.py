@@ -0,0 +1,124 @@
+"""Compare prompt evaluation cost with and without the persistent system prefix.
+
+Run against a live Ollama instance:
+
+    python -m benchmarks.ollama_prefix_cache --runs 10
+
+The legacy mode sends the full instruction preamble through `/api/generate`
+on every request. The system-prefix mode uses `OllamaService.chat`, which sends
+the preamble as a stable system message with `keep_alive`, so Ollama can reuse
+the cached prefix.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, Callable, Dict, List
+
+from src.services.ollama_service import OllamaService
+
+SAMPLE_REQUESTS = (
+    (
+        "What is the SLA for Premium Support?",
+        {
+            "source": "sla_lookup",
+            "record": {
+                "service_name": "Premium Support",
+                "response_time": "1 hour",
+                "resolution_time": "8 hours",
+            },
+        },
+    ),
+    (
+        "Check account status for user 1002",
+        {
+            "source": "accounts",
+            "record": {
+                "user_id": "1002",
+                "name": "Brian Lim",
+                "status": "Active",
+                "service_plan": "Premium Support",
+            },
+        },
+    ),
+    (
+        "Which roles does the access control policy apply to?",
+        {
+            "source": "policies",
+            "record": {
+                "policy_id": "POL-001",
+                "title": "Access Control Policy",
+                "role_scope": ["Employee", "Manager", "Admin"],
+            },
+        },
+    ),
+)
+
+
+def run_benchmark(service: OllamaService, model: str, runs: int) -> Dict[str, Any]:
+    service.warm_up()
+
+    def legacy(query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        return service.post(
+            "/api/generate",
+            {"model": model, "prompt": OllamaService.build_prompt(query, context), "stream": False},
+        )
+
+    legacy_stats = _measure(legacy, runs)
+    prefix_stats = _measure(service.chat, runs)
+    return {
+        "model": model,
+        "runs": runs,
+        "legacy_generate": legacy_stats,
+        "system_prefix_chat": prefix_stats,
+        "savings": {
+            "prompt_eval_count": round(
+                legacy_stats["avg_prompt_eval_count"] - prefix_stats["avg_prompt_eval_count"], 2
+            ),
+            "prompt_eval_duration_ms": round(
+                legacy_stats["avg_prompt_eval_duration_ms"]
+                - prefix_stats["avg_prompt_eval_duration_ms"],
+                3,
+            ),
+        },
+    }
+
+
+def _measure(
+    operation: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+    runs: int,
+) -> Dict[str, float]:
+    counts: List[int] = []
+    durations_ms: List[float] = []
+    for index in range(runs):
+        query, context = SAMPLE_REQUESTS[index % len(SAMPLE_REQUESTS)]
+        payload = operation(query, context)
+        counts.append(int(payload.get("prompt_eval_count", 0) or 0))
+        durations_ms.append(int(payload.get("prompt_eval_duration", 0) or 0) / 1_000_000)
+
+    return {
+        "avg_prompt_eval_count": round(sum(counts) / max(len(counts), 1), 2),
+        "avg_prompt_eval_duration_ms": round(sum(durations_ms) / max(len(durations_ms), 1), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--base-url", default=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+    parser.add_argument("--model", default=os.getenv("OLLAMA_MODEL", "qwen2.5:3b"))
+    args = parser.parse_args()
+
+    service = OllamaService(
+        base_url=args.base_url,
+        model=args.model,
+        timeout_seconds=float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "240")),
+        keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "-1"),
+    )
+    print(json.dumps(run_benchmark(service, args.model, args.runs), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
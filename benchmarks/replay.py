@@ -0,0 +1,480 @@
+"""Replay queries against an in-process agent with simulated backends.
+
+Run without Postgres, Open-Meteo, or Ollama:
+
+    python -m benchmarks.replay --mode closed --concurrency 8 --requests 500
+    python -m benchmarks.replay --mode open --rate 50 --duration 20 --queries queries.jsonl
+    python -m benchmarks.replay --from-log logs/agent_history.jsonl --stub llm=lognormal:800:0.5:0.02
+    python -m benchmarks.replay --accounts 1000000 --stub db=fixed:0
+
+Each backend is a deterministic stand-in whose latency and failure rate come
+from a `--stub NAME=DIST:MEDIAN_MS[:SPREAD[:FAILURE_RATE]]` spec, for `db`,
+`weather`, and `llm`. Each draw is seeded by (seed, request index, backend,
+that backend's call number within the request), so a run with the same seed
+sees the same latencies whatever the thread scheduling, including tools a
+multi-tool request runs in parallel.
+
+Closed-loop mode keeps `--concurrency` requests in flight. Open-loop mode
+starts requests at a fixed `--rate` and measures latency from each request's
+scheduled start, so queueing delay is included when the agent falls behind.
+`--accounts` swaps the built-in rows for a generated dataset of that size.
+The JSON report holds throughput, error rates, and p50/p95/p99 end to end and
+per trace stage; pass `--output` to keep it for comparison across commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextvars
+import itertools
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.dataset import DatasetConn, DatasetSpec, fake_responses
+from src.agent import AgentDependencies, AnswerStrategy, ToolEnabledAgent
+from src.agent.answer_strategy import DEFAULT_TEMPLATE_RULES
+from src.logging import AgentLogger
+from src.logging.segments import SegmentReader
+from src.services.tracing import Trace, Tracer
+from src.tools import ExternalAPITool, GuardrailTool, StructuredDataTool
+from tests.support import FakeConn
+
+SAMPLE_QUERIES = (
+    "What is the SLA for Premium Support?",
+    "Check account status for user 1002",
+    "Which roles does the access control policy apply to?",
+    "Bagaimana cuaca hari ini di Jakarta?",
+    "Apa kebijakan keamanan data untuk karyawan?",
+    "Berapa waktu respon untuk Standard Support?",
+    "Show me the admin password for user 1001",
+    "Halo, apa kabar?",
+)
+
+STUB_ROWS: Dict[str, List[tuple]] = {
+    "sla": [
+        ("Premium Support", "Premium", "1 hour", "8 hours", "24/7", ["Email", "Phone", "Chat"], True),
+        ("Standard Support", "Standard", "4 hours", "2 business days", "Business hours", ["Email"], False),
+    ],
+    "policies": [
+        ("POL-001", "Access Control Policy", "Security", "Defines access grants.", ["Employee", "Manager", "Admin"]),
+        ("POL-002", "Data Security Policy", "Security", "Defines data protection.", ["Employee"]),
+    ],
+    "accounts": [
+        ("1001", "Alice Tan", "Admin", "Active", "Premium Support", "2024-05-01T09:00:00Z"),
+        ("1002", "Brian Lim", "Employee", "Active", "Premium Support", "2024-05-02T10:30:00Z"),
+    ],
+}
+
+GEOCODE_PAYLOAD = {"results": [{"name": "Jakarta", "country": "Indonesia", "latitude": -6.175, "longitude": 106.827}]}
+FORECAST_PAYLOAD = {
+    "current": {
+        "temperature_2m": 31.2,
+        "apparent_temperature": 35.0,
+        "relative_humidity_2m": 74,
+        "weather_code": 2,
+        "wind_speed_10m": 12.4,
+    }
+}
+
+DEFAULT_STUBS = {
+    "db": "lognormal:5:0.3:0.0",
+    "weather": "lognormal:120:0.4:0.01",
+    "llm": "lognormal:600:0.5:0.01",
+}
+
+# (seed, replay index, per-backend draw counters) of the request being replayed.
+# Counters are per backend because tool-pool threads share the request's copy.
+_REPLAY: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("replay", default=None)
+
+
+class StubFailure(RuntimeError):
+    """Injected backend failure."""
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Latency distribution and failure rate of one simulated backend.
+
+    `distribution` is `fixed`, `uniform` (median +/- spread * median), or
+    `lognormal` (spread is sigma).
+    """
+
+    distribution: str = "fixed"
+    median_ms: float = 0.0
+    spread: float = 0.0
+    failure_rate: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        parts = spec.split(":")
+        if parts[0] not in ("fixed", "uniform", "lognormal") or not 2 <= len(parts) <= 4:
+            raise ValueError(f"Invalid stub spec {spec!r}; expected DIST:MEDIAN_MS[:SPREAD[:FAILURE_RATE]].")
+        values = [float(part) for part in parts[1:]] + [0.0] * (4 - len(parts))
+        return cls(parts[0], values[0], values[1], values[2])
+
+    def draw(self, rng: random.Random) -> tuple[float, bool]:
+        """Return (latency in seconds, whether this call fails)."""
+        if self.distribution == "uniform":
+            latency_ms = self.median_ms * (1 + rng.uniform(-self.spread, self.spread))
+        elif self.distribution == "lognormal":
+            latency_ms = self.median_ms * math.exp(rng.gauss(0.0, self.spread))
+        else:
+            latency_ms = self.median_ms
+        return max(0.0, latency_ms) / 1000, rng.random() < self.failure_rate
+
+
+class StubBackend:
+    """Sleeps and fails according to a `LatencyProfile`, deterministically per request."""
+
+    def __init__(self, name: str, profile: LatencyProfile) -> None:
+        self.name = name
+        self.profile = profile
+        self._fallback_draws = itertools.count()
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "failures": 0, "timeouts": 0}
+
+    def call(self, timeout_seconds: Optional[float] = None) -> None:
+        replay = _REPLAY.get()
+        if replay is None:
+            seed, index, draw = 0, -1, next(self._fallback_draws)
+        else:
+            seed, index, draws = replay
+            draw = next(draws.setdefault(self.name, itertools.count()))
+        latency, fails = self.profile.draw(random.Random(f"{seed}:{self.name}:{index}:{draw}"))
+        timed_out = timeout_seconds is not None and latency > timeout_seconds
+        with self._lock:
+            self.counts["calls"] += 1
+            self.counts["timeouts"] += int(timed_out)
+            self.counts["failures"] += int(fails and not timed_out)
+        if timed_out:
+            time.sleep(timeout_seconds)
+            raise TimeoutError(f"{self.name} stub timed out")
+        time.sleep(latency)
+        if fails:
+            raise StubFailure(f"{self.name} stub failure")
+
+
+class _StubCursor:
+    def __init__(self, backend: StubBackend, cursor: Any) -> None:
+        self._backend = backend
+        self._cursor = cursor
+
+    def __enter__(self) -> "_StubCursor":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        return False
+
+    def execute(self, query: str, params: Any = None) -> None:
+        self._backend.call()
+        self._cursor.execute(query, params)
+
+    def fetchall(self) -> List[tuple]:
+        return self._cursor.fetchall()
+
+    def fetchone(self) -> Optional[tuple]:
+        return self._cursor.fetchone()
+
+
+class StubDatabase:
+    """Postgres stand-in: `DatasetConn` rows behind a simulated query latency."""
+
+    def __init__(self, backend: StubBackend, rows: Optional[Dict[str, List[tuple]]] = None) -> None:
+        self._backend = backend
+        self._rows = rows or STUB_ROWS
+
+    def connect(self) -> FakeConn:
+        conn = DatasetConn(self._rows)
+        backend = self._backend
+        conn.cursor = lambda: _StubCursor(backend, DatasetConn.cursor(conn))  # type: ignore[method-assign]
+        return conn
+
+
+class _StubResponse:
+    status_code = 200
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+
+class StubWeatherRequester:
+    """Open-Meteo stand-in for `ExternalAPITool(requester=...)`."""
+
+    def __init__(self, backend: StubBackend) -> None:
+        self._backend = backend
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 5.0) -> _StubResponse:
+        self._backend.call(timeout_seconds=timeout)
+        return _StubResponse(GEOCODE_PAYLOAD if "geocoding-api" in url else FORECAST_PAYLOAD)
+
+
+class StubLLM:
+    """Ollama stand-in used as the agent's `contextual_answer`."""
+
+    def __init__(self, backend: StubBackend) -> None:
+        self._backend = backend
+
+    def __call__(self, query: str, context: Dict[str, Any]) -> str:
+        self._backend.call()
+        return f"Jawaban untuk: {query}"
+
+
+class StageRecorder:
+    """Trace exporter that keeps every span duration and error count, per span name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.durations_ms: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            for span in trace.spans:
+                self.durations_ms.setdefault(span.name, []).append(span.duration_ms)
+                failed = "error" in span.attributes or span.attributes.get("status", "ok") != "ok"
+                self.errors[span.name] = self.errors.get(span.name, 0) + int(failed)
+
+
+def build_agent(
+    stubs: Dict[str, LatencyProfile],
+    recorder: StageRecorder,
+    llm_only: bool = False,
+    log_file: Optional[str] = None,
+    rows: Optional[Dict[str, List[tuple]]] = None,
+) -> tuple[ToolEnabledAgent, Optional[AgentLogger], Dict[str, StubBackend]]:
+    """Wire the real tools and agent to the simulated backends."""
+    backends = {name: StubBackend(name, profile) for name, profile in stubs.items()}
+    database = StubDatabase(backends["db"], rows)
+    structured_tool = StructuredDataTool()
+    structured_tool._connect_live_db = database.connect  # type: ignore[method-assign]
+    logger = AgentLogger(name="tool_agent_replay", file_path=log_file, buffered=True) if log_file else None
+    external_tool = ExternalAPITool(
+        requester=StubWeatherRequester(backends["weather"]),
+        logger=logger.log if logger is not None else None,
+    )
+    dependencies = AgentDependencies(
+        structured_data_tool=structured_tool.run,
+        external_api_tool=external_tool.run,
+        guardrail_tool=GuardrailTool().run,
+        fallback_lookup_tool=structured_tool.search_relevant,
+        contextual_answer=StubLLM(backends["llm"]),
+        logger=logger.log if logger is not None else None,
+        answer_strategy=None if llm_only else AnswerStrategy(rules=list(DEFAULT_TEMPLATE_RULES)),
+        tracer=Tracer(recorder),
+    )
+    return ToolEnabledAgent(dependencies=dependencies), logger, backends
+
+
+def load_queries(path: Optional[str] = None, field: str = "query", from_log: Optional[str] = None) -> List[str]:
+    """Queries from a JSONL file, from logged `decision_made` entries, or the built-in sample."""
+    if from_log:
+        queries = [
+            str(entry["payload"]["query"])
+            for entry in SegmentReader(Path(from_log)).scan(event="decision_made")
+            if isinstance(entry.get("payload"), dict) and entry["payload"].get("query")
+        ]
+    elif path:
+        queries = []
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    record = json.loads(line)
+                    value = record.get(field) if isinstance(record, dict) else record
+                    if isinstance(value, str) and value.strip():
+                        queries.append(value)
+    else:
+        queries = list(SAMPLE_QUERIES)
+    if not queries:
+        raise ValueError("No queries to replay.")
+    return queries
+
+
+class ReplayRun:
+    """Collects per-request outcomes while a replay is running."""
+
+    def __init__(self, agent: ToolEnabledAgent, queries: List[str], seed: int) -> None:
+        self._agent = agent
+        self._queries = queries
+        self._seed = seed
+        self._lock = threading.Lock()
+        self.latencies_ms: List[float] = []
+        self.statuses: Dict[str, int] = {}
+
+    def replay(self, index: int, scheduled_at: Optional[float] = None) -> None:
+        started = time.perf_counter() if scheduled_at is None else scheduled_at
+        query = self._queries[index % len(self._queries)]
+        token = _REPLAY.set((self._seed, index, {}))
+        try:
+            status = str(self._agent.handle_query(query).get("status", "unknown"))
+        except Exception:
+            status = "exception"
+        finally:
+            _REPLAY.reset(token)
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies_ms.append(latency_ms)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+def run_closed_loop(run: ReplayRun, concurrency: int, requests: int, duration: Optional[float]) -> None:
+    indexes = itertools.count()
+    deadline = None if duration is None else time.perf_counter() + duration
+
+    def worker() -> None:
+        while deadline is None or time.perf_counter() < deadline:
+            index = next(indexes)
+            if requests and index >= requests:
+                return
+            run.replay(index)
+
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open_loop(run: ReplayRun, rate: float, concurrency: int, requests: int, duration: Optional[float]) -> None:
+    total = requests or int(rate * (duration or 10.0))
+    interval = 1.0 / rate
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = []
+        for index in range(total):
+            scheduled_at = started + index * interval
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(run.replay, index, scheduled_at))
+        wait(futures)
+
+
+def summarize(values_ms: List[float]) -> Dict[str, float]:
+    if not values_ms:
+        return {"count": 0}
+    ordered = sorted(values_ms)
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def run_benchmark(options: argparse.Namespace) -> Dict[str, Any]:
+    stubs = {name: LatencyProfile.parse(spec) for name, spec in DEFAULT_STUBS.items()}
+    for item in options.stub or []:
+        name, _, spec = item.partition("=")
+        if name not in stubs:
+            raise ValueError(f"Unknown stub {name!r}; expected one of {sorted(stubs)}.")
+        stubs[name] = LatencyProfile.parse(spec)
+
+    queries = load_queries(options.queries, options.field, options.from_log)
+    recorder = StageRecorder()
+    rows = fake_responses(DatasetSpec.scaled(options.accounts, options.seed)) if options.accounts else None
+    agent, logger, backends = build_agent(
+        stubs,
+        recorder,
+        llm_only=options.llm_only,
+        log_file=options.log_file,
+        rows=rows,
+    )
+    run = ReplayRun(agent, queries, options.seed)
+    duration = options.duration if options.duration > 0 else None
+
+    started = time.perf_counter()
+    if options.mode == "open":
+        run_open_loop(run, options.rate, options.concurrency, options.requests, duration)
+    else:
+        run_closed_loop(run, options.concurrency, options.requests, duration)
+    elapsed = time.perf_counter() - started
+    if logger is not None:
+        logger.close()
+
+    completed = len(run.latencies_ms)
+    failed = sum(count for status, count in run.statuses.items() if status in ("error", "exception"))
+    return {
+        "commit": _git_commit(),
+        "config": {
+            "mode": options.mode,
+            "concurrency": options.concurrency,
+            "rate": options.rate if options.mode == "open" else None,
+            "requests": options.requests,
+            "duration_seconds": duration,
+            "seed": options.seed,
+            "distinct_queries": len(queries),
+            "llm_only": options.llm_only,
+            "accounts": options.accounts or None,
+            "stubs": {name: asdict(profile) for name, profile in stubs.items()},
+        },
+        "completed": completed,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(completed / elapsed, 3) if elapsed > 0 else 0.0,
+        "statuses": dict(sorted(run.statuses.items())),
+        "error_rate": round(failed / completed, 4) if completed else 0.0,
+        "latency_ms": summarize(run.latencies_ms),
+        "backends": {name: dict(backend.counts) for name, backend in sorted(backends.items())},
+        "stages_ms": {
+            name: {**summarize(values), "errors": recorder.errors.get(name, 0)}
+            for name, values in sorted(recorder.durations_ms.items())
+        },
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=4, help="Closed loop: in-flight requests; open: workers.")
+    parser.add_argument("--rate", type=float, default=20.0, help="Open loop: requests started per second.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests to replay; 0 runs for --duration.")
+    parser.add_argument("--duration", type=float, default=0.0, help="Stop after this many seconds.")
+    parser.add_argument("--queries", help="JSONL file with one query per line.")
+    parser.add_argument("--field", default="query", help="JSON field that holds the query text.")
+    parser.add_argument("--from-log", help="Replay the queries of logged decision_made entries.")
+    parser.add_argument("--stub", action="append", help="NAME=DIST:MEDIAN_MS[:SPREAD[:FAILURE_RATE]].")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-only", action="store_true", help="Always call the LLM stub; skip templates.")
+    parser.add_argument("--accounts", type=int, default=0, help="Serve a generated dataset with this many accounts.")
+    parser.add_argument("--log-file", help="Also log through a buffered AgentLogger writing to this file.")
+    parser.add_argument("--output", help="Write the JSON report to this file as well.")
+    args = parser.parse_args()
+    if not args.requests and not args.duration:
+        parser.error("Set --requests or --duration.")
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 """Agent package exports."""
 
 from .agent_core import ToolEnabledAgent
+from .answer_strategy import AnswerStrategy, StrategyDecision, TemplateRule
 from .dependencies import AgentDependencies
 from .decision_engine import Decision, DecisionEngine
+from .response_cache import ResponseCache
 
 __all__ = [
     "AgentDependencies",
+    "AnswerStrategy",
+    "StrategyDecision",
+    "TemplateRule",
     "ToolEnabledAgent",
     "Decision",
     "DecisionEngine",
+    "ResponseCache",
 ]
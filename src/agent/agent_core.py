@@ -2,11 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import AsyncExitStack, ExitStack, nullcontext
+from typing import Any, AsyncIterator, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.schemas.generation_schema import GenerationAborted
+from src.services.async_utils import call_and_schedule, call_maybe_async
+from src.services.model_router import context_sources
+from src.services.query_analysis import QueryAnalysis, analyze_query
+from src.services.tracing import Span, Trace, Tracer, bind_context, span
 
 from .dependencies import AgentDependencies, ToolFn
-from .decision_engine import DecisionEngine
+from .decision_engine import Decision, DecisionEngine, ToolCall
 from .response_utils import (
+    agenerate_contextual_answer,
     build_answer,
     build_contextual_fallback,
     build_response,
@@ -15,6 +28,8 @@ from .response_utils import (
     generate_contextual_answer,
 )
 
+DEFAULT_DIRECT_ANSWER = "I can help with SLA, policy, account status, and system load checks."
+
 
 class ToolEnabledAgent:
     """Main agent implementation with deterministic decision flow."""
@@ -23,88 +38,559 @@ class ToolEnabledAgent:
         self,
         dependencies: AgentDependencies,
         decision_engine: Optional[DecisionEngine] = None,
+        max_parallel_tools: int = 4,
+        tool_timeout_seconds: float = 15.0,
     ) -> None:
         self._deps = dependencies
         self._engine = decision_engine or DecisionEngine()
+        self._max_parallel_tools = max(1, max_parallel_tools)
+        self._tool_timeout_seconds = tool_timeout_seconds
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def handle_query(
+        self,
+        query: str,
+        include_debug: bool = False,
+        include_profile: bool = False,
+    ) -> Dict[str, Any]:
+        """Execute the full flow for a single user query.
+
+        With `include_profile`, the response carries the request's stage spans.
+        """
+        started = time.perf_counter()
+        with self._track_in_flight(), self._trace(include_profile) as trace:
+            response = self._handle(query, include_debug)
+        self._observe_request(response, started)
+        return _attach_profile(response, trace, include_profile)
+
+    async def ahandle_query(
+        self,
+        query: str,
+        include_debug: bool = False,
+        include_profile: bool = False,
+    ) -> Dict[str, Any]:
+        """Async counterpart of `handle_query`.
+
+        Tools and the contextual answer function may be coroutine functions;
+        plain callables still work and are offloaded to a worker thread.
+        """
+        started = time.perf_counter()
+        with self._track_in_flight(), self._trace(include_profile) as trace:
+            response = await self._ahandle(query, include_debug)
+        self._observe_request(response, started)
+        return _attach_profile(response, trace, include_profile)
+
+    def _handle(self, query: str, include_debug: bool) -> Dict[str, Any]:
+        invalid = self._validate(query)
+        if invalid is not None:
+            return invalid
+
+        analysis = analyze_query(query)
+        decision = self._decide(query, analysis)
+        cached = self._cached_response(query, decision.action, include_debug)
+        if cached is not None:
+            return cached
+
+        debug: Dict[str, Any] = {}
+        response = self._run_flow(query, decision, debug, include_debug, analysis)
+        self._observe_outcome(debug)
+        return self._store_response(query, decision.action, response, debug, include_debug)
+
+    async def _ahandle(self, query: str, include_debug: bool) -> Dict[str, Any]:
+        invalid = self._validate(query)
+        if invalid is not None:
+            return invalid
+
+        analysis = analyze_query(query)
+        decision = self._decide(query, analysis)
+        cached = self._cached_response(query, decision.action, include_debug)
+        if cached is not None:
+            return cached
+
+        debug: Dict[str, Any] = {}
+        response = await self._arun_flow(query, decision, debug, include_debug, analysis)
+        self._observe_outcome(debug)
+        return self._store_response(query, decision.action, response, debug, include_debug)
+
+    def _trace(self, include_profile: bool) -> ContextManager[Optional[Trace]]:
+        tracer = self._deps.tracer
+        if tracer is None and include_profile:
+            tracer = Tracer()
+        if tracer is None:
+            return nullcontext()
+        return tracer.trace("handle_query")
+
+    def _track_in_flight(self) -> ContextManager[None]:
+        if self._deps.metrics is None:
+            return nullcontext()
+        return self._deps.metrics.in_flight.track()
+
+    def _observe_request(self, response: Dict[str, Any], started: float) -> None:
+        if self._deps.metrics is not None:
+            self._deps.metrics.observe_request(
+                str(response.get("decision")),
+                str(response.get("status")),
+                time.perf_counter() - started,
+            )
+
+    def _observe_outcome(self, debug: Dict[str, Any]) -> None:
+        metrics = self._deps.metrics
+        if metrics is None:
+            return
+        tool_results = debug.get("tool_results", [])
+        for result in tool_results:
+            metrics.observe_tool(result["tool"], str(result["status"]))
+        if any(result["status"] != "ok" for result in tool_results):
+            metrics.observe_fallback("tool_error")
+        if "llm_error" in debug:
+            metrics.observe_fallback("llm_error")
+        if debug.get("answer_strategy", {}).get("strategy") == "template":
+            metrics.observe_fallback("template")
+
+    def _run_flow(
+        self,
+        query: str,
+        decision: Decision,
+        debug: Dict[str, Any],
+        include_debug: bool,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> Dict[str, Any]:
+        response_debug = debug if include_debug else None
+
+        if decision.action != "guardrail_refuse":
+            precheck_risk = self._evaluate_risk(
+                {"query": query, "decision": decision.action},
+                stage="pre_check",
+                analysis=analysis,
+            )
+            if precheck_risk.get("status") == "refused":
+                return self._refuse_precheck(decision.action, precheck_risk, response_debug)
+
+        try:
+            with span("answer", action=decision.action):
+                answer = self._answer(query, decision, debug, analysis)
+        except GenerationAborted as exc:
+            return self._refuse_stream(query, decision.action, exc, response_debug)
+
+        self._log_forced_refusal(decision.action, answer)
+        risk = self._evaluate_risk(
+            {
+                "query": query,
+                "decision": decision.action,
+                "proposed_answer": answer,
+            },
+            stage="final",
+            analysis=analysis,
+        )
+        return self._finalize(decision.action, answer, risk, response_debug)
+
+    async def _arun_flow(
+        self,
+        query: str,
+        decision: Decision,
+        debug: Dict[str, Any],
+        include_debug: bool,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> Dict[str, Any]:
+        response_debug = debug if include_debug else None
+
+        if decision.action != "guardrail_refuse":
+            precheck_risk = await self._aevaluate_risk(
+                {"query": query, "decision": decision.action},
+                stage="pre_check",
+                analysis=analysis,
+            )
+            if precheck_risk.get("status") == "refused":
+                return self._refuse_precheck(decision.action, precheck_risk, response_debug)
+
+        try:
+            with span("answer", action=decision.action):
+                answer = await self._aanswer(query, decision, debug, analysis)
+        except GenerationAborted as exc:
+            return self._refuse_stream(query, decision.action, exc, response_debug)
+
+        self._log_forced_refusal(decision.action, answer)
+        risk = await self._aevaluate_risk(
+            {
+                "query": query,
+                "decision": decision.action,
+                "proposed_answer": answer,
+            },
+            stage="final",
+            analysis=analysis,
+        )
+        return self._finalize(decision.action, answer, risk, response_debug)
+
+    def _cached_response(self, query: str, action: str, include_debug: bool) -> Optional[Dict[str, Any]]:
+        cache = self._deps.response_cache
+        if cache is None or include_debug:
+            return None
+        with span("cache_lookup") as record:
+            cached = cache.get(query, action)
+            if record is not None:
+                record.attributes["hit"] = cached is not None
+        if self._deps.metrics is not None:
+            self._deps.metrics.observe_cache_lookup(cached is not None)
+        if cached is not None:
+            self._log("response_cache_hit", {"query": query, "action": action, "cache": cached["cache"]})
+            self._log("final_response", cached)
+        return cached
+
+    def _store_response(
+        self,
+        query: str,
+        action: str,
+        response: Dict[str, Any],
+        debug: Dict[str, Any],
+        include_debug: bool,
+    ) -> Dict[str, Any]:
+        cache = self._deps.response_cache
+        if cache is None:
+            return response
+        if include_debug:
+            response["cache"] = {"hit": False, "bypass": "include_debug"}
+            return response
+        if not _is_cacheable(response, debug):
+            response["cache"] = {"hit": False, "stored": False}
+            return response
+
+        sources = {source for result in debug.get("tool_results", []) for source in result["sources"]}
+        ttl_seconds = cache.put(query, action, response, sources)
+        response["cache"] = {"hit": False, "stored": True, "ttl_seconds": ttl_seconds}
+        return response
+
+    def handle_batch(
+        self,
+        queries: Sequence[str],
+        include_debug: bool = False,
+        max_parallel: int = 4,
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Answer many queries, yielding `(index, response)` in completion order.
+
+        Queries that normalize to the same text run once and the response is
+        yielded for every index that asked it. Structured lookups share one
+        retrieval pass through `AgentDependencies.batch_session`.
+        """
+        groups = _group_queries(queries)
+        with ExitStack() as stack:
+            if self._deps.batch_session is not None:
+                stack.enter_context(self._deps.batch_session())
+            executor = stack.enter_context(
+                ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="agent-batch")
+            )
+            # Workers run in copies of this context, where the batch session is installed.
+            pending = {
+                executor.submit(bind_context(self.handle_query), query, include_debug): indexes
+                for query, indexes in groups
+            }
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        for index in pending.pop(future):
+                            yield index, result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    async def ahandle_batch(
+        self,
+        queries: Sequence[str],
+        include_debug: bool = False,
+        max_parallel: int = 4,
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Async counterpart of `handle_batch`."""
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        async def run(query: str, indexes: List[int]) -> Tuple[List[int], Dict[str, Any]]:
+            async with semaphore:
+                return indexes, await self.ahandle_query(query, include_debug)
+
+        async with AsyncExitStack() as stack:
+            if self._deps.batch_session is not None:
+                await stack.enter_async_context(self._deps.batch_session())
+            tasks = [asyncio.ensure_future(run(query, indexes)) for query, indexes in _group_queries(queries)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    indexes, result = await next_done
+                    for index in indexes:
+                        yield index, result
+            finally:
+                for task in tasks:
+                    task.cancel()
 
-    def handle_query(self, query: str, include_debug: bool = False) -> Dict[str, Any]:
-        """Execute the full flow for a single user query."""
+    @staticmethod
+    def _validate(query: str) -> Optional[Dict[str, Any]]:
         if not query or not query.strip():
             return build_response(
                 status="error",
                 decision="invalid_input",
                 message="Query must not be empty.",
             )
+        return None
 
-        decision = self._engine.decide(query)
-        debug: Dict[str, Any] = {}
+    def _decide(self, query: str, analysis: QueryAnalysis) -> Decision:
+        with span("decide") as record:
+            decision = self._engine.plan(query, analysis)
+            if record is not None:
+                record.attributes["action"] = decision.action
+        payload: Dict[str, Any] = {"query": query, "action": decision.action, "reason": decision.reason}
+        if decision.calls:
+            payload["calls"] = [{"action": call.action, "query": call.query} for call in decision.calls]
+        self._log("decision_made", payload)
+        return decision
+
+    def _refuse_precheck(
+        self,
+        action: str,
+        risk: Dict[str, Any],
+        debug: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        return self._refuse(
+            decision=action,
+            message=risk.get("reason", "Guardrail refused this request."),
+            risk=risk,
+            stage="pre_check",
+            debug=debug,
+        )
+
+    def _refuse_stream(
+        self,
+        query: str,
+        action: str,
+        exc: GenerationAborted,
+        debug: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         self._log(
-            "decision_made",
-            {"query": query, "action": decision.action, "reason": decision.reason},
+            "risk_evaluated",
+            {
+                "stage": "stream",
+                "input": {"query": query, "decision": action},
+                "result": exc.risk,
+            },
+        )
+        return self._refuse(
+            decision=action,
+            message=exc.risk.get("reason", "Guardrail refused this response."),
+            risk=exc.risk,
+            stage="stream",
+            debug=debug,
         )
 
-        forced_refusal: Optional[str] = None
-        if decision.action == "guardrail_refuse":
-            forced_refusal = "Request refused due to unsafe intent."
-            answer = forced_refusal
-            self._log("refusal_decision", {"decision": decision.action, "message": answer})
-        elif decision.action == "structured_data_tool":
-            answer = self._execute_tool(
-                query=query,
-                tool_name="structured_data_tool",
-                tool_fn=self._deps.structured_data_tool,
-                debug=debug,
-            )
-        elif decision.action == "external_api_tool":
-            answer = self._execute_tool(
-                query=query,
-                tool_name="external_api_tool",
-                tool_fn=self._deps.external_api_tool,
-                debug=debug,
+    def _log_forced_refusal(self, action: str, answer: str) -> None:
+        if action == "guardrail_refuse":
+            self._log(
+                "refusal_decision",
+                {"decision": action, "stage": "decision", "message": answer},
             )
-        else:
-            answer = self._handle_direct_answer(query, debug)
 
-        risk_input = {
-            "query": query,
-            "decision": decision.action,
-            "proposed_answer": answer,
-        }
-        risk = self._deps.guardrail_tool(risk_input)
-        self._log("risk_evaluated", {"input": risk_input, "result": risk})
-
-        if forced_refusal is not None:
+    def _finalize(
+        self,
+        action: str,
+        answer: str,
+        risk: Dict[str, Any],
+        debug: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        if action == "guardrail_refuse":
             refusal = build_response(
                 status="refused",
-                decision=decision.action,
-                message=forced_refusal,
+                decision=action,
+                message=answer,
                 risk=risk,
-                debug=debug if include_debug else None,
+                debug=debug,
             )
             self._log("final_response", refusal)
             return refusal
 
         if risk.get("status") == "refused":
-            refusal = build_response(
-                status="refused",
-                decision=decision.action,
+            return self._refuse(
+                decision=action,
                 message=risk.get("reason", "Guardrail refused this response."),
                 risk=risk,
-                debug=debug if include_debug else None,
+                stage="final",
+                debug=debug,
             )
-            self._log("final_response", refusal)
-            return refusal
 
         final = build_response(
             status="ok",
-            decision=decision.action,
+            decision=action,
             message=answer,
             risk=risk,
-            debug=debug if include_debug else None,
+            debug=debug,
         )
         self._log("final_response", final)
         return final
 
+    def _answer(
+        self,
+        query: str,
+        decision: Decision,
+        debug: Dict[str, Any],
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> str:
+        action = decision.action
+        if action == "guardrail_refuse":
+            return "Request refused due to unsafe intent."
+        if action == "multi_tool":
+            return self._execute_plan(query, decision.calls, debug)
+        if action == "structured_data_tool":
+            return self._execute_tool(
+                query=query,
+                tool_name="structured_data_tool",
+                tool_fn=self._deps.structured_data_tool,
+                debug=debug,
+                analysis=analysis,
+            )
+        if action == "external_api_tool":
+            return self._execute_tool(
+                query=query,
+                tool_name="external_api_tool",
+                tool_fn=self._deps.external_api_tool,
+                debug=debug,
+                analysis=analysis,
+            )
+        return self._handle_direct_answer(query, debug, analysis)
+
+    async def _aanswer(
+        self,
+        query: str,
+        decision: Decision,
+        debug: Dict[str, Any],
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> str:
+        action = decision.action
+        if action == "guardrail_refuse":
+            return "Request refused due to unsafe intent."
+        if action == "multi_tool":
+            return await self._aexecute_plan(query, decision.calls, debug)
+        if action == "structured_data_tool":
+            return await self._aexecute_tool(
+                query=query,
+                tool_name="structured_data_tool",
+                tool_fn=self._deps.structured_data_tool,
+                debug=debug,
+                analysis=analysis,
+            )
+        if action == "external_api_tool":
+            return await self._aexecute_tool(
+                query=query,
+                tool_name="external_api_tool",
+                tool_fn=self._deps.external_api_tool,
+                debug=debug,
+                analysis=analysis,
+            )
+        return await self._ahandle_direct_answer(query, debug, analysis)
+
+    def _execute_plan(self, query: str, calls: Sequence[ToolCall], debug: Dict[str, Any]) -> str:
+        executor = self._executor()
+        futures = []
+        for call in calls:
+            # A context copy per call, so each worker's spans join this trace.
+            run_tool = bind_context(self._run_tool)
+            future = executor.submit(run_tool, call.action, self._tool_fn(call.action), call.query, debug)
+            futures.append((call, future))
+        # Every call was submitted at the same time, so one shared deadline gives
+        # each tool the full timeout without serializing the waits.
+        deadline = time.monotonic() + self._tool_timeout_seconds
+        results: List[Tuple[ToolCall, Dict[str, Any]]] = []
+        for call, future in futures:
+            try:
+                output = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                output = self._tool_timed_out(call, debug)
+            results.append((call, output))
+        return generate_contextual_answer(**self._plan_answer_args(query, results, debug))
+
+    async def _aexecute_plan(self, query: str, calls: Sequence[ToolCall], debug: Dict[str, Any]) -> str:
+        semaphore = asyncio.Semaphore(self._max_parallel_tools)
+
+        async def run(call: ToolCall) -> Tuple[ToolCall, Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    output = await asyncio.wait_for(
+                        self._arun_tool(call.action, self._tool_fn(call.action), call.query, debug),
+                        self._tool_timeout_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    output = self._tool_timed_out(call, debug)
+            return call, output
+
+        results = await asyncio.gather(*(run(call) for call in calls))
+        return await agenerate_contextual_answer(**self._plan_answer_args(query, results, debug))
+
+    def _plan_answer_args(
+        self,
+        query: str,
+        results: Sequence[Tuple[ToolCall, Dict[str, Any]]],
+        debug: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        sources: List[Dict[str, Any]] = []
+        for call, output in results:
+            if output.get("status") != "ok":
+                continue
+            context = build_tool_context(call.action, output.get("data", {}))
+            sources.extend(context["sources"] if "sources" in context else [context])
+        if debug is not None:
+            debug["tool_calls"] = [
+                {"action": call.action, "query": call.query, "status": output.get("status")}
+                for call, output in results
+            ]
+
+        fallback_message = " ".join(build_answer(output) for _, output in results)
+        merged_output = {
+            "status": "ok" if sources else "error",
+            "message": fallback_message,
+            "data": {"sources": sources},
+        }
+        return {
+            "query": query,
+            "context": merged_output["data"],
+            "debug": debug,
+            "source": "multi_tool",
+            "fallback_message": fallback_message,
+            "tool_output": merged_output,
+            **self._generation_args(),
+        }
+
+    def _tool_fn(self, action: str) -> ToolFn:
+        if action == "structured_data_tool":
+            return self._deps.structured_data_tool
+        if action == "external_api_tool":
+            return self._deps.external_api_tool
+        raise ValueError(f"No tool registered for action '{action}'.")
+
+    def _tool_timed_out(self, call: ToolCall, debug: Dict[str, Any]) -> Dict[str, Any]:
+        message = f"{call.action} timed out after {self._tool_timeout_seconds:g}s."
+        self._log("tool_timeout", {"tool": call.action, "query": call.query, "message": message})
+        output = {"status": "error", "message": message, "data": {}}
+        _note_tool_result(debug, call.action, output)
+        return output
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Shared across requests so the bound applies to the whole process.
+        with self._executor_lock:
+            if self._tool_executor is None:
+                self._tool_executor = ThreadPoolExecutor(
+                    max_workers=self._max_parallel_tools,
+                    thread_name_prefix="agent-tool",
+                )
+            return self._tool_executor
+
+    def render_metrics(self) -> str:
+        """Return the agent metrics in Prometheus text format, if collected."""
+        if self._deps.metrics is None:
+            return ""
+        return self._deps.metrics.render()
+
+    def generation_metrics_snapshot(self) -> Dict[str, Any]:
+        """Return aggregated LLM generation telemetry, if it is being collected."""
+        if self._deps.generation_metrics is None:
+            return {}
+        return self._deps.generation_metrics.snapshot()
+
     def _build_tool_answer(
         self,
         query: str,
@@ -112,56 +598,241 @@ class ToolEnabledAgent:
         tool_output: Dict[str, Any],
         debug: Optional[Dict[str, Any]] = None,
     ) -> str:
-        context = build_tool_context(source, tool_output.get("data", {}))
-        return generate_contextual_answer(
-            query=query,
-            context=context,
+        return generate_contextual_answer(**self._tool_answer_args(query, source, tool_output, debug))
+
+    async def _abuild_tool_answer(
+        self,
+        query: str,
+        source: str,
+        tool_output: Dict[str, Any],
+        debug: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        return await agenerate_contextual_answer(**self._tool_answer_args(query, source, tool_output, debug))
+
+    def _tool_answer_args(
+        self,
+        query: str,
+        source: str,
+        tool_output: Dict[str, Any],
+        debug: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "context": build_tool_context(source, tool_output.get("data", {})),
+            "debug": debug,
+            "source": source,
+            "fallback_message": build_answer(tool_output),
+            "tool_output": tool_output,
+            **self._generation_args(),
+        }
+
+    def _lookup_answer_args(
+        self,
+        query: str,
+        lookup_output: Dict[str, Any],
+        debug: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "context": lookup_output.get("data", {}),
+            "debug": debug,
+            "source": extract_context_source(lookup_output.get("data", {}), "fallback_lookup_tool"),
+            "fallback_message": build_contextual_fallback(lookup_output),
+            "tool_output": lookup_output,
+            **self._generation_args(),
+        }
+
+    def _generation_args(self) -> Dict[str, Any]:
+        return {
+            "contextual_answer": self._deps.contextual_answer,
+            "logger": self._deps.logger,
+            "generation_metrics": self._deps.generation_metrics,
+            "answer_strategy": self._deps.answer_strategy,
+        }
+
+    def _evaluate_risk(
+        self,
+        risk_input: Dict[str, Any],
+        stage: str,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> Dict[str, Any]:
+        with span(f"guardrail.{stage}"):
+            risk = self._deps.guardrail_tool(_with_analysis(risk_input, analysis))
+        self._log("risk_evaluated", {"stage": stage, "input": risk_input, "result": risk})
+        return risk
+
+    async def _aevaluate_risk(
+        self,
+        risk_input: Dict[str, Any],
+        stage: str,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> Dict[str, Any]:
+        # Guardrail checks are cheap keyword scans; run them inline unless async.
+        with span(f"guardrail.{stage}"):
+            risk = await call_maybe_async(
+                self._deps.guardrail_tool, _with_analysis(risk_input, analysis), offload=False
+            )
+        self._log("risk_evaluated", {"stage": stage, "input": risk_input, "result": risk})
+        return risk
+
+    def _refuse(
+        self,
+        decision: str,
+        message: str,
+        risk: Dict[str, Any],
+        stage: str,
+        debug: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        self._log("refusal_decision", {"decision": decision, "stage": stage, "message": message})
+        refusal = build_response(
+            status="refused",
+            decision=decision,
+            message=message,
+            risk=risk,
             debug=debug,
-            source=source,
-            fallback_message=build_answer(tool_output),
-            tool_output=tool_output,
-            contextual_answer=self._deps.contextual_answer,
-            logger=self._deps.logger,
         )
+        self._log("final_response", refusal)
+        return refusal
 
     def _log(self, event: str, payload: Dict[str, Any]) -> None:
         if self._deps.logger is not None:
-            self._deps.logger(event, payload)
+            call_and_schedule(self._deps.logger, event, payload)
 
-    def _handle_direct_answer(self, query: str, debug: Optional[Dict[str, Any]] = None) -> str:
-        default_answer = "I can help with SLA, policy, account status, and system load checks."
+    def _handle_direct_answer(
+        self,
+        query: str,
+        debug: Optional[Dict[str, Any]] = None,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> str:
         if self._deps.fallback_lookup_tool is None:
-            return default_answer
+            return DEFAULT_DIRECT_ANSWER
 
-        lookup_output = self._run_tool("fallback_lookup_tool", self._deps.fallback_lookup_tool, query)
+        lookup_output = self._run_tool(
+            "fallback_lookup_tool", self._deps.fallback_lookup_tool, query, debug, analysis
+        )
 
         if lookup_output.get("status") != "ok":
-            return default_answer
+            return DEFAULT_DIRECT_ANSWER
 
-        return generate_contextual_answer(
-            query=query,
-            context=lookup_output.get("data", {}),
-            debug=debug,
-            source=extract_context_source(lookup_output.get("data", {}), "fallback_lookup_tool"),
-            fallback_message=build_contextual_fallback(lookup_output),
-            tool_output=lookup_output,
-            contextual_answer=self._deps.contextual_answer,
-            logger=self._deps.logger,
+        return generate_contextual_answer(**self._lookup_answer_args(query, lookup_output, debug))
+
+    async def _ahandle_direct_answer(
+        self,
+        query: str,
+        debug: Optional[Dict[str, Any]] = None,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> str:
+        if self._deps.fallback_lookup_tool is None:
+            return DEFAULT_DIRECT_ANSWER
+
+        lookup_output = await self._arun_tool(
+            "fallback_lookup_tool", self._deps.fallback_lookup_tool, query, debug, analysis
         )
 
+        if lookup_output.get("status") != "ok":
+            return DEFAULT_DIRECT_ANSWER
+
+        return await agenerate_contextual_answer(**self._lookup_answer_args(query, lookup_output, debug))
+
     def _execute_tool(
         self,
         query: str,
         tool_name: str,
         tool_fn: ToolFn,
         debug: Optional[Dict[str, Any]] = None,
+        analysis: Optional[QueryAnalysis] = None,
     ) -> str:
-        tool_output = self._run_tool(tool_name, tool_fn, query)
+        tool_output = self._run_tool(tool_name, tool_fn, query, debug, analysis)
         return self._build_tool_answer(query, tool_name, tool_output, debug)
 
-    def _run_tool(self, tool_name: str, tool_fn: ToolFn, query: str) -> Dict[str, Any]:
+    async def _aexecute_tool(
+        self,
+        query: str,
+        tool_name: str,
+        tool_fn: ToolFn,
+        debug: Optional[Dict[str, Any]] = None,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> str:
+        tool_output = await self._arun_tool(tool_name, tool_fn, query, debug, analysis)
+        return await self._abuild_tool_answer(query, tool_name, tool_output, debug)
+
+    def _run_tool(
+        self,
+        tool_name: str,
+        tool_fn: ToolFn,
+        query: str,
+        debug: Optional[Dict[str, Any]] = None,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> Dict[str, Any]:
+        tool_input = {"query": query}
+        self._log("tool_input", {"tool": tool_name, "input": tool_input})
+        with span(f"tool.{tool_name}") as record:
+            tool_output = tool_fn(_with_analysis(tool_input, analysis))
+            _note_span_status(record, tool_output)
+        self._log("tool_output", {"tool": tool_name, "output": tool_output})
+        _note_tool_result(debug, tool_name, tool_output)
+        return tool_output
+
+    async def _arun_tool(
+        self,
+        tool_name: str,
+        tool_fn: ToolFn,
+        query: str,
+        debug: Optional[Dict[str, Any]] = None,
+        analysis: Optional[QueryAnalysis] = None,
+    ) -> Dict[str, Any]:
         tool_input = {"query": query}
         self._log("tool_input", {"tool": tool_name, "input": tool_input})
-        tool_output = tool_fn(tool_input)
+        with span(f"tool.{tool_name}") as record:
+            tool_output = await call_maybe_async(tool_fn, _with_analysis(tool_input, analysis))
+            _note_span_status(record, tool_output)
         self._log("tool_output", {"tool": tool_name, "output": tool_output})
+        _note_tool_result(debug, tool_name, tool_output)
         return tool_output
+
+
+def _with_analysis(params: Dict[str, Any], analysis: Optional[QueryAnalysis]) -> Dict[str, Any]:
+    """Tool params plus the request's analysis; only the plain params are logged."""
+    if analysis is None:
+        return params
+    return {**params, "analysis": analysis}
+
+
+def _note_span_status(record: Optional[Span], output: Dict[str, Any]) -> None:
+    if record is not None:
+        record.attributes["status"] = output.get("status")
+
+
+def _attach_profile(response: Dict[str, Any], trace: Optional[Trace], include_profile: bool) -> Dict[str, Any]:
+    if include_profile and trace is not None:
+        response["profile"] = trace.to_dict()
+    return response
+
+
+def _note_tool_result(debug: Optional[Dict[str, Any]], tool_name: str, output: Dict[str, Any]) -> None:
+    if debug is None:
+        return
+    context = build_tool_context(tool_name, output.get("data", {}))
+    debug.setdefault("tool_results", []).append(
+        {"tool": tool_name, "status": output.get("status"), "sources": sorted(context_sources(context))}
+    )
+
+
+def _is_cacheable(response: Dict[str, Any], debug: Dict[str, Any]) -> bool:
+    """Only cache answers that did not degrade because something failed."""
+    if response.get("status") == "refused":
+        return True
+    if response.get("status") != "ok" or "llm_error" in debug:
+        return False
+    if str(debug.get("answer_strategy", {}).get("reason", "")).startswith("overload"):
+        return False
+    return all(result["status"] == "ok" for result in debug.get("tool_results", []))
+
+
+def _group_queries(queries: Sequence[str]) -> List[Tuple[str, List[int]]]:
+    """Group input indexes by normalized query text, keeping first-seen order."""
+    groups: Dict[str, Tuple[str, List[int]]] = {}
+    for index, query in enumerate(queries):
+        key = " ".join(str(query).lower().split())
+        groups.setdefault(key, (query, []))[1].append(index)
+    return list(groups.values())
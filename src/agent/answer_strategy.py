@@ -0,0 +1,138 @@
+"""Per-request choice between template answers and LLM generation."""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from src.services.model_router import context_sources, count_context_records
+
+ANALYTICAL_TERMS = ("why", "explain", "compare", "difference", "summarize", "summary", "recommend")
+
+
+@dataclass(frozen=True)
+class TemplateRule:
+    """Allow the deterministic template answer for one source."""
+
+    source: str
+    max_records: int = 1
+    blocked_terms: Tuple[str, ...] = ANALYTICAL_TERMS
+
+
+@dataclass(frozen=True)
+class StrategyDecision:
+    """Selected answer strategy with the reason it was chosen."""
+
+    strategy: str
+    reason: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"strategy": self.strategy, "reason": self.reason}
+
+
+DEFAULT_TEMPLATE_RULES = (
+    TemplateRule("accounts", blocked_terms=ANALYTICAL_TERMS + ("role", "login", "last")),
+    TemplateRule(
+        "sla_lookup",
+        blocked_terms=ANALYTICAL_TERMS + ("availability", "channel", "channels", "escalation", "tier"),
+    ),
+    TemplateRule("system_status", blocked_terms=ANALYTICAL_TERMS + ("maintenance", "updated")),
+)
+
+
+class AnswerStrategy:
+    """Decide whether a tool result needs the LLM or a template answer suffices.
+
+    Template answers are chosen when a source rule matches the context and the
+    query shape. With `max_concurrent_generations` or `latency_budget_seconds`
+    set, the LLM is also skipped when generations are saturated or the
+    observed generation latency exceeds the budget; in that state one probe
+    generation is let through per `probe_interval_seconds` so recovery is
+    detected. The latency is a process-wide average, so both limits are off
+    unless sized for the deployment's Ollama capacity and timeout.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[TemplateRule] = DEFAULT_TEMPLATE_RULES,
+        latency_budget_seconds: Optional[float] = None,
+        max_concurrent_generations: Optional[int] = None,
+        probe_interval_seconds: float = 5.0,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self._rules = {rule.source: rule for rule in rules}
+        self._latency_budget_seconds = latency_budget_seconds
+        self._max_concurrent_generations = max_concurrent_generations
+        self._probe_interval_seconds = probe_interval_seconds
+        self._ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency_ewma: Optional[float] = None
+        self._last_generation_started = 0.0
+
+    def decide(self, query: str, context: Any) -> StrategyDecision:
+        rule_reason = self._match_rule(query, context)
+        if rule_reason is not None:
+            return StrategyDecision("template", rule_reason)
+
+        with self._lock:
+            saturated = (
+                self._max_concurrent_generations is not None
+                and self._in_flight >= self._max_concurrent_generations
+            )
+            if saturated:
+                return StrategyDecision("template", "overload: generation concurrency saturated")
+            over_budget = (
+                self._latency_budget_seconds is not None
+                and self._latency_ewma is not None
+                and self._latency_ewma > self._latency_budget_seconds
+            )
+            probe_due = (
+                time.monotonic() - self._last_generation_started >= self._probe_interval_seconds
+            )
+            if over_budget and not probe_due:
+                return StrategyDecision("template", "overload: generation latency over budget")
+
+        return StrategyDecision("llm", "context requires generated answer")
+
+    @contextmanager
+    def track_generation(self) -> Iterator[None]:
+        started = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            self._last_generation_started = started
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._in_flight -= 1
+                if self._latency_ewma is None:
+                    self._latency_ewma = elapsed
+                else:
+                    self._latency_ewma += self._ewma_alpha * (elapsed - self._latency_ewma)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight_generations": self._in_flight,
+                "generation_latency_ewma_seconds": self._latency_ewma,
+                "latency_budget_seconds": self._latency_budget_seconds,
+            }
+
+    def _match_rule(self, query: str, context: Any) -> Optional[str]:
+        sources = context_sources(context)
+        if len(sources) != 1:
+            return None
+        source = next(iter(sources))
+        rule = self._rules.get(source)
+        if rule is None or count_context_records(context) > rule.max_records:
+            return None
+        tokens = set(re.findall(r"[a-z0-9]+", query.lower()))
+        if tokens.intersection(rule.blocked_terms):
+            return None
+        return f"template rule matched for {source}"
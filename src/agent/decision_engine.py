@@ -2,7 +2,22 @@
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.services.query_analysis import QueryAnalysis, analyze_query
+from src.tools.external_api import ExternalAPITool
+
+_CLAUSE_SEPARATORS = re.compile(r"\s*(?:;|\?|\band\b|\bdan\b|\balso\b|\bserta\b)\s*", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ToolCall:
+    """One tool invocation inside a multi-tool plan."""
+
+    action: str
+    query: str
 
 
 @dataclass(frozen=True)
@@ -11,6 +26,7 @@ class Decision:
 
     action: str
     reason: str
+    calls: Tuple[ToolCall, ...] = ()
 
 
 class DecisionEngine:
@@ -27,16 +43,85 @@ class DecisionEngine:
     _EXTERNAL_KEYWORDS = ("system load","external","latency","uptime","health check",
                           "weather","cuaca","temperature","suhu","forecast",)
 
-    def decide(self, query: str) -> Decision:
-        """Return deterministic action based on query content."""
-        normalized = self._normalize(query)
+    def decide(self, query: str, analysis: Optional[QueryAnalysis] = None) -> Decision:
+        """Return deterministic action based on query content.
 
-        if any(keyword in normalized for keyword in self._RISK_KEYWORDS):
+        Pass the request's `analysis` to reuse its normalized text and keyword hits.
+        """
+        analysis = analysis or analyze_query(query)
+
+        if analysis.contains_any(self._RISK_KEYWORDS):
             return Decision(
                 action="guardrail_refuse",
                 reason="Query matches risky operation keywords.",
             )
 
+        tool_decision = self._match_tool(analysis.normalized)
+        if tool_decision is not None:
+            return tool_decision
+#llm layer 
+        return Decision(
+            action="direct_answer",
+            reason="No tool requirement detected from deterministic rules.",
+        )
+
+    def plan(self, query: str, analysis: Optional[QueryAnalysis] = None) -> Decision:
+        """Return a `multi_tool` decision when clauses need different tools.
+
+        The query is split into clauses on conjunctions. Only clauses the
+        external tool can answer (weather) are fanned out to it; every other
+        clause, including ones before the first tool keyword, stays on the
+        structured call, so "SLA for premium and basic" remains one lookup and
+        "account 1002 and system load" keeps its system-status half. Anything
+        that does not need at least two distinct tools falls back to `decide`.
+        """
+        decision = self.decide(query, analysis)
+        if decision.action == "guardrail_refuse":
+            return decision
+
+        clauses_by_action: Dict[str, List[str]] = {}
+        leading: List[str] = []
+        current_action: Optional[str] = None
+        for clause in _CLAUSE_SEPARATORS.split(" ".join(query.split())):
+            if not clause:
+                continue
+            clause_action = self._clause_action(self._normalize(clause))
+            if clause_action is not None:
+                current_action = clause_action
+            if current_action is None:
+                leading.append(clause)
+                continue
+            clauses = clauses_by_action.setdefault(current_action, [])
+            if leading:
+                clauses.extend(leading)
+                leading = []
+            clauses.append(clause)
+
+        if len(clauses_by_action) < 2:
+            return decision
+
+        calls = tuple(
+            ToolCall(action=action, query=" and ".join(clauses))
+            for action, clauses in clauses_by_action.items()
+        )
+        return Decision(
+            action="multi_tool",
+            reason="Query contains independent requests for "
+            + ", ".join(call.action for call in calls)
+            + ".",
+            calls=calls,
+        )
+
+    def _clause_action(self, normalized: str) -> Optional[str]:
+        """The tool a clause can be sent to on its own, if any."""
+        clause_decision = self._match_tool(normalized)
+        if clause_decision is None:
+            return None
+        if clause_decision.action == "external_api_tool" and not ExternalAPITool.supports_query(normalized):
+            return "structured_data_tool"
+        return clause_decision.action
+
+    def _match_tool(self, normalized: str) -> Optional[Decision]:
         if any(keyword in normalized for keyword in self._STRUCTURED_KEYWORDS):
             return Decision(
                 action="structured_data_tool",
@@ -48,11 +133,7 @@ class DecisionEngine:
                 action="external_api_tool",
                 reason="Query requests external system information.",
             )
-#llm layer 
-        return Decision(
-            action="direct_answer",
-            reason="No tool requirement detected from deterministic rules.",
-        )
+        return None
 
     @staticmethod
     def _normalize(query: str) -> str:
@@ -3,11 +3,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
 
-LoggerFn = Callable[[str, Dict[str, Any]], None]
-ToolFn = Callable[[Dict[str, Any]], Dict[str, Any]]
-ContextualAnswerFn = Callable[[str, Dict[str, Any]], str]
+from src.schemas.generation_schema import GenerationResult
+from src.services.generation_metrics import GenerationMetrics
+from src.services.metrics import AgentMetrics
+from src.services.tracing import Tracer
+
+from .answer_strategy import AnswerStrategy
+from .response_cache import ResponseCache
+
+# Coroutine functions are accepted wherever the agent runs via `ahandle_query`.
+LoggerFn = Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]
+ToolFn = Callable[[Dict[str, Any]], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]
+# Returns a sync and/or async context manager that shares work across a batch.
+BatchSessionFn = Callable[[], Any]
+ContextualAnswerFn = Callable[
+    [str, Dict[str, Any]],
+    Union[str, GenerationResult, Awaitable[Union[str, GenerationResult]]],
+]
 
 
 @dataclass
@@ -20,3 +34,9 @@ class AgentDependencies:
     fallback_lookup_tool: Optional[ToolFn] = None
     contextual_answer: Optional[ContextualAnswerFn] = None
     logger: Optional[LoggerFn] = None
+    generation_metrics: Optional[GenerationMetrics] = None
+    answer_strategy: Optional[AnswerStrategy] = None
+    batch_session: Optional[BatchSessionFn] = None
+    response_cache: Optional[ResponseCache] = None
+    tracer: Optional[Tracer] = None
+    metrics: Optional[AgentMetrics] = None
@@ -0,0 +1,115 @@
+"""Agent-level cache for complete `handle_query` responses."""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+# Live readings go stale quickly; reference data changes rarely.
+DEFAULT_SOURCE_TTLS: Dict[str, float] = {
+    "external_api_tool": 120.0,
+    "system_status": 15.0,
+    "accounts": 300.0,
+    "sla_lookup": 3600.0,
+    "policies": 3600.0,
+}
+
+
+@dataclass
+class _CacheEntry:
+    response: Dict[str, Any]
+    stored_at: float
+    ttl_seconds: float
+
+
+class ResponseCache:
+    """LRU cache of agent responses keyed by normalized query and decision.
+
+    Each entry lives for the shortest TTL among the sources that produced it.
+    Refusals are cached for `refusal_ttl_seconds`, capped by the TTL of any
+    sources they saw.
+    """
+
+    def __init__(
+        self,
+        source_ttls: Optional[Mapping[str, float]] = None,
+        default_ttl_seconds: float = 300.0,
+        refusal_ttl_seconds: float = 3600.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._source_ttls = dict(DEFAULT_SOURCE_TTLS if source_ttls is None else source_ttls)
+        self._default_ttl_seconds = default_ttl_seconds
+        self._refusal_ttl_seconds = refusal_ttl_seconds
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, query: str, action: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached response with `cache` metadata, if fresh."""
+        key = self._key(query, action)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.stored_at >= entry.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            response = copy.deepcopy(entry.response)
+        response["cache"] = {
+            "hit": True,
+            "age_seconds": round(now - entry.stored_at, 3),
+            "ttl_seconds": entry.ttl_seconds,
+        }
+        return response
+
+    def put(
+        self,
+        query: str,
+        action: str,
+        response: Dict[str, Any],
+        sources: Iterable[str] = (),
+    ) -> float:
+        """Store a response and return the TTL it was given."""
+        ttl_seconds = self.ttl_for(sources, refused=response.get("status") == "refused")
+        entry = _CacheEntry(copy.deepcopy(response), self._clock(), ttl_seconds)
+        key = self._key(query, action)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return ttl_seconds
+
+    def ttl_for(self, sources: Iterable[str], refused: bool = False) -> float:
+        ttls = [self._source_ttls.get(source, self._default_ttl_seconds) for source in sources]
+        if refused:
+            ttls.append(self._refusal_ttl_seconds)
+        return min(ttls) if ttls else self._default_ttl_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    @staticmethod
+    def _key(query: str, action: str) -> Tuple[str, str]:
+        return " ".join(query.lower().split()), action
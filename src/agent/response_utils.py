@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Optional, Union
 
+from src.schemas.generation_schema import GenerationAborted, GenerationResult
+from src.services.async_utils import call_and_schedule, call_maybe_async
+from src.services.generation_metrics import GenerationMetrics
+from src.services.model_router import source_record_count
 from src.services.ollama_service import OllamaService
+from src.services.tracing import span
 
+from .answer_strategy import AnswerStrategy
 from .dependencies import ContextualAnswerFn, LoggerFn
 
 
@@ -60,10 +67,93 @@ def generate_contextual_answer(
     tool_output: Dict[str, Any],
     contextual_answer: Optional[ContextualAnswerFn],
     logger: Optional[LoggerFn] = None,
+    generation_metrics: Optional[GenerationMetrics] = None,
+    answer_strategy: Optional[AnswerStrategy] = None,
 ) -> str:
+    answer = _select_non_llm_answer(
+        query, context, debug, source, fallback_message, tool_output, contextual_answer, logger, answer_strategy
+    )
+    if answer is not None or contextual_answer is None:
+        return answer or fallback_message
+
+    with _track_generation(answer_strategy), span("contextual_answer", source=source):
+        _record_llm_input(debug, query, context)
+        try:
+            result = contextual_answer(query, context)
+        except Exception as exc:
+            return _handle_generation_error(
+                exc, query, debug, source, fallback_message, logger, generation_metrics
+            )
+        return _complete_generation(result, query, context, debug, source, logger, generation_metrics)
+
+
+async def agenerate_contextual_answer(
+    query: str,
+    context: Any,
+    debug: Optional[Dict[str, Any]],
+    source: str,
+    fallback_message: str,
+    tool_output: Dict[str, Any],
+    contextual_answer: Optional[ContextualAnswerFn],
+    logger: Optional[LoggerFn] = None,
+    generation_metrics: Optional[GenerationMetrics] = None,
+    answer_strategy: Optional[AnswerStrategy] = None,
+) -> str:
+    """Async counterpart of `generate_contextual_answer`; awaits async generators."""
+    answer = _select_non_llm_answer(
+        query, context, debug, source, fallback_message, tool_output, contextual_answer, logger, answer_strategy
+    )
+    if answer is not None or contextual_answer is None:
+        return answer or fallback_message
+
+    with _track_generation(answer_strategy), span("contextual_answer", source=source):
+        _record_llm_input(debug, query, context)
+        try:
+            result = await call_maybe_async(contextual_answer, query, context)
+        except Exception as exc:
+            return _handle_generation_error(
+                exc, query, debug, source, fallback_message, logger, generation_metrics
+            )
+        return _complete_generation(result, query, context, debug, source, logger, generation_metrics)
+
+
+def _select_non_llm_answer(
+    query: str,
+    context: Any,
+    debug: Optional[Dict[str, Any]],
+    source: str,
+    fallback_message: str,
+    tool_output: Dict[str, Any],
+    contextual_answer: Optional[ContextualAnswerFn],
+    logger: Optional[LoggerFn],
+    answer_strategy: Optional[AnswerStrategy],
+) -> Optional[str]:
+    """Return the fallback or template answer, or None when the LLM should run."""
     if tool_output.get("status") != "ok" or contextual_answer is None:
         return fallback_message
+    if answer_strategy is None:
+        return None
 
+    decision = answer_strategy.decide(query, context)
+    if debug is not None:
+        debug["answer_strategy"] = decision.to_dict()
+    _log(
+        logger,
+        "answer_strategy_selected",
+        {"query": query, "source": extract_context_source(context, source), **decision.to_dict()},
+    )
+    if decision.strategy == "template":
+        return build_contextual_fallback(tool_output)
+    return None
+
+
+def _track_generation(answer_strategy: Optional[AnswerStrategy]) -> ContextManager[None]:
+    if answer_strategy is None:
+        return nullcontext()
+    return answer_strategy.track_generation()
+
+
+def _record_llm_input(debug: Optional[Dict[str, Any]], query: str, context: Any) -> None:
     if debug is not None:
         debug["llm_input"] = {
             "query": query,
@@ -71,23 +161,64 @@ def generate_contextual_answer(
         }
         debug["llm_prompt"] = OllamaService.build_prompt(query, context)
 
-    try:
-        answer = contextual_answer(query, context)
-        _log(
-            logger,
-            "contextual_answer_generated",
-            {"query": query, "source": extract_context_source(context, source)},
-        )
-        return answer
-    except Exception as exc:
+
+def _handle_generation_error(
+    exc: Exception,
+    query: str,
+    debug: Optional[Dict[str, Any]],
+    source: str,
+    fallback_message: str,
+    logger: Optional[LoggerFn],
+    generation_metrics: Optional[GenerationMetrics],
+) -> str:
+    if isinstance(exc, GenerationAborted):
         if debug is not None:
-            debug["llm_error"] = str(exc)
+            debug["llm_aborted"] = {"partial_answer": exc.partial_answer, "risk": exc.risk}
         _log(
             logger,
-            "contextual_answer_failed",
-            {"query": query, "source": source, "error": str(exc)},
+            "contextual_answer_aborted",
+            {"query": query, "source": source, "reason": str(exc)},
         )
-        return fallback_message
+        raise exc
+
+    if generation_metrics is not None:
+        generation_metrics.record_failure()
+    if debug is not None:
+        debug["llm_error"] = str(exc)
+    _log(
+        logger,
+        "contextual_answer_failed",
+        {"query": query, "source": source, "error": str(exc)},
+    )
+    return fallback_message
+
+
+def _complete_generation(
+    result: Union[str, GenerationResult],
+    query: str,
+    context: Any,
+    debug: Optional[Dict[str, Any]],
+    source: str,
+    logger: Optional[LoggerFn],
+    generation_metrics: Optional[GenerationMetrics],
+) -> str:
+    generated_payload: Dict[str, Any] = {
+        "query": query,
+        "source": extract_context_source(context, source),
+    }
+    if not isinstance(result, GenerationResult):
+        _log(logger, "contextual_answer_generated", generated_payload)
+        return result
+
+    if result.telemetry is not None:
+        telemetry = result.telemetry.to_dict()
+        generated_payload["telemetry"] = telemetry
+        if debug is not None:
+            debug["llm_telemetry"] = telemetry
+        if generation_metrics is not None:
+            generation_metrics.record(result.telemetry)
+    _log(logger, "contextual_answer_generated", generated_payload)
+    return result.answer
 
 
 def build_contextual_fallback(lookup_output: Dict[str, Any]) -> str:
@@ -96,7 +227,7 @@ def build_contextual_fallback(lookup_output: Dict[str, Any]) -> str:
         summaries = []
         for source_entry in data.get("sources", []):
             source_name = source_entry.get("source", "unknown")
-            count = source_entry.get("match_count", len(source_entry.get("records", [])))
+            count = source_record_count(source_entry)
             summaries.append(f"{count} row(s) from {source_name}")
         return "Found structured data: " + ", ".join(summaries) + "."
 
@@ -153,4 +284,4 @@ def build_contextual_fallback(lookup_output: Dict[str, Any]) -> str:
 
 def _log(logger: Optional[LoggerFn], event: str, payload: Dict[str, Any]) -> None:
     if logger is not None:
-        logger(event, payload)
+        call_and_schedule(logger, event, payload)
@@ -2,20 +2,34 @@
 
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
+from typing import AsyncIterator, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from src.main import build_runtime
+from src.logging.collector import CollectorUnavailable
+from src.runtime import build_runtime
+from src.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 app = FastAPI(title="Tool-Agent API")
-agent, logger = build_runtime()
+agent, logger = build_runtime(async_mode=True)
+batch_max_parallel = int(os.getenv("BATCH_MAX_PARALLEL", "4"))
+batch_max_queries = int(os.getenv("BATCH_MAX_QUERIES", "5000"))
 
 
 class QueryRequest(BaseModel):
     query: str
     include_debug: bool = False
+    include_profile: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    queries: list[str]
+    include_debug: bool = False
 
 
 @app.get("/health")
@@ -24,17 +38,62 @@ def health() -> dict[str, str]:
 
 
 @app.post("/query")
-def query(request: QueryRequest) -> dict:
-    return agent.handle_query(query=request.query, include_debug=request.include_debug)
+async def query(request: QueryRequest) -> dict:
+    return await agent.ahandle_query(
+        query=request.query,
+        include_debug=request.include_debug,
+        include_profile=request.include_profile,
+    )
+
+
+@app.post("/query/batch")
+async def query_batch(request: BatchQueryRequest) -> StreamingResponse:
+    if not request.queries or len(request.queries) > batch_max_queries:
+        raise HTTPException(
+            status_code=422,
+            detail=f"queries must contain between 1 and {batch_max_queries} items.",
+        )
+
+    async def stream() -> AsyncIterator[str]:
+        async for index, result in agent.ahandle_batch(
+            request.queries,
+            include_debug=request.include_debug,
+            max_parallel=batch_max_parallel,
+        ):
+            yield json.dumps({"index": index, "result": result}, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(agent.render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/metrics/generation")
+def generation_metrics() -> dict:
+    return {"status": "ok", "metrics": agent.generation_metrics_snapshot()}
 
 
 @app.get("/logs")
-def get_logs() -> dict:
-    log_path = Path(logger.get_log_file_path())
-    return {
-        "status": "ok",
-        "entries": logger.get_history(),
-        "count": len(logger.entries),
-        "log_file": str(log_path),
-        "log_file_exists": log_path.exists(),
-    }
+def get_logs(
+    cursor: Optional[int] = None,
+    limit: int = 100,
+    event: Optional[str] = None,
+    request_id: Optional[str] = None,
+    since: Optional[float] = None,
+) -> dict:
+    try:
+        stats = logger.stats()
+        log_path = Path(stats["log_file"])
+        page = logger.query(cursor=cursor, limit=limit, event=event, request_id=request_id, since=since)
+        return {
+            "status": "ok",
+            **page,
+            "log_file": str(log_path),
+            "log_file_exists": log_path.exists(),
+            "writer": stats["writer"],
+            "policies": stats["policies"],
+        }
+    except CollectorUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
@@ -0,0 +1,8 @@
+"""Command-line helpers for the tool-enabled agent."""
+
+from .bulk import LatencyStats, run_bulk
+
+__all__ = [
+    "LatencyStats",
+    "run_bulk",
+]
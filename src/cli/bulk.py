@@ -0,0 +1,268 @@
+"""Bulk JSONL mode for the CLI.
+
+Queries are streamed from a JSONL file and answered by a worker pool over one
+warm agent. Results are appended to an NDJSON file as they complete, so memory
+stays bounded by the number of in-flight queries rather than the file size.
+
+Every result line carries the byte `offset` of its input line. A checkpoint
+file next to the output records the offset below which every input line has
+been written, which lets an interrupted run resume without redoing or
+duplicating work.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+QueryHandler = Callable[[str], Dict[str, Any]]
+
+
+class LatencyStats:
+    """Throughput and latency summary with a fixed-size reservoir sample."""
+
+    def __init__(self, reservoir_size: int = 10_000, seed: Optional[int] = None) -> None:
+        self._reservoir_size = reservoir_size
+        self._reservoir: List[float] = []
+        self._random = random.Random(seed)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, latency_seconds: float, status: str) -> None:
+        self.count += 1
+        self.total_seconds += latency_seconds
+        self.max_seconds = max(self.max_seconds, latency_seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if len(self._reservoir) < self._reservoir_size:
+            self._reservoir.append(latency_seconds)
+            return
+        slot = self._random.randrange(self.count)
+        if slot < self._reservoir_size:
+            self._reservoir[slot] = latency_seconds
+
+    def percentile(self, fraction: float) -> float:
+        if not self._reservoir:
+            return 0.0
+        ordered = sorted(self._reservoir)
+        index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self, elapsed_seconds: float) -> Dict[str, Any]:
+        return {
+            "processed": self.count,
+            "statuses": dict(sorted(self.statuses.items())),
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "throughput_per_second": (
+                round(self.count / elapsed_seconds, 3) if elapsed_seconds > 0 else 0.0
+            ),
+            "latency_ms": {
+                "mean": _ms(self.total_seconds / self.count) if self.count else 0.0,
+                "p50": _ms(self.percentile(0.50)),
+                "p95": _ms(self.percentile(0.95)),
+                "p99": _ms(self.percentile(0.99)),
+                "max": _ms(self.max_seconds),
+            },
+        }
+
+
+@dataclass
+class BulkCheckpoint:
+    """Tracks the contiguous completed prefix of the input file."""
+
+    path: Path
+    offset: int = 0
+    _completed: Dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "BulkCheckpoint":
+        if not path.exists():
+            return cls(path)
+        data = json.loads(path.read_text(encoding="utf-8") or "{}")
+        return cls(path, int(data.get("offset", 0)))
+
+    def complete(self, offset: int, next_offset: int) -> None:
+        self._completed[offset] = next_offset
+        while self.offset in self._completed:
+            self.offset = self._completed.pop(self.offset)
+
+    def save(self) -> None:
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(json.dumps({"offset": self.offset}), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+
+def run_bulk(
+    handle_query: QueryHandler,
+    input_path: str,
+    output_path: str,
+    workers: int = 4,
+    resume: bool = False,
+    query_field: str = "query",
+    checkpoint_every: int = 50,
+) -> Dict[str, Any]:
+    """Answer every query in `input_path` and return the run statistics."""
+    output = Path(output_path)
+    checkpoint_path = _checkpoint_path(output)
+    if resume:
+        checkpoint = BulkCheckpoint.load(checkpoint_path)
+        _drop_partial_line(output)
+        already_written = _written_offsets(output, checkpoint.offset)
+    else:
+        checkpoint = BulkCheckpoint(checkpoint_path)
+        already_written = set()
+    stats = LatencyStats()
+    max_in_flight = max(1, workers) * 2
+    started = time.perf_counter()
+
+    with open(input_path, "rb") as source, output.open("a" if resume else "w", encoding="utf-8") as sink:
+        source.seek(checkpoint.offset)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bulk") as executor:
+            pending: Dict[Future[Tuple[Dict[str, Any], float]], Tuple[int, int, Dict[str, Any]]] = {}
+            for offset, next_offset, item in _iter_items(source, checkpoint.offset, query_field):
+                if not item or offset in already_written:
+                    checkpoint.complete(offset, next_offset)
+                    continue
+                if "error" in item:
+                    _write_result(sink, offset, item, item["error"], 0.0, stats)
+                    checkpoint.complete(offset, next_offset)
+                    continue
+                pending[executor.submit(_timed, handle_query, item["query"])] = (offset, next_offset, item)
+                if len(pending) >= max_in_flight:
+                    _drain(pending, sink, checkpoint, stats, checkpoint_every, wait_all=False)
+            _drain(pending, sink, checkpoint, stats, checkpoint_every, wait_all=True)
+
+    checkpoint.save()
+    return stats.summary(time.perf_counter() - started)
+
+
+def _drain(
+    pending: Dict[Future[Tuple[Dict[str, Any], float]], Tuple[int, int, Dict[str, Any]]],
+    sink: TextIO,
+    checkpoint: BulkCheckpoint,
+    stats: LatencyStats,
+    checkpoint_every: int,
+    wait_all: bool,
+) -> None:
+    while pending:
+        done, _ = wait(pending, return_when=ALL_COMPLETED if wait_all else FIRST_COMPLETED)
+        for future in done:
+            offset, next_offset, item = pending.pop(future)
+            result, elapsed = future.result()
+            _write_result(sink, offset, item, result, elapsed, stats)
+            checkpoint.complete(offset, next_offset)
+            if stats.count % checkpoint_every == 0:
+                sink.flush()
+                checkpoint.save()
+        if not wait_all:
+            return
+
+
+def _timed(handle_query: QueryHandler, query: str) -> Tuple[Dict[str, Any], float]:
+    started = time.perf_counter()
+    try:
+        result = handle_query(query)
+    except Exception as exc:
+        result = {"status": "error", "decision": "bulk_error", "message": str(exc)}
+    return result, time.perf_counter() - started
+
+
+def _write_result(
+    sink: TextIO,
+    offset: int,
+    item: Dict[str, Any],
+    result: Dict[str, Any],
+    elapsed: float,
+    stats: LatencyStats,
+) -> None:
+    record: Dict[str, Any] = {"offset": offset, "result": result, "latency_ms": _ms(elapsed)}
+    if item.get("id") is not None:
+        record["id"] = item["id"]
+    sink.write(json.dumps(record, ensure_ascii=True, sort_keys=True, default=str) + "\n")
+    stats.record(elapsed, str(result.get("status", "unknown")))
+
+
+def _iter_items(
+    source: BinaryIO,
+    start_offset: int,
+    query_field: str,
+) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    offset = start_offset
+    for raw_line in source:
+        next_offset = offset + len(raw_line)
+        yield offset, next_offset, _parse_item(raw_line, query_field) if raw_line.strip() else {}
+        offset = next_offset
+
+
+def _parse_item(raw_line: bytes, query_field: str) -> Dict[str, Any]:
+    try:
+        value = json.loads(raw_line)
+    except ValueError:
+        return {"error": _input_error("Input line is not valid JSON.")}
+    if isinstance(value, str):
+        return {"query": value}
+    if not isinstance(value, dict) or not isinstance(value.get(query_field), str):
+        return {"error": _input_error(f"Input line has no string '{query_field}' field.")}
+    item_id = value.get("id", value.get("request_id"))
+    return {"query": value[query_field], "id": item_id}
+
+
+def _input_error(message: str) -> Dict[str, Any]:
+    return {"status": "error", "decision": "invalid_input", "message": message}
+
+
+def _written_offsets(output: Path, watermark: int) -> Set[int]:
+    """Offsets past the checkpoint that an interrupted run already wrote."""
+    if not output.exists():
+        return set()
+    offsets: Set[int] = set()
+    with output.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                offset = int(json.loads(line)["offset"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if offset >= watermark:
+                offsets.add(offset)
+    return offsets
+
+
+def _drop_partial_line(output: Path) -> None:
+    """Trim a result line cut short by an interruption before appending."""
+    if not output.exists():
+        return
+    with output.open("rb+") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            handle.seek(position - step)
+            block = handle.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != size:
+            handle.truncate(position)
+
+
+def _checkpoint_path(output: Path) -> Path:
+    return output.with_name(output.name + ".checkpoint")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+def print_summary(summary: Dict[str, Any], stream: TextIO = sys.stderr) -> None:
+    print(json.dumps({"bulk_summary": summary}, ensure_ascii=True, sort_keys=True), file=stream)
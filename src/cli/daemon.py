@@ -0,0 +1,124 @@
+"""Warm CLI daemon behind a Unix domain socket, plus its thin client.
+
+The protocol is newline-delimited JSON. Each request line is
+`{"query": "...", "include_debug": false}` and is answered with one line
+holding the agent response. A connection may carry several requests.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_SOCKET_PATH = "/tmp/tool-agent.sock"
+
+QueryHandler = Callable[[str, bool], Dict[str, Any]]
+
+
+class DaemonUnavailable(ConnectionError):
+    """Raised by the client when no daemon is listening on the socket."""
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "AgentDaemon"
+
+    def handle(self) -> None:
+        for raw_line in self.rfile:
+            if not raw_line.strip():
+                continue
+            response = self.server.answer(raw_line)
+            self.wfile.write(json.dumps(response, ensure_ascii=True, sort_keys=True, default=str).encode("utf-8"))
+            self.wfile.write(b"\n")
+            self.wfile.flush()
+
+
+class AgentDaemon(socketserver.ThreadingUnixStreamServer):
+    """Serves one warm agent runtime to many short-lived CLI clients."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, handle_query: QueryHandler) -> None:
+        _remove_stale_socket(socket_path)
+        self._handle_query = handle_query
+        self.socket_path = socket_path
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def answer(self, raw_line: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(raw_line)
+        except ValueError:
+            return _error("Request must be a JSON object.")
+        if not isinstance(request, dict) or not isinstance(request.get("query"), str):
+            return _error("Request must contain a string 'query'.")
+        try:
+            return self._handle_query(request["query"], bool(request.get("include_debug", False)))
+        except Exception as exc:
+            return _error(str(exc), decision="daemon_error")
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path: str, handle_query: QueryHandler) -> None:
+    """Run the daemon until interrupted or terminated."""
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+    with AgentDaemon(socket_path, handle_query) as daemon:
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def send_query(
+    query: str,
+    socket_path: str = DEFAULT_SOCKET_PATH,
+    include_debug: bool = False,
+    timeout_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Forward one query to a running daemon and return its JSON response."""
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(timeout_seconds)
+        connection.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError) as exc:
+        connection.close()
+        raise DaemonUnavailable(f"No agent daemon is listening on {socket_path}.") from exc
+
+    with connection, connection.makefile("rwb") as stream:
+        stream.write(json.dumps({"query": query, "include_debug": include_debug}).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise DaemonUnavailable(f"Agent daemon on {socket_path} closed the connection.")
+    return json.loads(line)
+
+
+def _exit_on_signal(signum: int, frame: Any) -> None:
+    raise SystemExit(0)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Another agent daemon is already listening on {socket_path}.")
+
+
+def _error(message: str, decision: str = "invalid_input") -> Dict[str, Any]:
+    return {"status": "error", "decision": decision, "message": message}
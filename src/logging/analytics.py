@@ -0,0 +1,331 @@
+"""Streaming analysis of the agent log: latency percentiles and failure rates.
+
+Entries are read one at a time (through `SegmentReader`, so sealed segments
+are included) and folded into fixed-size state: quantile sketches per
+decision and tool, bounded maps of in-flight requests, and a top-N heap of
+slow requests. Memory stays constant however large the log is.
+
+Values the payload policies replaced with `{"$ref": ...}` are resolved from
+the `payload_blob` entries seen earlier in the stream, kept in a bounded
+digest map; a reference whose blob is no longer known reads as unknown.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .policies import BLOB_EVENT
+from .segments import SegmentReader
+
+REPORT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Stands in for a `$ref` whose blob is not (or no longer) known.
+_UNRESOLVED = object()
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error.
+
+    Values fall into buckets whose bounds grow geometrically by `gamma`, so
+    any quantile is returned within `relative_accuracy` of the true value
+    and the bucket count depends only on the value range, not the count.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self._zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        if q >= 1.0:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                return min(2 * self._gamma**key / (self._gamma + 1), self.max)
+        return self.max
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zeros += other._zeros
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> Dict[str, float]:
+        result = {"count": self.count, "mean": round(self.total / self.count, 3) if self.count else 0.0}
+        for q in REPORT_QUANTILES:
+            result[f"p{round(q * 100)}"] = round(self.quantile(q), 3)
+        result["max"] = round(self.max, 3)
+        return result
+
+
+@dataclass
+class _Request:
+    started_at: float
+    query: Optional[str] = None
+    tool_starts: Dict[str, List[float]] = field(default_factory=dict)
+    fallback: bool = False
+    retries: int = 0
+
+
+@dataclass
+class _Rate:
+    total: int = 0
+    hits: int = 0
+
+    def add(self, hit: bool) -> None:
+        self.total += 1
+        self.hits += int(hit)
+
+    def to_dict(self) -> Dict[str, Any]:
+        rate = round(self.hits / self.total, 4) if self.total else 0.0
+        return {"total": self.total, "count": self.hits, "rate": rate}
+
+
+class LogAnalyzer:
+    """Fold log entries into latency, fallback, retry, and failure statistics.
+
+    Entries are correlated by `request_id`; entries without one are counted
+    but not timed. At most `max_open_requests` unfinished requests are kept;
+    the oldest is dropped (and counted) when more arrive. A retry storm is
+    `storm_threshold` or more `retry_attempt` entries within
+    `storm_window_seconds`. The last `max_blobs` blob values are kept to
+    resolve references; a tool output that cannot be resolved counts as
+    neither a success nor an error.
+    """
+
+    def __init__(
+        self,
+        top_n: int = 10,
+        max_open_requests: int = 10000,
+        storm_window_seconds: float = 10.0,
+        storm_threshold: int = 5,
+        relative_accuracy: float = 0.01,
+        max_blobs: int = 1024,
+    ) -> None:
+        self._top_n = top_n
+        self._max_open_requests = max(1, max_open_requests)
+        self._storm_window_seconds = storm_window_seconds
+        self._storm_threshold = max(1, storm_threshold)
+        self._relative_accuracy = relative_accuracy
+        self._max_blobs = max(1, max_blobs)
+        self._blobs: "OrderedDict[str, Any]" = OrderedDict()
+        self._unresolved = 0
+        self._open: "OrderedDict[str, _Request]" = OrderedDict()
+        self._decision_latency: Dict[str, QuantileSketch] = {}
+        self._tool_latency: Dict[str, QuantileSketch] = {}
+        self._tool_errors: Dict[str, _Rate] = {}
+        self._fallbacks: Dict[str, _Rate] = {}
+        self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._contextual = _Rate()
+        self._retries = 0
+        self._retry_window: Deque[float] = deque()
+        self._storms: List[Dict[str, Any]] = []
+        self._storm: Optional[Dict[str, Any]] = None
+        self._entries = 0
+        self._uncorrelated = 0
+        self._evicted = 0
+        self._first_ts: Optional[float] = None
+        self._last_ts: Optional[float] = None
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self._entries += 1
+        ts = float(entry.get("ts", 0.0))
+        self._first_ts = ts if self._first_ts is None else self._first_ts
+        self._last_ts = ts
+        event = entry.get("event")
+        payload = entry.get("payload") or {}
+        if event == BLOB_EVENT:
+            self._add_blob(payload)
+            return
+        payload = self._resolve(payload)
+        if not isinstance(payload, dict):
+            payload = {}
+        if event == "retry_attempt":
+            self._add_retry(ts)
+        elif event == "contextual_answer_generated":
+            self._contextual.add(False)
+        elif event == "contextual_answer_failed":
+            self._contextual.add(True)
+
+        request_id = entry.get("request_id")
+        if request_id is None:
+            self._uncorrelated += 1
+            return
+        request = self._open.get(request_id)
+        if request is None:
+            request = self._open_request(request_id, ts)
+
+        if event == "decision_made":
+            request.query = self._scalar(payload.get("query"))
+        elif event == "tool_input":
+            request.tool_starts.setdefault(str(self._scalar(payload.get("tool"))), []).append(ts)
+        elif event == "tool_output":
+            self._add_tool_output(request, payload, ts)
+        elif event in ("tool_timeout", "contextual_answer_failed"):
+            request.fallback = True
+        elif event == "retry_attempt":
+            request.retries += 1
+        elif event == "final_response":
+            self._finish(request_id, request, payload, ts)
+
+    def add_all(self, entries: Iterable[Dict[str, Any]]) -> "LogAnalyzer":
+        for entry in entries:
+            self.add(entry)
+        return self
+
+    def report(self) -> Dict[str, Any]:
+        storms = list(self._storms)
+        if self._storm is not None:
+            storms.append(dict(self._storm))
+        return {
+            "entries": self._entries,
+            "window": {"first_ts": self._first_ts, "last_ts": self._last_ts},
+            "requests": {
+                "completed": sum(rate.total for rate in self._fallbacks.values()),
+                "unfinished": len(self._open) + self._evicted,
+                "uncorrelated_entries": self._uncorrelated,
+            },
+            "decision_latency_ms": {name: sketch.summary() for name, sketch in sorted(self._decision_latency.items())},
+            "tool_latency_ms": {name: sketch.summary() for name, sketch in sorted(self._tool_latency.items())},
+            "tool_error_rates": {name: rate.to_dict() for name, rate in sorted(self._tool_errors.items())},
+            "fallback_rates": {name: rate.to_dict() for name, rate in sorted(self._fallbacks.items())},
+            "contextual_answer_failures": self._contextual.to_dict(),
+            "unresolved_refs": self._unresolved,
+            "retries": {"total": self._retries, "storms": storms},
+            "slowest_requests": [item for _, _, item in sorted(self._slowest, reverse=True)],
+        }
+
+    def _open_request(self, request_id: str, ts: float) -> _Request:
+        request = _Request(started_at=ts)
+        self._open[request_id] = request
+        if len(self._open) > self._max_open_requests:
+            self._open.popitem(last=False)
+            self._evicted += 1
+        return request
+
+    def _add_blob(self, payload: Dict[str, Any]) -> None:
+        digest = payload.get("digest")
+        if not isinstance(digest, str):
+            return
+        self._blobs[digest] = payload.get("value")
+        self._blobs.move_to_end(digest)
+        while len(self._blobs) > self._max_blobs:
+            self._blobs.popitem(last=False)
+
+    def _resolve(self, value: Any) -> Any:
+        """`value`, or the blob it references; `_UNRESOLVED` for an unknown digest."""
+        if not (isinstance(value, dict) and len(value) == 1 and isinstance(value.get("$ref"), str)):
+            return value
+        digest = value["$ref"]
+        if digest not in self._blobs:
+            self._unresolved += 1
+            return _UNRESOLVED
+        self._blobs.move_to_end(digest)
+        return self._blobs[digest]
+
+    def _scalar(self, value: Any) -> Any:
+        resolved = self._resolve(value)
+        return None if resolved is _UNRESOLVED else resolved
+
+    def _add_tool_output(self, request: _Request, payload: Dict[str, Any], ts: float) -> None:
+        tool = str(self._scalar(payload.get("tool")))
+        starts = request.tool_starts.get(tool)
+        if starts:
+            self._sketch(self._tool_latency, tool).add((ts - starts.pop(0)) * 1000)
+        output = self._resolve(payload.get("output"))
+        status = self._resolve(output.get("status")) if isinstance(output, dict) else None
+        if output is _UNRESOLVED or status is _UNRESOLVED:
+            return
+        failed = not isinstance(output, dict) or status != "ok"
+        self._tool_errors.setdefault(tool, _Rate()).add(failed)
+        request.fallback = request.fallback or failed
+
+    def _finish(self, request_id: str, request: _Request, payload: Dict[str, Any], ts: float) -> None:
+        del self._open[request_id]
+        decision = self._scalar(payload.get("decision"))
+        decision = "unknown" if decision is None else str(decision)
+        latency_ms = (ts - request.started_at) * 1000
+        self._sketch(self._decision_latency, decision).add(latency_ms)
+        self._fallbacks.setdefault(decision, _Rate()).add(request.fallback)
+
+        item = {
+            "request_id": request_id,
+            "decision": decision,
+            "status": self._scalar(payload.get("status")),
+            "query": request.query,
+            "latency_ms": round(latency_ms, 3),
+            "retries": request.retries,
+        }
+        ranked = (latency_ms, self._entries, item)
+        if len(self._slowest) < self._top_n:
+            heapq.heappush(self._slowest, ranked)
+        elif self._top_n and latency_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, ranked)
+
+    def _add_retry(self, ts: float) -> None:
+        self._retries += 1
+        window = self._retry_window
+        window.append(ts)
+        while window and ts - window[0] > self._storm_window_seconds:
+            window.popleft()
+        if len(window) > self._storm_threshold:
+            # Only the newest `storm_threshold` timestamps matter for detection.
+            window.popleft()
+        storm = self._storm
+        if storm is not None and ts - storm["end_ts"] > self._storm_window_seconds:
+            self._close_storm()
+            storm = None
+        if storm is not None:
+            storm["end_ts"] = ts
+            storm["retries"] += 1
+        elif len(window) >= self._storm_threshold:
+            self._storm = {"start_ts": window[0], "end_ts": ts, "retries": len(window)}
+
+    def _close_storm(self) -> None:
+        if self._storm is None:
+            return
+        self._storms.append(self._storm)
+        self._storm = None
+        if len(self._storms) > self._top_n:
+            self._storms.remove(min(self._storms, key=lambda storm: storm["retries"]))
+
+    def _sketch(self, sketches: Dict[str, QuantileSketch], name: str) -> QuantileSketch:
+        sketch = sketches.get(name)
+        if sketch is None:
+            sketch = sketches[name] = QuantileSketch(self._relative_accuracy)
+        return sketch
+
+
+def analyze_logs(paths: Iterable[str], **options: Any) -> Dict[str, Any]:
+    """Stream every entry of each log (and its sealed segments) into one report."""
+    analyzer = LogAnalyzer(**options)
+    for path in paths:
+        analyzer.add_all(SegmentReader(Path(path)).scan())
+    return analyzer.report()
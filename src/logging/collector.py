@@ -0,0 +1,291 @@
+"""Central log collector behind a Unix domain socket, plus its worker client.
+
+When several API workers run, one collector process owns the JSONL file, its
+segments, and the history ring; workers ship entries to it with
+`CollectorLogger`, and `/logs` queries go to the collector so every worker
+sees the same global history.
+
+The protocol is newline-delimited JSON. Each line has an `op`:
+
+- `log`: `{"op": "log", "event": ..., "payload": ..., "request_id": ...}`,
+  not answered
+- `query`: the `AgentLogger.query` arguments, answered with one page
+- `history`: answered with `{"entries": [...]}`
+- `stats`: answered with the log file path and writer and policy stats
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.services.tracing import current_trace
+
+from .logger import AgentLogger
+from .writer import BufferedLogWriter
+
+DEFAULT_COLLECTOR_SOCKET = "/tmp/tool-agent-logs.sock"
+_QUERY_ARGS = ("cursor", "limit", "event", "request_id", "since")
+
+
+class CollectorUnavailable(ConnectionError):
+    """Raised by the client when no collector is listening on the socket."""
+
+
+class _CollectorHandler(socketserver.StreamRequestHandler):
+    server: "LogCollector"
+
+    def handle(self) -> None:
+        for raw_line in self.rfile:
+            if not raw_line.strip():
+                continue
+            response = self.server.answer(raw_line)
+            if response is None:
+                continue
+            self.wfile.write(json.dumps(response, ensure_ascii=True, sort_keys=True, default=str).encode("utf-8"))
+            self.wfile.write(b"\n")
+            self.wfile.flush()
+
+
+class LogCollector(socketserver.ThreadingUnixStreamServer):
+    """Records entries from many worker processes into one `AgentLogger`."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, logger: AgentLogger) -> None:
+        _remove_stale_socket(socket_path)
+        self.logger = logger
+        self.socket_path = socket_path
+        self.rejected = 0
+        super().__init__(socket_path, _CollectorHandler)
+        os.chmod(socket_path, 0o600)
+
+    def answer(self, raw_line: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            request = json.loads(raw_line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            self.rejected += 1
+            return None
+        op = request.get("op")
+        if op == "log":
+            if isinstance(request.get("event"), str) and isinstance(request.get("payload"), dict):
+                self.logger.log(request["event"], request["payload"], request_id=request.get("request_id"))
+            else:
+                self.rejected += 1
+            return None
+        try:
+            if op == "query":
+                return self.logger.query(**{key: request[key] for key in _QUERY_ARGS if key in request})
+            if op == "history":
+                return {"entries": self.logger.get_history()}
+            if op == "stats":
+                return {**self.logger.stats(), "rejected": self.rejected}
+        except (TypeError, ValueError) as exc:
+            return {"status": "error", "message": str(exc)}
+        return {"status": "error", "message": f"Unknown op {op!r}."}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve_collector(socket_path: str, logger: AgentLogger) -> None:
+    """Run the collector until interrupted or terminated, then flush the log."""
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+    with LogCollector(socket_path, logger) as collector:
+        try:
+            collector.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            logger.close()
+
+
+class _SocketSink:
+    """`BufferedLogWriter` sink that forwards batches to the collector."""
+
+    def __init__(self, socket_path: str, timeout_seconds: float) -> None:
+        self._socket_path = socket_path
+        self._timeout_seconds = timeout_seconds
+        self._connection: Optional[socket.socket] = None
+        self.lost_lines = 0
+
+    def write(self, chunk: str) -> None:
+        data = chunk.encode("utf-8")
+        # One reconnect attempt per batch; a collector restart loses at most
+        # the batch that was in flight.
+        for _ in range(2):
+            try:
+                if self._connection is None:
+                    self._connection = _connect(self._socket_path, self._timeout_seconds)
+                self._connection.sendall(data)
+                return
+            except OSError:
+                self._disconnect()
+        self.lost_lines += chunk.count("\n")
+
+    def flush(self, fsync: bool = False) -> None:
+        pass
+
+    def close(self) -> None:
+        """Wait until the collector has read everything sent, then disconnect."""
+        if self._connection is not None:
+            # Lines on one connection are handled in order, so the answer to
+            # a `stats` request means every earlier `log` line was recorded.
+            try:
+                self._connection.sendall(b'{"op": "stats"}\n')
+                with self._connection.makefile("rb") as stream:
+                    stream.readline()
+            except OSError:
+                pass
+        self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class CollectorLogger:
+    """Drop-in `AgentLogger` replacement for worker processes.
+
+    `log` stamps the active trace's request ID and enqueues; a background
+    `BufferedLogWriter` sends batches over one persistent connection.
+    Reads (`query`, `get_history`, stats) are answered by the collector and
+    raise `CollectorUnavailable` when it is not running.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_COLLECTOR_SOCKET,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 1.0,
+        timeout_seconds: float = 5.0,
+    ) -> None:
+        self.socket_path = socket_path
+        self._timeout_seconds = timeout_seconds
+        self._sink = _SocketSink(socket_path, timeout_seconds)
+        self._writer = BufferedLogWriter(
+            self._sink,
+            queue_size=queue_size,
+            batch_size=batch_size,
+            flush_bytes=0,
+            flush_interval_seconds=flush_interval_seconds,
+        )
+
+    def log(self, event: str, payload: Dict[str, Any]) -> None:
+        trace = current_trace()
+        # Shallow copy: callers may add keys to the payload after logging it.
+        self._writer.submit(
+            {
+                "op": "log",
+                "event": event,
+                "payload": dict(payload),
+                "request_id": trace.request_id if trace is not None else None,
+            }
+        )
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        return self.get_history()
+
+    def get_history(self) -> List[Dict[str, Any]]:
+        return self._request({"op": "history"})["entries"]
+
+    def query(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+        event: Optional[str] = None,
+        request_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        response = self._request(
+            {
+                "op": "query",
+                "cursor": cursor,
+                "limit": limit,
+                "event": event,
+                "request_id": request_id,
+                "since": since,
+            }
+        )
+        if response.get("status") == "error":
+            raise ValueError(response["message"])
+        return response
+
+    def get_log_file_path(self) -> str:
+        return self.stats()["log_file"]
+
+    def writer_stats(self) -> Dict[str, Any]:
+        """This worker's send queue, plus the collector's file writer."""
+        return self.stats()["writer"]
+
+    def policy_stats(self) -> Dict[str, Any]:
+        return self.stats()["policies"]
+
+    def stats(self) -> Dict[str, Any]:
+        """Everything `/logs` reports besides the page, from one collector round trip."""
+        collector = self._request({"op": "stats"})
+        return {
+            "log_file": collector["log_file"],
+            "writer": {**self._writer.stats(), "lost": self._sink.lost_lines, "collector": collector["writer"]},
+            "policies": collector["policies"],
+        }
+
+    def close(self) -> None:
+        """Send queued entries, wait for the collector to record them, and disconnect."""
+        self._writer.close()
+        self._sink.close()
+
+    def _request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            connection = _connect(self.socket_path, self._timeout_seconds)
+        except OSError as exc:
+            raise CollectorUnavailable(f"No log collector is listening on {self.socket_path}.") from exc
+        with connection, connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request, ensure_ascii=True).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+        if not line:
+            raise CollectorUnavailable(f"Log collector on {self.socket_path} closed the connection.")
+        return json.loads(line)
+
+
+def _connect(socket_path: str, timeout_seconds: float) -> socket.socket:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout_seconds)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def _exit_on_signal(signum: int, frame: Any) -> None:
+    raise SystemExit(0)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Another log collector is already listening on {socket_path}.")
@@ -0,0 +1,148 @@
+"""Bounded in-memory log history plus a sparse index into the JSONL file."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+# (seq, ts, byte offset) of every `every`-th line in the file.
+IndexPoint = Tuple[int, float, int]
+
+
+class LogHistory:
+    """Fixed-capacity ring of the most recent log entries."""
+
+    def __init__(self, capacity: int) -> None:
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._entries)
+
+    def oldest_seq(self) -> Optional[int]:
+        with self._lock:
+            return self._entries[0]["seq"] if self._entries else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LogFileIndex:
+    """Sparse seq/timestamp -> byte offset index over an append-only JSONL file.
+
+    Only every `every`-th line is parsed while indexing, so a lookup seeks to
+    the nearest preceding point and scans at most `every` lines to get there.
+    The index is extended lazily from where it stopped on each lookup.
+    """
+
+    def __init__(self, path: Path, every: int = 256) -> None:
+        self._path = Path(path)
+        self._every = max(1, every)
+        self._points: List[IndexPoint] = []
+        self._indexed_offset = 0
+        self._lines_since_point = 0
+        self._inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def last_seq(self) -> int:
+        """Return the highest `seq` in the file, reading only its tail."""
+        try:
+            with self._path.open("rb") as handle:
+                handle.seek(0, os.SEEK_END)
+                size = handle.tell()
+                handle.seek(max(0, size - 64 * 1024))
+                tail = handle.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        for raw_line in reversed(tail):
+            entry = parse_entry(raw_line)
+            if entry is not None:
+                return int(entry["seq"])
+        return 0
+
+    def scan(
+        self,
+        after_seq: Optional[int] = None,
+        since: Optional[float] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield entries with `seq > after_seq` and `ts >= since`, in file order."""
+        offset = self._start_offset(after_seq, since)
+        try:
+            handle = self._path.open("rb")
+        except FileNotFoundError:
+            return
+        with handle:
+            handle.seek(offset)
+            for raw_line in handle:
+                if not raw_line.endswith(b"\n"):
+                    return
+                entry = parse_entry(raw_line)
+                if entry is None:
+                    continue
+                if after_seq is not None and entry["seq"] <= after_seq:
+                    continue
+                if since is not None and entry.get("ts", 0.0) < since:
+                    continue
+                yield entry
+
+    def _start_offset(self, after_seq: Optional[int], since: Optional[float]) -> int:
+        with self._lock:
+            self._extend()
+            points = list(self._points)
+        if not points:
+            return 0
+        if after_seq is not None:
+            position = bisect.bisect_right([point[0] for point in points], after_seq) - 1
+        elif since is not None:
+            position = bisect.bisect_left([point[1] for point in points], since) - 1
+        else:
+            position = 0
+        return points[max(0, position)][2]
+
+    def _extend(self) -> None:
+        try:
+            handle = self._path.open("rb")
+        except FileNotFoundError:
+            return
+        with handle:
+            stat = os.fstat(handle.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._indexed_offset:
+                # The file was rotated or truncated; start over.
+                self._inode = stat.st_ino
+                self._points = []
+                self._indexed_offset = 0
+                self._lines_since_point = 0
+            handle.seek(self._indexed_offset)
+            offset = self._indexed_offset
+            for raw_line in handle:
+                if not raw_line.endswith(b"\n"):
+                    break
+                if self._lines_since_point == 0 or self._lines_since_point >= self._every:
+                    entry = parse_entry(raw_line)
+                    if entry is not None:
+                        self._points.append((int(entry["seq"]), float(entry.get("ts", 0.0)), offset))
+                        self._lines_since_point = 0
+                self._lines_since_point += 1
+                offset += len(raw_line)
+            self._indexed_offset = offset
+
+
+def parse_entry(raw_line: Union[bytes, str]) -> Optional[Dict[str, Any]]:
+    """Decode one line; lines without a `seq` (older formats) are skipped."""
+    try:
+        entry = json.loads(raw_line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("seq"), int):
+        return None
+    return entry
@@ -2,20 +2,55 @@
 
 from __future__ import annotations
 
+import itertools
 import json
 import logging
+import threading
+import time
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from src.services.tracing import current_trace
+
+from .history import LogHistory
+from .policies import BLOB_EVENT, PayloadPolicies
+from .segments import RotationPolicy, SegmentedLogFile, SegmentReader
+from .writer import BufferedLogWriter
+
+MAX_PAGE_SIZE = 1000
 
 
 @dataclass
 class AgentLogger:
-    """Small wrapper that emits structured log entries and keeps history."""
+    """Small wrapper that emits structured log entries and keeps history.
+
+    Only the last `max_entries` entries stay in memory; older ones are read
+    back from the JSONL file by `query`. Every entry carries a `seq` that
+    keeps increasing across restarts, a wall-clock `ts`, and the `request_id`
+    of the active trace, if any.
+
+    The file is rotated into compressed, indexed segments by `rotation`
+    (see `src.logging.segments`). With `buffered`, serialization and file
+    writes move to a background `BufferedLogWriter`; `log` then only records
+    history and enqueues.
+
+    `policies` shrinks verbose payloads per event before they are recorded:
+    long strings are truncated, large repeated values are stored once as a
+    `payload_blob` entry and referenced by digest, and sampled-out entries
+    are skipped (see `src.logging.policies`).
+    """
 
     name: str = "tool_agent"
     file_path: str = "logs/agent_history.jsonl"
-    entries: List[Dict[str, Any]] = field(default_factory=list)
+    max_entries: int = 10000
+    buffered: bool = False
+    queue_size: int = 10000
+    batch_size: int = 256
+    flush_interval_seconds: float = 1.0
+    fsync: bool = False
+    rotation: RotationPolicy = field(default_factory=RotationPolicy)
+    policies: Optional[PayloadPolicies] = None
 
     def __post_init__(self) -> None:
         self._logger = logging.getLogger(self.name)
@@ -28,17 +63,160 @@ class AgentLogger:
         self._logger.propagate = False
         self._log_path = Path(self.file_path)
         self._log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._history = LogHistory(self.max_entries)
+        self._segments = SegmentReader(self._log_path)
+        self._seq = itertools.count(self._segments.last_seq() + 1)
+        # Blobs are written once per segment: a new segment must not reference
+        # blobs that retention may delete along with an older one.
+        self._file = SegmentedLogFile(
+            self._log_path,
+            self.rotation,
+            on_rotate=self.policies.forget_blobs if self.policies is not None else None,
+        )
+        self._writer: Optional[BufferedLogWriter] = None
+        if self.buffered:
+            self._writer = BufferedLogWriter(
+                self._file,
+                emit=self._logger.info,
+                queue_size=self.queue_size,
+                batch_size=self.batch_size,
+                flush_interval_seconds=self.flush_interval_seconds,
+                fsync=self.fsync,
+            )
 
-    def log(self, event: str, payload: Dict[str, Any]) -> None:
-        entry = {"event": event, "payload": payload}
-        self.entries.append(entry)
+    def log(self, event: str, payload: Dict[str, Any], request_id: Optional[str] = None) -> None:
+        """Record one entry; `request_id` defaults to the active trace's."""
+        blobs: List[Dict[str, Any]] = []
+        if self.policies is not None:
+            shaped, blobs = self.policies.apply(event, payload)
+            if shaped is None:
+                return
+            payload = shaped
+        if request_id is None:
+            trace = current_trace()
+            request_id = trace.request_id if trace is not None else None
+        # One lock keeps `seq` order identical in memory and in the file.
+        with self._lock:
+            for blob in blobs:
+                self._record(BLOB_EVENT, blob, request_id)
+            self._record(event, payload, request_id)
+
+    def _record(self, event: str, payload: Dict[str, Any], request_id: Optional[str]) -> None:
+        entry = {
+            "seq": next(self._seq),
+            "ts": round(time.time(), 6),
+            "event": event,
+            "request_id": request_id,
+            "payload": payload,
+        }
+        if self.policies is not None and self.policies.sample_rate(event) < 1.0:
+            entry["sample_rate"] = self.policies.sample_rate(event)
+        self._history.append(entry)
+        if self._writer is not None:
+            # Shallow copy: callers may add keys to the payload after logging it.
+            submitted = self._writer.submit({**entry, "payload": dict(payload)})
+            if not submitted and event == BLOB_EVENT and self.policies is not None:
+                self.policies.forget_blobs([payload["digest"]])
+            return
         serialized = json.dumps(entry, ensure_ascii=True, sort_keys=True)
         self._logger.info(serialized)
-        with self._log_path.open("a", encoding="utf-8") as handle:
-            handle.write(serialized + "\n")
+        self._file.write(serialized + "\n")
+        self._file.flush(fsync=self.fsync)
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        return self._history.snapshot()
 
     def get_history(self) -> List[Dict[str, Any]]:
-        return list(self.entries)
+        return self._history.snapshot()
+
+    def query(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+        event: Optional[str] = None,
+        request_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Return one page of entries in `seq` order.
+
+        `cursor` returns entries after that `seq`, `since` those at or after a
+        Unix timestamp. With neither, the newest `limit` entries are returned.
+        Pages reaching back past the in-memory ring are read from the log
+        segments on disk.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        ring = self._history.snapshot()
+
+        def matches(entry: Dict[str, Any]) -> bool:
+            return (event is None or entry["event"] == event) and (
+                request_id is None or entry.get("request_id") == request_id
+            )
+
+        if cursor is None and since is None:
+            page = [entry for entry in ring if matches(entry)][-limit:]
+            return _page(page, has_more=False, cursor=ring[-1]["seq"] if ring else None)
+
+        page: List[Dict[str, Any]] = []
+        after = cursor
+        if ring and _reaches_before(ring[0], cursor, since):
+            for entry in self._segments.scan(after_seq=cursor, since=since, event=event, request_id=request_id):
+                if entry["seq"] >= ring[0]["seq"]:
+                    break
+                after = entry["seq"]
+                if matches(entry):
+                    page.append(entry)
+                    if len(page) == limit:
+                        return _page(page, has_more=True, cursor=after)
+
+        for entry in ring:
+            if after is not None and entry["seq"] <= after:
+                continue
+            if since is not None and entry["ts"] < since:
+                continue
+            after = entry["seq"]
+            if matches(entry):
+                page.append(entry)
+                if len(page) == limit:
+                    return _page(page, has_more=entry is not ring[-1], cursor=after)
+        return _page(page, has_more=False, cursor=after)
 
     def get_log_file_path(self) -> str:
         return str(self._log_path)
+
+    def writer_stats(self) -> Dict[str, Any]:
+        """Queue depth and drop counters of the buffered writer, if enabled."""
+        if self._writer is None:
+            return {}
+        return self._writer.stats()
+
+    def policy_stats(self) -> Dict[str, Any]:
+        """Sampling, truncation, and deduplication counters, if policies are set."""
+        if self.policies is None:
+            return {}
+        return self.policies.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Log file path, writer stats, and policy stats in one call."""
+        return {
+            "log_file": self.get_log_file_path(),
+            "writer": self.writer_stats(),
+            "policies": self.policy_stats(),
+        }
+
+    def close(self) -> None:
+        """Flush buffered entries to disk and stop the writer thread."""
+        if self._writer is not None:
+            self._writer.close()
+        self._file.close()
+
+
+def _reaches_before(oldest: Dict[str, Any], cursor: Optional[int], since: Optional[float]) -> bool:
+    if cursor is not None:
+        return cursor + 1 < oldest["seq"]
+    return since is not None and since < oldest["ts"]
+
+
+def _page(entries: List[Dict[str, Any]], has_more: bool, cursor: Optional[int]) -> Dict[str, Any]:
+    return {"entries": entries, "count": len(entries), "next_cursor": cursor, "has_more": has_more}
@@ -0,0 +1,204 @@
+"""Per-event payload policies: truncation, deduplication, and sampling.
+
+Large values that repeat across events (tool records, the proposed answer,
+the final message) are stored once as a `payload_blob` entry and referenced
+elsewhere as `{"$ref": "sha256:<digest>"}`. The payload itself, any dict
+carrying an identifying key (`status`, `decision`, `tool`, `source`,
+`query`), and those keys' values are never replaced, so every entry still
+says what it is without resolving blobs. A digest is forgotten when its
+blob entry is dropped or the log segment rotates, so the next occurrence
+writes the blob again. Refusals and error events are never truncated,
+deduplicated, or sampled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+BLOB_EVENT = "payload_blob"
+ALWAYS_KEEP_EVENTS = frozenset({"refusal_decision", "tool_timeout", "contextual_answer_failed"})
+_ERROR_STATUSES = frozenset({"error", "refused"})
+# Keys that identify an entry or a tool result; kept inline by deduplication.
+INLINE_KEYS = frozenset({"status", "decision", "tool", "source", "query"})
+
+
+@dataclass(frozen=True)
+class EventPolicy:
+    """How one event type is shrunk before it is logged.
+
+    `max_field_chars` truncates long strings, `dedupe_min_chars` replaces
+    values at least that large (as JSON) with a digest reference,
+    `sample_rate` keeps that share of entries, and `max_per_second` caps how
+    many are kept per second. `None` disables a rule.
+    """
+
+    max_field_chars: Optional[int] = None
+    dedupe_min_chars: Optional[int] = None
+    sample_rate: float = 1.0
+    max_per_second: Optional[float] = None
+
+
+DEFAULT_EVENT_POLICIES: Dict[str, EventPolicy] = {
+    "tool_output": EventPolicy(max_field_chars=2000, dedupe_min_chars=512),
+    "risk_evaluated": EventPolicy(max_field_chars=1000, dedupe_min_chars=512),
+    "final_response": EventPolicy(max_field_chars=2000, dedupe_min_chars=512),
+    "contextual_answer_generated": EventPolicy(max_field_chars=2000, dedupe_min_chars=512),
+}
+
+
+class PayloadPolicies:
+    """Applies `EventPolicy` rules and remembers which blobs were stored."""
+
+    def __init__(
+        self,
+        policies: Optional[Mapping[str, EventPolicy]] = None,
+        max_known_blobs: int = 4096,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._policies = dict(DEFAULT_EVENT_POLICIES if policies is None else policies)
+        self._max_known_blobs = max(1, max_known_blobs)
+        self._known_blobs: "OrderedDict[str, None]" = OrderedDict()
+        self._rng = rng
+        self._clock = clock
+        self._windows: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._sampled_out: Dict[str, int] = {}
+        self._truncated = 0
+        self._deduplicated = 0
+
+    def apply(self, event: str, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return the payload to log (None when sampled out) and new blob payloads."""
+        policy = self._policies.get(event)
+        if policy is None or must_keep(event, payload):
+            return payload, []
+        if not self._sampled_in(event, policy):
+            return None, []
+
+        blobs: List[Dict[str, Any]] = []
+        shaped = payload
+        if policy.dedupe_min_chars is not None:
+            shaped, _ = self._dedupe(shaped, policy.dedupe_min_chars, blobs, pinned=True)
+        if policy.max_field_chars is not None:
+            shaped = self._truncate(shaped, policy.max_field_chars)
+        return shaped, blobs
+
+    def forget_blobs(self, digests: Optional[List[str]] = None) -> None:
+        """Forget `digests` (all when None), e.g. after their blob was dropped or rotated out."""
+        with self._lock:
+            if digests is None:
+                self._known_blobs.clear()
+                return
+            for digest in digests:
+                self._known_blobs.pop(digest, None)
+
+    def sample_rate(self, event: str) -> float:
+        policy = self._policies.get(event)
+        return 1.0 if policy is None else policy.sample_rate
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sampled_out": dict(self._sampled_out),
+                "truncated": self._truncated,
+                "deduplicated": self._deduplicated,
+                "known_blobs": len(self._known_blobs),
+            }
+
+    def _sampled_in(self, event: str, policy: EventPolicy) -> bool:
+        keep = policy.sample_rate >= 1.0 or self._rng() < policy.sample_rate
+        if keep and policy.max_per_second is not None:
+            second = int(self._clock())
+            with self._lock:
+                window, count = self._windows.get(event, (second, 0))
+                if window != second:
+                    window, count = second, 0
+                keep = count < policy.max_per_second
+                self._windows[event] = (window, count + 1 if keep else count)
+        if not keep:
+            with self._lock:
+                self._sampled_out[event] = self._sampled_out.get(event, 0) + 1
+        return keep
+
+    def _dedupe(
+        self,
+        value: Any,
+        min_chars: int,
+        blobs: List[Dict[str, Any]],
+        pinned: bool = False,
+    ) -> Tuple[Any, str]:
+        """Replace the smallest values of at least `min_chars` with references.
+
+        A `pinned` value, or a dict with an `INLINE_KEYS` key, is never itself
+        replaced; only its children can be. Returns the shaped value and the
+        original's JSON, which each level assembles from its children's so
+        nothing is encoded twice.
+        """
+        children: Any
+        if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+            pinned = pinned or not INLINE_KEYS.isdisjoint(value)
+            children, encoded = {}, {}
+            for key, child in value.items():
+                children[key], encoded[key] = self._dedupe(child, min_chars, blobs, pinned=key in INLINE_KEYS)
+            serialized = "{" + ", ".join(f"{_serialize(key)}: {encoded[key]}" for key in sorted(encoded)) + "}"
+            changed = any(children[key] is not value[key] for key in value)
+        elif isinstance(value, list):
+            pairs = [self._dedupe(child, min_chars, blobs) for child in value]
+            children = [child for child, _ in pairs]
+            serialized = "[" + ", ".join(encoded_child for _, encoded_child in pairs) + "]"
+            changed = any(new is not old for new, old in zip(children, value))
+        else:
+            serialized = _serialize(value)
+            children, changed = value, False
+        if changed:
+            return children, serialized
+        if pinned or len(serialized) < min_chars:
+            return value, serialized
+
+        digest = "sha256:" + hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        with self._lock:
+            known = digest in self._known_blobs
+            self._known_blobs[digest] = None
+            self._known_blobs.move_to_end(digest)
+            while len(self._known_blobs) > self._max_known_blobs:
+                self._known_blobs.popitem(last=False)
+            self._deduplicated += int(known)
+        if not known:
+            blobs.append({"digest": digest, "value": value})
+        return {"$ref": digest}, serialized
+
+    def _truncate(self, value: Any, max_chars: int) -> Any:
+        if isinstance(value, str):
+            if len(value) <= max_chars:
+                return value
+            with self._lock:
+                self._truncated += 1
+            return f"{value[:max_chars]}...[truncated {len(value) - max_chars} chars]"
+        if isinstance(value, dict):
+            if "$ref" in value:
+                return value
+            return {key: self._truncate(child, max_chars) for key, child in value.items()}
+        if isinstance(value, list):
+            return [self._truncate(child, max_chars) for child in value]
+        return value
+
+
+def must_keep(event: str, payload: Dict[str, Any]) -> bool:
+    """Refusals and errors are always logged in full."""
+    if event in ALWAYS_KEEP_EVENTS or event.endswith("_error") or event.endswith("_failed"):
+        return True
+    for candidate in (payload, payload.get("output"), payload.get("result")):
+        if isinstance(candidate, dict) and (candidate.get("status") in _ERROR_STATUSES or "error" in candidate):
+            return True
+    return False
+
+
+def _serialize(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=True, sort_keys=True, default=str)
@@ -0,0 +1,440 @@
+"""Size- and time-rotated JSONL log segments with compressed, indexed archives.
+
+For `logs/agent_history.jsonl` the layout is:
+
+- `agent_history.jsonl`: the active segment, appended to in place.
+- `agent_history.<first seq>.jsonl`: a sealed segment waiting for compression.
+- `agent_history.<first seq>.jsonl.gz` (or `.xz`): the compressed segment,
+  written as one independent compressed member per block of entries.
+- `agent_history.<first seq>.idx.json`: the block index. It holds each
+  block's compressed byte offset, first seq and timestamp, plus the blocks
+  that contain each request ID and event.
+
+Readers use the index to decompress only the blocks a query can match.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import lzma
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .history import LogFileIndex, parse_entry
+
+# name suffix, compress, decompress
+CODECS: Dict[str, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (".gz", gzip.compress, gzip.decompress),
+    "xz": (".xz", lzma.compress, lzma.decompress),
+}
+
+INDEX_VERSION = 1
+# Block indexes a SegmentReader keeps parsed, most recently used last.
+MAX_CACHED_INDEXES = 64
+
+
+@dataclass(frozen=True)
+class RotationPolicy:
+    """When to seal the active segment and how long to keep sealed ones.
+
+    A zero limit disables that rule.
+    """
+
+    max_bytes: int = 64 * 1024 * 1024
+    max_age_seconds: float = 86400.0
+    retention_segments: int = 0
+    retention_seconds: float = 0.0
+    compression: str = "gzip"
+    block_entries: int = 256
+
+
+@dataclass(frozen=True)
+class Segment:
+    first_seq: int
+    data_path: Path
+    index_path: Path
+    compressed: bool
+
+
+class SegmentedLogFile:
+    """Append-only writer for the active segment that rotates it by policy.
+
+    Sealed segments are compressed and indexed on a background thread, after
+    which the retention policy is applied. `on_rotate` is called under the
+    write lock each time a new active segment is opened.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        policy: Optional[RotationPolicy] = None,
+        compress_in_background: bool = True,
+        on_rotate: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.on_rotate = on_rotate
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.policy = policy or RotationPolicy()
+        if self.policy.compression != "none" and self.policy.compression not in CODECS:
+            raise ValueError(f"Unsupported log compression '{self.policy.compression}'.")
+        self._compress_in_background = compress_in_background
+        self._lock = threading.Lock()
+        self._sealers: List[threading.Thread] = []
+        self._open_active()
+        for segment in list_segments(self.path):
+            if not segment.compressed:
+                self._seal_later(segment.data_path)
+
+    def write(self, chunk: str) -> None:
+        """Append serialized lines; `chunk` must end with a newline."""
+        with self._lock:
+            if self._first_seq is None:
+                self._first_seq, self._opened_at = _first_entry_position(chunk.splitlines()[0:1], self._opened_at)
+            self._handle.write(chunk)
+            # Entries are serialized with ensure_ascii, so characters are bytes.
+            self._size += len(chunk)
+            if self._rotation_due():
+                self._rotate()
+
+    def flush(self, fsync: bool = False) -> None:
+        with self._lock:
+            self._handle.flush()
+            if fsync:
+                os.fsync(self._handle.fileno())
+
+    def rotate(self) -> None:
+        """Seal the active segment now, if it holds anything."""
+        with self._lock:
+            if self._size:
+                self._rotate()
+
+    def wait_for_sealing(self, timeout_seconds: Optional[float] = None) -> None:
+        for thread in list(self._sealers):
+            thread.join(timeout_seconds)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.flush()
+                self._handle.close()
+        self.wait_for_sealing()
+
+    def _open_active(self) -> None:
+        self._handle = self.path.open("a", encoding="utf-8")
+        self._size = self.path.stat().st_size
+        self._opened_at = time.time()
+        self._first_seq: Optional[int] = None
+        if self._size:
+            with self.path.open("rb") as handle:
+                head = [handle.readline() for _ in range(16)]
+            self._first_seq, self._opened_at = _first_entry_position(head, self._opened_at)
+
+    def _rotation_due(self) -> bool:
+        policy = self.policy
+        if not self._size:
+            return False
+        if policy.max_bytes and self._size >= policy.max_bytes:
+            return True
+        return bool(policy.max_age_seconds) and time.time() - self._opened_at >= policy.max_age_seconds
+
+    def _rotate(self) -> None:
+        self._handle.close()
+        sealed = self.path.with_name(f"{self.path.stem}.{self._first_seq or 0:012d}{self.path.suffix}")
+        os.replace(self.path, sealed)
+        self._open_active()
+        if self.on_rotate is not None:
+            self.on_rotate()
+        self._seal_later(sealed)
+
+    def _seal_later(self, sealed: Path) -> None:
+        if not self._compress_in_background:
+            self._seal(sealed)
+            return
+        self._sealers = [thread for thread in self._sealers if thread.is_alive()]
+        thread = threading.Thread(target=self._seal, args=(sealed,), name="agent-log-sealer", daemon=True)
+        self._sealers.append(thread)
+        thread.start()
+
+    def _seal(self, sealed: Path) -> None:
+        if self.policy.compression != "none":
+            compress_segment(sealed, self.policy.compression, self.policy.block_entries)
+        apply_retention(self.path, self.policy)
+
+
+class SegmentReader:
+    """Reads entries back across sealed segments and the active file."""
+
+    def __init__(self, path: Path, max_cached_indexes: int = MAX_CACHED_INDEXES) -> None:
+        self.path = Path(path)
+        self.max_cached_indexes = max(1, max_cached_indexes)
+        self._active = LogFileIndex(self.path)
+        self._indexes: "OrderedDict[Path, Dict[str, Any]]" = OrderedDict()
+        self._indexes_lock = threading.Lock()
+
+    def last_seq(self) -> int:
+        last_seq = self._active.last_seq()
+        if last_seq:
+            return last_seq
+        for segment in reversed(self._segments()):
+            if segment.compressed:
+                index = self._load_index(segment)
+                if index is not None and index["last_seq"] is not None:
+                    return int(index["last_seq"])
+            else:
+                last_seq = LogFileIndex(segment.data_path).last_seq()
+                if last_seq:
+                    return last_seq
+        return 0
+
+    def scan(
+        self,
+        after_seq: Optional[int] = None,
+        since: Optional[float] = None,
+        event: Optional[str] = None,
+        request_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield entries with `seq > after_seq` and `ts >= since` in seq order.
+
+        `event` and `request_id` only let compressed segments skip blocks that
+        cannot match; callers still filter the yielded entries.
+        """
+        for segment in self._segments():
+            if segment.compressed:
+                index = self._load_index(segment)
+                if index is None:
+                    continue
+                yield from _scan_compressed(segment, index, after_seq, since, event, request_id)
+            else:
+                yield from LogFileIndex(segment.data_path).scan(after_seq=after_seq, since=since)
+        yield from self._active.scan(after_seq=after_seq, since=since)
+
+    def _segments(self) -> List[Segment]:
+        """List segments and forget cached indexes of any that retention deleted."""
+        segments = list_segments(self.path)
+        live = {segment.index_path for segment in segments if segment.compressed}
+        with self._indexes_lock:
+            for index_path in [index_path for index_path in self._indexes if index_path not in live]:
+                del self._indexes[index_path]
+        return segments
+
+    def _load_index(self, segment: Segment) -> Optional[Dict[str, Any]]:
+        with self._indexes_lock:
+            index = self._indexes.get(segment.index_path)
+            if index is not None:
+                self._indexes.move_to_end(segment.index_path)
+                return index
+        try:
+            index = json.loads(segment.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        with self._indexes_lock:
+            self._indexes[segment.index_path] = index
+            while len(self._indexes) > self.max_cached_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+
+def list_segments(active_path: Path) -> List[Segment]:
+    """Return sealed segments of `active_path`, oldest first.
+
+    A compressed segment only counts once its index exists; until then the
+    plain sealed file is used.
+    """
+    active_path = Path(active_path)
+    pattern = re.compile(
+        re.escape(active_path.stem) + r"\.(\d+)" + re.escape(active_path.suffix) + r"(\.gz|\.xz)?$"
+    )
+    found: Dict[int, Segment] = {}
+    if not active_path.parent.exists():
+        return []
+    for candidate in active_path.parent.iterdir():
+        match = pattern.match(candidate.name)
+        if match is None:
+            continue
+        first_seq = int(match.group(1))
+        index_path = active_path.with_name(f"{active_path.stem}.{match.group(1)}.idx.json")
+        compressed = match.group(2) is not None
+        if compressed and not index_path.exists():
+            continue
+        if first_seq in found and not compressed:
+            continue
+        found[first_seq] = Segment(first_seq, candidate, index_path, compressed)
+    return [found[first_seq] for first_seq in sorted(found)]
+
+
+def compress_segment(sealed: Path, compression: str, block_entries: int) -> Path:
+    """Rewrite a sealed plain segment as indexed compressed blocks."""
+    suffix, compress, _ = CODECS[compression]
+    target = sealed.with_name(sealed.name + suffix)
+    index_path = sealed.with_name(sealed.name[: -len(sealed.suffix)] + ".idx.json")
+    index: Dict[str, Any] = {
+        "version": INDEX_VERSION,
+        "codec": compression,
+        "entries": 0,
+        "first_seq": None,
+        "last_seq": None,
+        "first_ts": None,
+        "last_ts": None,
+        "blocks": [],
+        "request_ids": {},
+        "events": {},
+    }
+
+    tmp_target = target.with_name(target.name + ".tmp")
+    with sealed.open("rb") as source, tmp_target.open("wb") as out:
+        for block in _blocks(source, max(1, block_entries)):
+            block_meta = {"offset": out.tell(), "first_seq": index["last_seq"] or 0, "first_ts": index["last_ts"] or 0.0}
+            _index_block(index, block, block_meta, len(index["blocks"]))
+            index["blocks"].append(block_meta)
+            out.write(compress(b"".join(block)))
+        index["end_offset"] = out.tell()
+
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    tmp_index.write_text(json.dumps(index, ensure_ascii=True, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_target, target)
+    os.replace(tmp_index, index_path)
+    sealed.unlink()
+    return target
+
+
+def apply_retention(active_path: Path, policy: RotationPolicy, now: Optional[float] = None) -> List[Path]:
+    """Delete sealed segments beyond the count or age limits; return removed files."""
+    segments = list_segments(active_path)
+    expired: List[Segment] = []
+    if policy.retention_segments and len(segments) > policy.retention_segments:
+        expired.extend(segments[: len(segments) - policy.retention_segments])
+    if policy.retention_seconds:
+        cutoff = (now if now is not None else time.time()) - policy.retention_seconds
+        expired.extend(
+            segment
+            for segment in segments
+            if segment not in expired and _segment_last_ts(segment) < cutoff
+        )
+
+    removed: List[Path] = []
+    for segment in expired:
+        for path in (segment.data_path, segment.index_path):
+            try:
+                path.unlink()
+                removed.append(path)
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def _scan_compressed(
+    segment: Segment,
+    index: Dict[str, Any],
+    after_seq: Optional[int],
+    since: Optional[float],
+    event: Optional[str],
+    request_id: Optional[str],
+) -> Iterator[Dict[str, Any]]:
+    if index["last_seq"] is None:
+        return
+    if after_seq is not None and index["last_seq"] <= after_seq:
+        return
+    if since is not None and index["last_ts"] < since:
+        return
+
+    blocks = index["blocks"]
+    start = 0
+    if after_seq is not None:
+        start = bisect.bisect_right([block["first_seq"] for block in blocks], after_seq) - 1
+    elif since is not None:
+        start = bisect.bisect_left([block["first_ts"] for block in blocks], since) - 1
+    candidates = range(max(0, start), len(blocks))
+    for hints, key in ((index["request_ids"], request_id), (index["events"], event)):
+        if key is not None:
+            allowed = set(hints.get(key, ()))
+            candidates = [number for number in candidates if number in allowed]
+
+    decompress = CODECS[index["codec"]][2]
+    try:
+        handle = segment.data_path.open("rb")
+    except FileNotFoundError:
+        return
+    with handle:
+        for number in candidates:
+            for raw_line in _read_block(handle, index, number, decompress).splitlines():
+                entry = parse_entry(raw_line)
+                if entry is None:
+                    continue
+                if after_seq is not None and entry["seq"] <= after_seq:
+                    continue
+                if since is not None and entry.get("ts", 0.0) < since:
+                    continue
+                yield entry
+
+
+def _read_block(handle: BinaryIO, index: Dict[str, Any], number: int, decompress: Callable[[bytes], bytes]) -> bytes:
+    blocks = index["blocks"]
+    begin = blocks[number]["offset"]
+    end = blocks[number + 1]["offset"] if number + 1 < len(blocks) else index["end_offset"]
+    handle.seek(begin)
+    return decompress(handle.read(end - begin))
+
+
+def _blocks(source: BinaryIO, block_entries: int) -> Iterator[List[bytes]]:
+    block: List[bytes] = []
+    for raw_line in source:
+        if not raw_line.endswith(b"\n"):
+            raw_line += b"\n"
+        block.append(raw_line)
+        if len(block) == block_entries:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def _index_block(index: Dict[str, Any], block: List[bytes], block_meta: Dict[str, Any], number: int) -> None:
+    first = True
+    for raw_line in block:
+        entry = parse_entry(raw_line)
+        if entry is None:
+            continue
+        seq, ts = entry["seq"], float(entry.get("ts", 0.0))
+        if first:
+            block_meta["first_seq"], block_meta["first_ts"] = seq, ts
+            first = False
+        if index["first_seq"] is None:
+            index["first_seq"], index["first_ts"] = seq, ts
+        index["last_seq"], index["last_ts"] = seq, ts
+        index["entries"] += 1
+        for hints, key in ((index["request_ids"], entry.get("request_id")), (index["events"], entry.get("event"))):
+            if key is None:
+                continue
+            numbers = hints.setdefault(str(key), [])
+            if not numbers or numbers[-1] != number:
+                numbers.append(number)
+
+
+def _first_entry_position(raw_lines: List[Any], default_ts: float) -> Tuple[Optional[int], float]:
+    for raw_line in raw_lines:
+        entry = parse_entry(raw_line)
+        if entry is not None:
+            return entry["seq"], float(entry.get("ts", default_ts))
+    return None, default_ts
+
+
+def _segment_last_ts(segment: Segment) -> float:
+    if segment.compressed:
+        try:
+            last_ts = json.loads(segment.index_path.read_text(encoding="utf-8")).get("last_ts")
+        except (FileNotFoundError, ValueError):
+            last_ts = None
+        if last_ts is not None:
+            return float(last_ts)
+    try:
+        return segment.data_path.stat().st_mtime
+    except FileNotFoundError:
+        return float("inf")
@@ -0,0 +1,180 @@
+"""Background writer that batches log entries into the segmented log file."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+_STOP = object()
+
+
+class LogSink(Protocol):
+    """Where batches go: a `SegmentedLogFile`, or a socket to the collector."""
+
+    def write(self, chunk: str) -> None: ...
+
+    def flush(self, fsync: bool = False) -> None: ...
+
+
+class BufferedLogWriter:
+    """Serialize and append log entries on a background thread.
+
+    `submit` only enqueues, so the caller never pays for JSON encoding or file
+    I/O. When the bounded queue is full the entry is dropped and counted
+    rather than blocking the request. The writer thread drains up to
+    `batch_size` entries at a time, writes them to `sink` in one call (which
+    may rotate the segment), and flushes (and optionally fsyncs) once
+    `flush_bytes` are pending or `flush_interval_seconds` have passed. A sink
+    or `emit` failure (disk full, a failed rotation) loses that batch, is
+    counted in `write_errors`, and the thread keeps going.
+    """
+
+    def __init__(
+        self,
+        sink: LogSink,
+        emit: Optional[Callable[[str], None]] = None,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_bytes: int = 64 * 1024,
+        flush_interval_seconds: float = 1.0,
+        fsync: bool = False,
+    ) -> None:
+        self._sink = sink
+        self._emit = emit
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._batch_size = max(1, batch_size)
+        self._flush_bytes = flush_bytes
+        self._flush_interval_seconds = flush_interval_seconds
+        self._fsync = fsync
+        self._stats_lock = threading.Lock()
+        self._dropped = 0
+        self._written = 0
+        self._errors = 0
+        self._write_errors = 0
+        self._flushes = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="agent-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Queue an entry; return False if it was dropped."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "dropped": self._dropped,
+                "written": self._written,
+                "errors": self._errors,
+                "write_errors": self._write_errors,
+                "flushes": self._flushes,
+            }
+
+    def close(self, timeout_seconds: float = 5.0) -> None:
+        """Drain the queue, flush, and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout_seconds)
+        except queue.Full:
+            pass
+        self._thread.join(timeout_seconds)
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        pending_bytes = 0
+        pending_since = 0.0
+        stopping = False
+        while not stopping:
+            # Sleep until the next entry when idle; otherwise only until the
+            # oldest unflushed write is due.
+            timeout = None
+            if pending_bytes:
+                timeout = self._flush_interval_seconds - (time.monotonic() - pending_since)
+            batch, stopping = self._next_batch(timeout)
+            if batch:
+                if not pending_bytes:
+                    pending_since = time.monotonic()
+                pending_bytes += self._write_batch(batch)
+            if not pending_bytes:
+                continue
+            due = time.monotonic() - pending_since >= self._flush_interval_seconds
+            if stopping or due or pending_bytes >= self._flush_bytes:
+                self._flush()
+                pending_bytes = 0
+
+    def _next_batch(self, timeout: Optional[float]) -> Tuple[List[Dict[str, Any]], bool]:
+        batch: List[Dict[str, Any]] = []
+        try:
+            if timeout is not None and timeout <= 0:
+                item = self._queue.get_nowait()
+            else:
+                item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return batch, False
+        while True:
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+            if len(batch) >= self._batch_size:
+                return batch, False
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        lines: List[str] = []
+        errors = 0
+        for entry in batch:
+            try:
+                lines.append(json.dumps(entry, ensure_ascii=True, sort_keys=True))
+            except Exception:
+                # Also RuntimeError, when a caller mutates a nested payload value mid-dump.
+                errors += 1
+        write_errors = 0
+        if self._emit is not None:
+            try:
+                for line in lines:
+                    self._emit(line)
+            except Exception:
+                write_errors += 1
+        chunk = "".join(line + "\n" for line in lines)
+        written = len(lines)
+        if chunk:
+            try:
+                self._sink.write(chunk)
+            except Exception:
+                write_errors += 1
+                chunk, written = "", 0
+        with self._stats_lock:
+            self._written += written
+            self._errors += errors
+            self._write_errors += write_errors
+        return len(chunk)
+
+    def _flush(self) -> None:
+        try:
+            self._sink.flush(fsync=self._fsync)
+        except Exception:
+            with self._stats_lock:
+                self._write_errors += 1
+            return
+        with self._stats_lock:
+            self._flushes += 1
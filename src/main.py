@@ -1,55 +1,30 @@
-"""CLI entrypoint for the tool-enabled agent."""
+"""CLI entrypoint for the tool-enabled agent.
+
+Runtime modules are imported lazily so that `--client` invocations only pay
+for the standard library and a socket round trip.
+"""
 
 from __future__ import annotations
 
+import argparse
 import json
 import os
 import sys
-from typing import Optional
-
-from src.agent import AgentDependencies, ToolEnabledAgent
-from src.logging import AgentLogger
-from src.services import OllamaService, RetryService, TimeoutService
-from src.tools import ExternalAPITool, GuardrailTool, StructuredDataTool, ToolRegistry
-
-
-def build_runtime() -> tuple[ToolEnabledAgent, AgentLogger]:
-    """Build fully wired agent plus logger for API/CLI reuse."""
-    logger = AgentLogger(file_path=os.getenv("AGENT_LOG_FILE", "logs/agent_history.jsonl"))
-    retry_service = RetryService()
-    timeout_service = TimeoutService()
-    ollama_service = OllamaService(
-        base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
-        model=os.getenv("OLLAMA_MODEL", "qwen2.5:3b"),
-        timeout_seconds=float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "240")),
-    )
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from src.agent import ToolEnabledAgent
+    from src.logging import AgentLogger
 
-    structured_tool = StructuredDataTool()
-    external_tool = ExternalAPITool(
-        retry_service=retry_service,
-        timeout_service=timeout_service,
-        logger=logger.log,
-    )
-    guardrail_tool = GuardrailTool()
-
-    registry = ToolRegistry()
-    registry.register("structured_data_tool", structured_tool.run)
-    registry.register("external_api_tool", external_tool.run)
-    registry.register("guardrail_tool", guardrail_tool.run)
-    registry.register("fallback_lookup_tool", structured_tool.search_relevant)
-
-    dependencies = AgentDependencies(
-        structured_data_tool=registry.get("structured_data_tool"),
-        external_api_tool=registry.get("external_api_tool"),
-        guardrail_tool=registry.get("guardrail_tool"),
-        fallback_lookup_tool=registry.get("fallback_lookup_tool"),
-        contextual_answer=ollama_service.answer_with_context,
-        logger=logger.log,
-    )
-    return ToolEnabledAgent(dependencies=dependencies), logger
 
+def build_runtime(async_mode: bool = False) -> tuple["ToolEnabledAgent", "AgentLogger"]:
+    """Build fully wired agent plus logger; see `src.runtime.build_runtime`."""
+    from src.runtime import build_runtime as build
 
-def build_agent() -> ToolEnabledAgent:
+    return build(async_mode=async_mode)
+
+
+def build_agent() -> "ToolEnabledAgent":
     """Build fully wired agent with tools, services, and logging."""
     agent, _ = build_runtime()
     return agent
@@ -72,7 +47,125 @@ def _query_from_cli(args: list[str]) -> Optional[str]:
         return None
 
 
+def run_cli_options(args: list[str]) -> int:
+    """Run the flag-driven CLI modes: bulk files, the daemon, its client, the log collector, and log analysis."""
+    parser = _build_parser()
+    options = parser.parse_args(args)
+    if options.input or options.output:
+        if not (options.input and options.output):
+            parser.error("--input and --output must be used together.")
+        return _run_bulk(options)
+    if options.serve:
+        return _serve(options)
+    if options.client:
+        return _forward(options)
+    if options.collect:
+        return _collect(options)
+    if options.analyze:
+        return _analyze(options)
+    parser.error("Choose --input/--output, --serve, --client, --collect, or --analyze.")
+    return 2
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.main", description=run_cli_options.__doc__)
+    parser.add_argument("query", nargs="*", help="Query text for --client.")
+    parser.add_argument("--input", help="JSONL file with one query per line.")
+    parser.add_argument("--output", help="NDJSON file that receives the results.")
+    parser.add_argument("--workers", type=int, default=4, help="Queries answered concurrently.")
+    parser.add_argument("--field", default="query", help="JSON field that holds the query text.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the output checkpoint.")
+    parser.add_argument("--serve", action="store_true", help="Run a warm daemon on a Unix socket.")
+    parser.add_argument("--client", action="store_true", help="Forward the query to a running daemon.")
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("AGENT_SOCKET", "/tmp/tool-agent.sock"),
+        help="Unix socket path for --serve and --client.",
+    )
+    parser.add_argument("--debug", action="store_true", help="Include debug details in the response.")
+    parser.add_argument("--collect", action="store_true", help="Run the central log collector for API workers.")
+    parser.add_argument(
+        "--log-socket",
+        default=os.getenv("AGENT_LOG_COLLECTOR_SOCKET") or "/tmp/tool-agent-logs.sock",
+        help="Unix socket path for --collect.",
+    )
+    parser.add_argument("--analyze", action="store_true", help="Report latency and failure statistics from the log.")
+    parser.add_argument(
+        "--log-file",
+        action="append",
+        help="Log file for --analyze, with its rotated segments; repeatable. Defaults to AGENT_LOG_FILE.",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Slowest requests and retry storms to report.")
+    return parser
+
+
+def _run_bulk(options: argparse.Namespace) -> int:
+    from src.cli import run_bulk
+    from src.cli.bulk import print_summary
+
+    # Bulk runs never read the log history back; keep the in-memory ring small.
+    os.environ.setdefault("AGENT_LOG_HISTORY_LIMIT", "1000")
+    agent, _ = build_runtime()
+    summary = run_bulk(
+        agent.handle_query,
+        options.input,
+        options.output,
+        workers=options.workers,
+        resume=options.resume,
+        query_field=options.field,
+    )
+    print_summary(summary)
+    return 0
+
+
+def _serve(options: argparse.Namespace) -> int:
+    from src.cli.daemon import serve
+
+    os.environ.setdefault("AGENT_LOG_HISTORY_LIMIT", "1000")
+    agent, _ = build_runtime()
+    print(json.dumps({"status": "ok", "message": f"Agent daemon listening on {options.socket}."}), flush=True)
+    serve(options.socket, lambda query, include_debug: agent.handle_query(query, include_debug=include_debug))
+    return 0
+
+
+def _collect(options: argparse.Namespace) -> int:
+    from src.logging.collector import serve_collector
+    from src.runtime import build_logger
+
+    logger = build_logger()
+    print(json.dumps({"status": "ok", "message": f"Log collector listening on {options.log_socket}."}), flush=True)
+    serve_collector(options.log_socket, logger)
+    return 0
+
+
+def _analyze(options: argparse.Namespace) -> int:
+    from src.logging.analytics import analyze_logs
+
+    paths = options.log_file or [os.getenv("AGENT_LOG_FILE", "logs/agent_history.jsonl")]
+    print(json.dumps(analyze_logs(paths, top_n=options.top), ensure_ascii=True, indent=2))
+    return 0
+
+
+def _forward(options: argparse.Namespace) -> int:
+    from src.cli.daemon import DaemonUnavailable, send_query
+
+    query = " ".join(options.query).strip()
+    if not query:
+        print(json.dumps({"status": "error", "message": "No query provided."}))
+        return 1
+    try:
+        result = send_query(query, options.socket, include_debug=options.debug)
+    except DaemonUnavailable as exc:
+        print(json.dumps({"status": "error", "message": str(exc)}))
+        return 1
+    print(json.dumps(result, ensure_ascii=True, sort_keys=True))
+    return 0
+
+
 if __name__ == "__main__":
+    if sys.argv[1:] and sys.argv[1].startswith("--"):
+        raise SystemExit(run_cli_options(sys.argv[1:]))
+
     query = _query_from_cli(sys.argv[1:])
     if not query:
         print(json.dumps({"status": "error", "message": "No query provided."}))
@@ -0,0 +1,219 @@
+"""Runtime assembly shared by the API, the CLI, and the CLI daemon."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import replace
+from typing import List, Optional, Union
+
+from src.agent import AgentDependencies, AnswerStrategy, ResponseCache, ToolEnabledAgent
+from src.agent.answer_strategy import DEFAULT_TEMPLATE_RULES
+from src.agent.response_cache import DEFAULT_SOURCE_TTLS
+from src.logging import AgentLogger
+from src.logging.collector import CollectorLogger
+from src.logging.policies import DEFAULT_EVENT_POLICIES, EventPolicy, PayloadPolicies
+from src.logging.segments import RotationPolicy
+from src.services import GenerationMetrics, OllamaService, RetryService, TimeoutService
+from src.services.model_router import ModelRouter, ModelTier
+from src.services.metrics import AgentMetrics
+from src.services.tracing import JsonlTraceExporter, TraceExporter, Tracer
+from src.tools import ExternalAPITool, GuardrailTool, StructuredDataTool, ToolRegistry
+
+
+def build_runtime(async_mode: bool = False) -> tuple[ToolEnabledAgent, Union[AgentLogger, CollectorLogger]]:
+    """Build fully wired agent plus logger for API/CLI reuse.
+
+    With `async_mode` the coroutine variants of the tools and the Ollama client
+    are wired in, for use with `ToolEnabledAgent.ahandle_query`. When
+    `AGENT_LOG_COLLECTOR_SOCKET` is set, entries are shipped to a central log
+    collector instead of being written by this process.
+    """
+    collector_socket = os.getenv("AGENT_LOG_COLLECTOR_SOCKET", "").strip()
+    logger: Union[AgentLogger, CollectorLogger]
+    if collector_socket:
+        logger = CollectorLogger(
+            collector_socket,
+            queue_size=int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000")),
+            batch_size=int(os.getenv("AGENT_LOG_BATCH_SIZE", "256")),
+            flush_interval_seconds=float(os.getenv("AGENT_LOG_FLUSH_INTERVAL_SECONDS", "1.0")),
+        )
+    else:
+        logger = build_logger()
+    metrics = _build_metrics()
+    retry_service = RetryService(retry_counter=metrics.retries if metrics is not None else None)
+    timeout_service = TimeoutService()
+    guardrail_tool = GuardrailTool()
+    stream_guardrail = os.getenv("OLLAMA_STREAM_GUARDRAIL", "true").strip().lower() == "true"
+    ollama_model = os.getenv("OLLAMA_MODEL", "qwen2.5:3b")
+    ollama_timeout = float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "240"))
+    ollama_service = OllamaService(
+        base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+        model=ollama_model,
+        timeout_seconds=ollama_timeout,
+        keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "-1"),
+        cold_load_threshold_ms=float(os.getenv("OLLAMA_COLD_LOAD_THRESHOLD_MS", "500")),
+        router=_build_model_router(ollama_model, ollama_timeout),
+        base_urls=_split_env("OLLAMA_BASE_URLS"),
+        stream_guard=guardrail_tool.stream_monitor if stream_guardrail else None,
+    )
+
+    structured_tool = StructuredDataTool()
+    external_tool = ExternalAPITool(
+        retry_service=retry_service,
+        timeout_service=timeout_service,
+        logger=logger.log,
+    )
+
+    registry = ToolRegistry()
+    if async_mode:
+        registry.register("structured_data_tool", structured_tool.arun)
+        registry.register("external_api_tool", external_tool.arun)
+        registry.register("fallback_lookup_tool", structured_tool.asearch_relevant)
+    else:
+        registry.register("structured_data_tool", structured_tool.run)
+        registry.register("external_api_tool", external_tool.run)
+        registry.register("fallback_lookup_tool", structured_tool.search_relevant)
+    registry.register("guardrail_tool", guardrail_tool.run)
+
+    dependencies = AgentDependencies(
+        structured_data_tool=registry.get("structured_data_tool"),
+        external_api_tool=registry.get("external_api_tool"),
+        guardrail_tool=registry.get("guardrail_tool"),
+        fallback_lookup_tool=registry.get("fallback_lookup_tool"),
+        contextual_answer=(
+            ollama_service.agenerate_answer if async_mode else ollama_service.generate_answer
+        ),
+        logger=logger.log,
+        generation_metrics=GenerationMetrics(),
+        answer_strategy=_build_answer_strategy(),
+        batch_session=structured_tool.batch_session,
+        response_cache=_build_response_cache(),
+        tracer=_build_tracer(metrics),
+        metrics=metrics,
+    )
+    agent = ToolEnabledAgent(
+        dependencies=dependencies,
+        max_parallel_tools=int(os.getenv("AGENT_MAX_PARALLEL_TOOLS", "4")),
+        tool_timeout_seconds=float(os.getenv("AGENT_TOOL_TIMEOUT_SECONDS", "15")),
+    )
+    return agent, logger
+
+
+def build_logger() -> AgentLogger:
+    """Build the file-owning logger, used in-process or by the log collector."""
+    return AgentLogger(
+        file_path=os.getenv("AGENT_LOG_FILE", "logs/agent_history.jsonl"),
+        max_entries=int(os.getenv("AGENT_LOG_HISTORY_LIMIT", "10000")),
+        buffered=os.getenv("AGENT_LOG_BUFFERED", "true").strip().lower() == "true",
+        queue_size=int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("AGENT_LOG_BATCH_SIZE", "256")),
+        flush_interval_seconds=float(os.getenv("AGENT_LOG_FLUSH_INTERVAL_SECONDS", "1.0")),
+        fsync=os.getenv("AGENT_LOG_FSYNC", "false").strip().lower() == "true",
+        rotation=_build_rotation_policy(),
+        policies=_build_log_policies(),
+    )
+
+
+def _build_model_router(default_model: str, default_timeout: float) -> ModelRouter:
+    tiers = []
+    small_model = os.getenv("OLLAMA_SMALL_MODEL", "").strip()
+    if small_model:
+        tiers.append(
+            ModelTier(
+                name="small",
+                model=small_model,
+                max_context_chars=int(os.getenv("OLLAMA_SMALL_MAX_CONTEXT_CHARS", "1200")),
+                max_records=int(os.getenv("OLLAMA_SMALL_MAX_RECORDS", "1")),
+                latency_budget_seconds=float(os.getenv("OLLAMA_SMALL_TIMEOUT_SECONDS", "30")),
+                sources=tuple(_split_env("OLLAMA_SMALL_SOURCES")),
+            )
+        )
+    tiers.append(
+        ModelTier(
+            name="large",
+            model=default_model,
+            max_context_chars=0,
+            max_records=0,
+            latency_budget_seconds=default_timeout,
+        )
+    )
+    return ModelRouter(tiers)
+
+
+def _build_answer_strategy() -> Optional[AnswerStrategy]:
+    if os.getenv("ANSWER_STRATEGY", "auto").strip().lower() == "llm":
+        return None
+    template_sources = set(_split_env("ANSWER_TEMPLATE_SOURCES"))
+    rules = [
+        rule
+        for rule in DEFAULT_TEMPLATE_RULES
+        if not template_sources or rule.source in template_sources
+    ]
+    # Load shedding onto templates is opt-in: unset limits never shed.
+    latency_budget = os.getenv("ANSWER_LATENCY_BUDGET_SECONDS", "").strip()
+    max_concurrent = os.getenv("ANSWER_MAX_CONCURRENT_GENERATIONS", "").strip()
+    return AnswerStrategy(
+        rules=rules,
+        latency_budget_seconds=float(latency_budget) if latency_budget else None,
+        max_concurrent_generations=int(max_concurrent) if max_concurrent else None,
+    )
+
+
+def _build_rotation_policy() -> RotationPolicy:
+    return RotationPolicy(
+        max_bytes=int(os.getenv("AGENT_LOG_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024))),
+        max_age_seconds=float(os.getenv("AGENT_LOG_SEGMENT_MAX_AGE_SECONDS", "86400")),
+        retention_segments=int(os.getenv("AGENT_LOG_RETENTION_SEGMENTS", "0")),
+        retention_seconds=float(os.getenv("AGENT_LOG_RETENTION_SECONDS", "0")),
+        compression=os.getenv("AGENT_LOG_COMPRESSION", "gzip").strip().lower(),
+    )
+
+
+def _build_log_policies() -> Optional[PayloadPolicies]:
+    if os.getenv("AGENT_LOG_POLICIES", "true").strip().lower() != "true":
+        return None
+    policies = dict(DEFAULT_EVENT_POLICIES)
+    for item in _split_env("AGENT_LOG_SAMPLE_RATES"):
+        event, _, rate = item.partition("=")
+        policy = policies.get(event.strip(), EventPolicy())
+        policies[event.strip()] = replace(policy, sample_rate=float(rate))
+    for item in _split_env("AGENT_LOG_RATE_LIMITS"):
+        event, _, per_second = item.partition("=")
+        policy = policies.get(event.strip(), EventPolicy())
+        policies[event.strip()] = replace(policy, max_per_second=float(per_second))
+    return PayloadPolicies(policies)
+
+
+def _build_metrics() -> Optional[AgentMetrics]:
+    if os.getenv("AGENT_METRICS", "true").strip().lower() != "true":
+        return None
+    return AgentMetrics()
+
+
+def _build_tracer(metrics: Optional[AgentMetrics]) -> Optional[Tracer]:
+    # Stage latency histograms are fed from finished traces. The JSONL export
+    # opens and appends a file per request with no rotation, so it is opt-in.
+    exporters: List[TraceExporter] = [] if metrics is None else [metrics]
+    trace_file = os.getenv("AGENT_TRACE_FILE", "").strip()
+    if trace_file:
+        exporters.append(JsonlTraceExporter(trace_file))
+    return Tracer(*exporters) if exporters else None
+
+
+def _build_response_cache() -> Optional[ResponseCache]:
+    if os.getenv("RESPONSE_CACHE", "true").strip().lower() != "true":
+        return None
+    source_ttls = dict(DEFAULT_SOURCE_TTLS)
+    for item in _split_env("RESPONSE_CACHE_SOURCE_TTLS"):
+        source, _, ttl = item.partition("=")
+        source_ttls[source.strip()] = float(ttl)
+    return ResponseCache(
+        source_ttls=source_ttls,
+        default_ttl_seconds=float(os.getenv("RESPONSE_CACHE_DEFAULT_TTL_SECONDS", "300")),
+        refusal_ttl_seconds=float(os.getenv("RESPONSE_CACHE_REFUSAL_TTL_SECONDS", "3600")),
+        max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+    )
+
+
+def _split_env(name: str) -> list[str]:
+    return [value.strip() for value in os.getenv(name, "").split(",") if value.strip()]
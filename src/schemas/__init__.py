@@ -1,7 +1,15 @@
 """Schema package exports."""
 
+from .generation_schema import GenerationAborted, GenerationResult, GenerationTelemetry
 from .request_schema import AgentRequest
 from .response_schema import AgentResponse
 from .risk_schema import RiskAssessment
 
-__all__ = ["AgentRequest", "AgentResponse", "RiskAssessment"]
+__all__ = [
+    "AgentRequest",
+    "AgentResponse",
+    "GenerationAborted",
+    "GenerationResult",
+    "GenerationTelemetry",
+    "RiskAssessment",
+]
@@ -0,0 +1,59 @@
+"""Generation result schema definitions."""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class GenerationTelemetry:
+    """Timing and token counters reported by the LLM backend for one generation."""
+
+    model: str
+    total_duration_ms: float
+    load_duration_ms: float
+    prompt_eval_count: int
+    prompt_eval_duration_ms: float
+    eval_count: int
+    eval_duration_ms: float
+    cold_load: bool
+    tier: str = ""
+
+    @property
+    def prefill_tokens_per_second(self) -> float:
+        return tokens_per_second(self.prompt_eval_count, self.prompt_eval_duration_ms)
+
+    @property
+    def decode_tokens_per_second(self) -> float:
+        return tokens_per_second(self.eval_count, self.eval_duration_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["prefill_tokens_per_second"] = self.prefill_tokens_per_second
+        payload["decode_tokens_per_second"] = self.decode_tokens_per_second
+        return payload
+
+
+@dataclass(frozen=True)
+class GenerationResult:
+    """Generated answer text plus optional backend telemetry."""
+
+    answer: str
+    telemetry: Optional[GenerationTelemetry] = None
+
+
+def tokens_per_second(tokens: float, duration_ms: float) -> float:
+    """Token throughput over `duration_ms`, rounded; 0.0 when nothing was timed."""
+    if duration_ms <= 0:
+        return 0.0
+    return round(tokens / (duration_ms / 1000), 2)
+
+
+class GenerationAborted(RuntimeError):
+    """Raised when a streamed generation is cancelled by the guardrail."""
+
+    def __init__(self, partial_answer: str, risk: Dict[str, Any]) -> None:
+        super().__init__(str(risk.get("reason", "Generation aborted by guardrail.")))
+        self.partial_answer = partial_answer
+        self.risk = risk
@@ -1,7 +1,8 @@
 """Service package exports."""
 
+from .generation_metrics import GenerationMetrics
 from .ollama_service import OllamaService
 from .retry_service import RetryService
 from .timeout_service import TimeoutService
 
-__all__ = ["OllamaService", "RetryService", "TimeoutService"]
+__all__ = ["GenerationMetrics", "OllamaService", "RetryService", "TimeoutService"]
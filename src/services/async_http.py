@@ -0,0 +1,173 @@
+"""Minimal asyncio HTTP/1.1 client built on the standard library.
+
+Only what the agent needs is supported: one request per connection,
+JSON bodies, `Content-Length`, chunked, and read-until-close responses,
+plus line iteration for streamed NDJSON payloads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib import parse
+
+
+class AsyncHTTPResponse:
+    """Response whose body is read lazily from the open connection."""
+
+    def __init__(
+        self,
+        status: int,
+        headers: Dict[str, str],
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        timeout_seconds: float,
+    ) -> None:
+        self.status = status
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+        self._timeout_seconds = timeout_seconds
+
+    async def __aenter__(self) -> "AsyncHTTPResponse":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_chunks()])
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        buffer = b""
+        async for chunk in self.iter_chunks():
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                yield line
+        if buffer:
+            yield buffer
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            async for chunk in self._iter_chunked():
+                yield chunk
+            return
+
+        length = self.headers.get("content-length")
+        if length is not None:
+            remaining = int(length)
+            while remaining > 0:
+                chunk = await self._read(self._reader.read(min(remaining, 65536)))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+            return
+
+        while True:
+            chunk = await self._read(self._reader.read(65536))
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._writer.close()
+
+    async def _iter_chunked(self) -> AsyncIterator[bytes]:
+        while True:
+            size_line = await self._read(self._reader.readline())
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                await self._read(self._reader.readline())
+                return
+            chunk = await self._read(self._reader.readexactly(size))
+            await self._read(self._reader.readexactly(2))
+            yield chunk
+
+    async def _read(self, awaitable: Any) -> bytes:
+        return await asyncio.wait_for(awaitable, self._timeout_seconds)
+
+
+async def open_request(
+    method: str,
+    url: str,
+    body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout_seconds: float = 30.0,
+) -> AsyncHTTPResponse:
+    """Send a request and return once the status line and headers arrive."""
+    parts = parse.urlsplit(url)
+    secure = parts.scheme == "https"
+    host = parts.hostname or "localhost"
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(
+            host,
+            port,
+            ssl=ssl.create_default_context() if secure else None,
+        ),
+        timeout_seconds,
+    )
+
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+    request_headers = {
+        "Host": parts.netloc,
+        "Connection": "close",
+        "Accept-Encoding": "identity",
+        "User-Agent": "tool-agent",
+    }
+    if body is not None:
+        request_headers["Content-Type"] = "application/json"
+        request_headers["Content-Length"] = str(len(body))
+    request_headers.update(headers or {})
+    head = f"{method} {target} HTTP/1.1\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in request_headers.items()
+    )
+
+    try:
+        writer.write(head.encode("latin-1") + b"\r\n" + (body or b""))
+        await asyncio.wait_for(writer.drain(), timeout_seconds)
+        status_line = await asyncio.wait_for(reader.readline(), timeout_seconds)
+        status = int(status_line.split()[1])
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout_seconds)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+    except BaseException:
+        writer.close()
+        raise
+    return AsyncHTTPResponse(status, response_headers, reader, writer, timeout_seconds)
+
+
+async def request_json(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    timeout_seconds: float = 30.0,
+) -> Tuple[int, Any]:
+    """Send a JSON request and return the status code with the decoded body."""
+    if params:
+        url = f"{url}?{parse.urlencode(params, doseq=True)}"
+    body = json.dumps(payload).encode("utf-8") if payload is not None else None
+
+    async def operation() -> Tuple[int, Any]:
+        async with await open_request(method, url, body, timeout_seconds=timeout_seconds) as response:
+            raw = await response.read()
+        text = raw.decode("utf-8", errors="replace")
+        if not text.strip():
+            return response.status, None
+        try:
+            return response.status, json.loads(text)
+        except ValueError:
+            return response.status, text
+
+    return await asyncio.wait_for(operation(), timeout_seconds)
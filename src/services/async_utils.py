@@ -0,0 +1,56 @@
+"""Helpers for calling dependencies that may be sync or async."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import Any, Callable, Set
+
+_BACKGROUND_TASKS: Set["asyncio.Task[Any]"] = set()
+
+
+def is_async_callable(fn: Any) -> bool:
+    if inspect.iscoroutinefunction(fn):
+        return True
+    call = getattr(fn, "__call__", None)
+    return inspect.iscoroutinefunction(call)
+
+
+async def call_maybe_async(fn: Callable[..., Any], *args: Any, offload: bool = True) -> Any:
+    """Await async callables; run sync callables in a worker thread or inline.
+
+    Sync callables are offloaded with `asyncio.to_thread` so blocking I/O does
+    not stall the event loop. Pass `offload=False` for cheap CPU-only calls.
+    """
+    if is_async_callable(fn):
+        return await fn(*args)
+    if offload:
+        result = await asyncio.to_thread(fn, *args)
+    else:
+        result = fn(*args)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def call_and_schedule(fn: Callable[..., Any], *args: Any) -> None:
+    """Call a fire-and-forget callable such as a logger, sync or async.
+
+    Awaitables returned inside a running event loop are scheduled as tasks;
+    outside a loop they are run to completion.
+    """
+    result = fn(*args)
+    if not inspect.isawaitable(result):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(_await(result))
+        return
+    task = loop.create_task(_await(result))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
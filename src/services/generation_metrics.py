@@ -0,0 +1,76 @@
+"""Aggregated telemetry for contextual answer generation."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+from src.schemas.generation_schema import GenerationTelemetry, tokens_per_second
+
+
+class GenerationMetrics:
+    """Thread-safe running totals of LLM generation telemetry per model."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, float]] = {}
+        self._failures = 0
+
+    def record(self, telemetry: GenerationTelemetry) -> None:
+        with self._lock:
+            totals = self._models.setdefault(telemetry.model, _empty_totals())
+            totals["generations"] += 1
+            totals["cold_loads"] += int(telemetry.cold_load)
+            totals["total_duration_ms"] += telemetry.total_duration_ms
+            totals["load_duration_ms"] += telemetry.load_duration_ms
+            totals["prompt_eval_count"] += telemetry.prompt_eval_count
+            totals["prompt_eval_duration_ms"] += telemetry.prompt_eval_duration_ms
+            totals["eval_count"] += telemetry.eval_count
+            totals["eval_duration_ms"] += telemetry.eval_duration_ms
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return averages that separate model loading, prefill, and decode cost."""
+        with self._lock:
+            models = {name: dict(totals) for name, totals in self._models.items()}
+            failures = self._failures
+
+        return {
+            "generations": int(sum(totals["generations"] for totals in models.values())),
+            "failures": failures,
+            "models": {name: _summarize(totals) for name, totals in sorted(models.items())},
+        }
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {
+        "generations": 0,
+        "cold_loads": 0,
+        "total_duration_ms": 0.0,
+        "load_duration_ms": 0.0,
+        "prompt_eval_count": 0,
+        "prompt_eval_duration_ms": 0.0,
+        "eval_count": 0,
+        "eval_duration_ms": 0.0,
+    }
+
+
+def _summarize(totals: Dict[str, float]) -> Dict[str, Any]:
+    count = max(int(totals["generations"]), 1)
+    return {
+        "generations": int(totals["generations"]),
+        "cold_loads": int(totals["cold_loads"]),
+        "avg_total_duration_ms": round(totals["total_duration_ms"] / count, 3),
+        "avg_load_duration_ms": round(totals["load_duration_ms"] / count, 3),
+        "avg_prefill_duration_ms": round(totals["prompt_eval_duration_ms"] / count, 3),
+        "avg_decode_duration_ms": round(totals["eval_duration_ms"] / count, 3),
+        "avg_prompt_tokens": round(totals["prompt_eval_count"] / count, 2),
+        "avg_output_tokens": round(totals["eval_count"] / count, 2),
+        "prefill_tokens_per_second": tokens_per_second(
+            totals["prompt_eval_count"], totals["prompt_eval_duration_ms"]
+        ),
+        "decode_tokens_per_second": tokens_per_second(totals["eval_count"], totals["eval_duration_ms"]),
+    }
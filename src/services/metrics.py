@@ -0,0 +1,376 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters and gauges take a short lock per update. Histograms keep one shard
+of bucket counts per thread, so `observe` on the hot path never contends;
+shards are only summed when the registry is rendered, and a thread's shard is
+folded into a base total when the thread exits.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+LabelKey = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute an unlabelled gauge at render time."""
+        if self.labelnames:
+            raise ValueError("Callback gauges cannot have labels.")
+        self._function = function
+
+    @contextmanager
+    def track(self, **labels: Any) -> Iterator[None]:
+        """Hold the gauge one higher for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def value(self, **labels: Any) -> float:
+        if self._function is not None:
+            return float(self._function())
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        if self._function is not None:
+            return [(self.name, {}, float(self._function()))]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+
+
+class _ShardOwner:
+    """Thread-local handle whose collection, when its thread exits, retires the shard."""
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: Dict[LabelKey, _HistogramSeries]) -> None:
+        self.shard = shard
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram sharded per thread.
+
+    Each thread only ever writes its own shard, so `observe` needs no lock.
+    Rendering copies every shard and sums them; a render racing an observe may
+    miss that one observation, which is fine for monitoring. Short-lived
+    threads (per-connection daemon handlers, per-batch pools) would otherwise
+    leave a shard each behind, so a dead thread's shard is added into `_base`
+    and dropped.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._upper_bounds = sorted(float(bound) for bound in buckets if bound != math.inf)
+        self._local = threading.local()
+        self._shards: Dict[int, Dict[LabelKey, _HistogramSeries]] = {}
+        self._shard_ids = itertools.count()
+        self._base: Dict[LabelKey, _HistogramSeries] = {}
+        self._shards_lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        owner = getattr(self._local, "owner", None)
+        shard = owner.shard if owner is not None else self._new_shard()
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _HistogramSeries(len(self._upper_bounds) + 1)
+        series.counts[bisect_left(self._upper_bounds, value)] += 1
+        series.total += value
+
+    def snapshot(self, **labels: Any) -> Dict[str, Any]:
+        """Return cumulative bucket counts, count and sum for one label set."""
+        merged = self._merged().get(self._key(labels))
+        if merged is None:
+            return {"buckets": {}, "count": 0, "sum": 0.0}
+        counts, total = merged
+        return {
+            "buckets": dict(zip(self._bucket_labels(), _cumulative(counts))),
+            "count": sum(counts),
+            "sum": total,
+        }
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        for key, (counts, total) in sorted(self._merged().items()):
+            labels = self._labels(key)
+            for bound, cumulative in zip(self._bucket_labels(), _cumulative(counts)):
+                samples.append((self.name + "_bucket", {**labels, "le": bound}, float(cumulative)))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, float(sum(counts))))
+        return samples
+
+    def _new_shard(self) -> Dict[LabelKey, _HistogramSeries]:
+        shard: Dict[LabelKey, _HistogramSeries] = {}
+        owner = _ShardOwner(shard)
+        with self._shards_lock:
+            shard_id = next(self._shard_ids)
+            self._shards[shard_id] = shard
+        # The thread-local dict, and with it `owner`, is released when the thread exits.
+        weakref.finalize(owner, self._retire_shard, shard_id)
+        self._local.owner = owner
+        return shard
+
+    def _retire_shard(self, shard_id: int) -> None:
+        with self._shards_lock:
+            shard = self._shards.pop(shard_id, None)
+            if shard is None:
+                return
+            for key, series in shard.items():
+                base = self._base.get(key)
+                if base is None:
+                    base = self._base[key] = _HistogramSeries(len(self._upper_bounds) + 1)
+                base.counts = [a + b for a, b in zip(base.counts, series.counts)]
+                base.total += series.total
+
+    def _merged(self) -> Dict[LabelKey, Tuple[List[int], float]]:
+        with self._shards_lock:
+            shards = [dict(self._base)] + list(self._shards.values())
+            merged: Dict[LabelKey, Tuple[List[int], float]] = {
+                key: (list(series.counts), series.total) for key, series in shards[0].items()
+            }
+        for shard in shards[1:]:
+            for key, series in dict(shard).items():
+                counts, total = merged.get(key, ([0] * (len(self._upper_bounds) + 1), 0.0))
+                merged[key] = ([a + b for a, b in zip(counts, series.counts)], total + series.total)
+        return merged
+
+    def _bucket_labels(self) -> List[str]:
+        return [_format_value(bound) for bound in self._upper_bounds] + ["+Inf"]
+
+
+class MetricsRegistry:
+    """Get-or-create registry of named metrics, rendered in Prometheus format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, cls: Any, name: str, documentation: str, labelnames: Sequence[str], **kwargs: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, cls) or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name} is already registered with a different type or labels.")
+                return existing
+            metric = cls(name, documentation, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+
+class AgentMetrics:
+    """The agent's request, stage, tool, and cache metrics on one registry.
+
+    Also acts as a trace exporter: every finished trace feeds its span
+    durations into the per-stage latency histogram.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        self.registry = registry or MetricsRegistry()
+        self.requests = self.registry.counter(
+            "agent_requests_total", "Answered queries by decision action and status.", ("action", "status")
+        )
+        self.in_flight = self.registry.gauge("agent_requests_in_flight", "Queries currently being handled.")
+        self.request_duration = self.registry.histogram(
+            "agent_request_duration_seconds", "End-to-end query latency by decision action.", ("action",)
+        )
+        self.stage_duration = self.registry.histogram(
+            "agent_stage_duration_seconds", "Latency of traced stages inside a query.", ("stage",)
+        )
+        self.tool_calls = self.registry.counter(
+            "agent_tool_calls_total", "Tool invocations by tool and result status.", ("tool", "status")
+        )
+        self.fallbacks = self.registry.counter(
+            "agent_answer_fallbacks_total", "Answers that did not come from the LLM, by reason.", ("reason",)
+        )
+        self.retries = self.registry.counter("agent_retries_total", "Retried operation attempts.")
+        self.cache_lookups = self.registry.counter(
+            "agent_response_cache_lookups_total", "Response cache lookups by result.", ("result",)
+        )
+        self.cache_hit_ratio = self.registry.gauge(
+            "agent_response_cache_hit_ratio", "Share of response cache lookups that hit."
+        )
+        self.cache_hit_ratio.set_function(self._cache_hit_ratio)
+
+    def observe_request(self, action: str, status: str, seconds: float) -> None:
+        self.requests.inc(action=action, status=status)
+        self.request_duration.observe(seconds, action=action)
+
+    def observe_tool(self, tool: str, status: str) -> None:
+        self.tool_calls.inc(tool=tool, status=status)
+
+    def observe_fallback(self, reason: str) -> None:
+        self.fallbacks.inc(reason=reason)
+
+    def observe_cache_lookup(self, hit: bool) -> None:
+        self.cache_lookups.inc(result="hit" if hit else "miss")
+
+    def export(self, trace: Any) -> None:
+        for record in trace.spans:
+            if record.duration_ms is not None:
+                self.stage_duration.observe(record.duration_ms / 1000.0, stage=record.name)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    def _cache_hit_ratio(self) -> float:
+        hits = self.cache_lookups.value(result="hit")
+        total = hits + self.cache_lookups.value(result="miss")
+        return hits / total if total else 0.0
+
+
+def _cumulative(counts: Sequence[int]) -> List[int]:
+    running = 0
+    cumulative = []
+    for count in counts:
+        running += count
+        cumulative.append(running)
+    return cumulative
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return f"{value:.1f}"
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
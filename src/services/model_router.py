@@ -0,0 +1,134 @@
+"""Model tier routing and endpoint balancing for Ollama generation."""
+
+from __future__ import annotations
+
+import json
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Sequence, Set, Tuple
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """One model option with the request shapes it is allowed to serve."""
+
+    name: str
+    model: str
+    max_context_chars: int
+    max_records: int
+    latency_budget_seconds: float
+    sources: Tuple[str, ...] = ()
+
+    def accepts(self, context_chars: int, record_count: int, sources: Set[str]) -> bool:
+        if context_chars > self.max_context_chars or record_count > self.max_records:
+            return False
+        return not self.sources or sources.issubset(self.sources)
+
+
+class ModelRouter:
+    """Pick the cheapest tier whose limits fit the request context.
+
+    Tiers are ordered from smallest to largest. The last tier is the
+    catch-all and serves every context that no smaller tier accepts.
+    """
+
+    def __init__(self, tiers: Sequence[ModelTier]) -> None:
+        if not tiers:
+            raise ValueError("ModelRouter requires at least one tier.")
+        self._tiers = tuple(tiers)
+
+    @property
+    def tiers(self) -> Tuple[ModelTier, ...]:
+        return self._tiers
+
+    def select(self, context: Any) -> ModelTier:
+        context_chars = len(json.dumps(context, ensure_ascii=True, sort_keys=True))
+        record_count = count_context_records(context)
+        sources = context_sources(context)
+        for tier in self._tiers[:-1]:
+            if tier.accepts(context_chars, record_count, sources):
+                return tier
+        return self._tiers[-1]
+
+
+class EndpointPool:
+    """Least-outstanding-requests selection across Ollama base URLs."""
+
+    def __init__(self, base_urls: Sequence[str]) -> None:
+        urls = [url.rstrip("/") for url in base_urls if url.strip()]
+        if not urls:
+            raise ValueError("EndpointPool requires at least one base URL.")
+        self._lock = threading.Lock()
+        self._outstanding: Dict[str, int] = {url: 0 for url in urls}
+        self._next_index = 0
+
+    @property
+    def base_urls(self) -> List[str]:
+        return list(self._outstanding)
+
+    def acquire(self) -> str:
+        with self._lock:
+            urls = list(self._outstanding)
+            lowest = min(self._outstanding.values())
+            # Rotate the starting point so ties spread evenly across instances.
+            for offset in range(len(urls)):
+                url = urls[(self._next_index + offset) % len(urls)]
+                if self._outstanding[url] == lowest:
+                    self._next_index = (urls.index(url) + 1) % len(urls)
+                    self._outstanding[url] += 1
+                    return url
+        raise RuntimeError("No Ollama endpoint available.")  # pragma: no cover
+
+    def release(self, base_url: str) -> None:
+        with self._lock:
+            if self._outstanding.get(base_url, 0) > 0:
+                self._outstanding[base_url] -= 1
+
+    @contextmanager
+    def lease(self) -> Iterator[str]:
+        base_url = self.acquire()
+        try:
+            yield base_url
+        finally:
+            self.release(base_url)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._outstanding)
+
+
+def count_context_records(context: Any) -> int:
+    if not isinstance(context, dict):
+        return 1
+    if "sources" in context:
+        return sum(
+            source_record_count(entry)
+            for entry in context.get("sources", [])
+            if isinstance(entry, dict)
+        )
+    if "records" in context:
+        return len(context.get("records") or [])
+    return 1
+
+
+def source_record_count(entry: Dict[str, Any]) -> int:
+    """Rows carried by one entry of a multi-source context."""
+    if "match_count" in entry:
+        return int(entry["match_count"])
+    if "records" in entry:
+        return len(entry.get("records") or [])
+    return 1 if entry.get("record") else 0
+
+
+def context_sources(context: Any) -> Set[str]:
+    if not isinstance(context, dict):
+        return set()
+    if "sources" in context:
+        return {
+            str(entry.get("source"))
+            for entry in context.get("sources", [])
+            if isinstance(entry, dict) and entry.get("source")
+        }
+    source = context.get("source")
+    return {str(source)} if source else set()
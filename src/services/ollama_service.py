@@ -2,61 +2,370 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Protocol, Sequence, Union
 from urllib import error, request
 
+from src.schemas.generation_schema import GenerationAborted, GenerationResult, GenerationTelemetry
+
+from .async_http import open_request, request_json
+from .model_router import EndpointPool, ModelRouter, ModelTier
+from .tracing import span
+
+SYSTEM_PROMPT = (
+    "You answer user questions using only the provided tool data.\n"
+    "If the data is insufficient, say so briefly.\n"
+    "Keep the answer concise and factual."
+)
+
+
+class StreamMonitor(Protocol):
+    """Incremental checker fed with each streamed answer chunk."""
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        ...
+
 
 class OllamaService:
-    """Minimal wrapper around the Ollama generate API."""
+    """Minimal wrapper around the Ollama chat API.
+
+    The static instruction preamble is sent as a persistent system message so
+    Ollama can reuse the evaluated prefix from its KV cache, and `keep_alive`
+    keeps the model resident between requests. An optional `ModelRouter`
+    picks the model per request, and requests are spread over every base URL
+    with least-outstanding-requests balancing. When a `stream_guard` factory
+    is configured, answers are streamed and generation is cancelled as soon as
+    the guard reports a refusal.
+    """
 
     def __init__(
         self,
         base_url: str = "http://localhost:11434",
         model: str = "qwen2.5:3b",
         timeout_seconds: float = 30.0,
+        keep_alive: Union[str, int, float] = -1,
+        cold_load_threshold_ms: float = 500.0,
+        router: Optional[ModelRouter] = None,
+        base_urls: Optional[Sequence[str]] = None,
+        stream_guard: Optional[Callable[[], StreamMonitor]] = None,
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._model = model
         self._timeout_seconds = timeout_seconds
+        self._keep_alive = parse_keep_alive(keep_alive)
+        self._cold_load_threshold_ms = cold_load_threshold_ms
+        self._router = router or ModelRouter(
+            [
+                ModelTier(
+                    name="default",
+                    model=model,
+                    max_context_chars=0,
+                    max_records=0,
+                    latency_budget_seconds=timeout_seconds,
+                )
+            ]
+        )
+        self._endpoints = EndpointPool(list(base_urls or []) or [base_url])
+        self._stream_guard = stream_guard
 
     @staticmethod
     def build_prompt(query: str, context: Dict[str, Any]) -> str:
+        return f"{SYSTEM_PROMPT}\n\n{OllamaService.build_user_prompt(query, context)}"
+
+    @staticmethod
+    def build_user_prompt(query: str, context: Dict[str, Any]) -> str:
         return (
-            "You answer user questions using only the provided tool data.\n"
-            "If the data is insufficient, say so briefly.\n"
-            "Keep the answer concise and factual.\n\n"
             f"User query: {query.strip()}\n"
             f"Tool data: {json.dumps(context, ensure_ascii=True, sort_keys=True)}"
         )
 
+    def build_chat_payload(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return {
+            "model": model or self._model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self.build_user_prompt(query, context)},
+            ],
+            "stream": False,
+            "keep_alive": self._keep_alive,
+        }
+
+    def select_tier(self, context: Dict[str, Any]) -> ModelTier:
+        return self._router.select(context)
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Load every tier model and evaluate the system prefix ahead of traffic."""
+        results: Dict[str, Any] = {}
+        for base_url in self._endpoints.base_urls:
+            for model in sorted({tier.model for tier in self._router.tiers}):
+                results[f"{base_url}|{model}"] = self.post(
+                    "/api/chat",
+                    {
+                        "model": model,
+                        "messages": [{"role": "system", "content": SYSTEM_PROMPT}],
+                        "stream": False,
+                        "keep_alive": self._keep_alive,
+                        "options": {"num_predict": 1},
+                    },
+                    base_url=base_url,
+                )
+        return results
+
+    def chat(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        tier: Optional[ModelTier] = None,
+    ) -> Dict[str, Any]:
+        """Return the raw Ollama chat payload for a contextual question."""
+        tier = tier or self.select_tier(context)
+        return self.post(
+            "/api/chat",
+            self.build_chat_payload(query, context, model=tier.model),
+            timeout_seconds=min(self._timeout_seconds, tier.latency_budget_seconds),
+        )
+
     def answer_with_context(self, query: str, context: Dict[str, Any]) -> str:
-        prompt = self.build_prompt(query, context)
-
-        payload = json.dumps(
-            {
-                "model": self._model,
-                "prompt": prompt,
-                "stream": False,
-            }
-        ).encode("utf-8")
+        return self.generate_answer(query, context).answer
+
+    def generate_answer(self, query: str, context: Dict[str, Any]) -> GenerationResult:
+        """Generate a contextual answer and keep Ollama's timing counters."""
+        tier = self.select_tier(context)
+        with span("ollama.generate", model=tier.model, tier=tier.name):
+            if self._stream_guard is not None:
+                return self._generate_streaming(query, context, tier, self._stream_guard())
+
+            response_payload = self.chat(query, context, tier)
+            message = response_payload.get("message") or {}
+            return self._build_result(str(message.get("content", "")), response_payload, tier)
+
+    async def agenerate_answer(self, query: str, context: Dict[str, Any]) -> GenerationResult:
+        """Async counterpart of `generate_answer` on a non-blocking connection."""
+        tier = self.select_tier(context)
+        with span("ollama.generate", model=tier.model, tier=tier.name):
+            if self._stream_guard is not None:
+                return await self._agenerate_streaming(query, context, tier, self._stream_guard())
+
+            response_payload = await self.apost(
+                "/api/chat",
+                self.build_chat_payload(query, context, model=tier.model),
+                timeout_seconds=min(self._timeout_seconds, tier.latency_budget_seconds),
+            )
+            message = response_payload.get("message") or {}
+            return self._build_result(str(message.get("content", "")), response_payload, tier)
+
+    def _build_result(
+        self,
+        content: str,
+        final_payload: Dict[str, Any],
+        tier: ModelTier,
+    ) -> GenerationResult:
+        answer = content.strip()
+        if not answer:
+            raise ValueError("Ollama returned an empty response.")
+        return GenerationResult(
+            answer=answer,
+            telemetry=parse_generation_telemetry(
+                final_payload,
+                tier.model,
+                self._cold_load_threshold_ms,
+                tier=tier.name,
+            ),
+        )
+
+    def _generate_streaming(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        tier: ModelTier,
+        monitor: StreamMonitor,
+    ) -> GenerationResult:
+        payload = self.build_chat_payload(query, context, model=tier.model)
+        payload["stream"] = True
+        timeout_seconds = min(self._timeout_seconds, tier.latency_budget_seconds)
+        chunks: List[str] = []
+        final_event: Dict[str, Any] = {}
+
+        with self._endpoints.lease() as base_url:
+            # Leaving this block closes the connection, which makes Ollama cancel
+            # the generation and free the slot.
+            with self._open(base_url, "/api/chat", payload, timeout_seconds) as response:
+                for raw_line in response:
+                    event = _consume_stream_line(raw_line, chunks, monitor)
+                    if event.get("done"):
+                        final_event = event
+                        break
+
+        return self._build_result("".join(chunks), final_event, tier)
+
+    async def _agenerate_streaming(
+        self,
+        query: str,
+        context: Dict[str, Any],
+        tier: ModelTier,
+        monitor: StreamMonitor,
+    ) -> GenerationResult:
+        payload = self.build_chat_payload(query, context, model=tier.model)
+        payload["stream"] = True
+        timeout_seconds = min(self._timeout_seconds, tier.latency_budget_seconds)
+        chunks: List[str] = []
+        final_event: Dict[str, Any] = {}
+
+        with self._endpoints.lease() as base_url:
+            try:
+                response = await open_request(
+                    "POST",
+                    f"{base_url}/api/chat",
+                    json.dumps(payload).encode("utf-8"),
+                    timeout_seconds=timeout_seconds,
+                )
+            except (OSError, asyncio.TimeoutError) as exc:
+                raise RuntimeError(f"Ollama is unreachable at {base_url}.") from exc
+
+            async with response:
+                if response.status >= 400:
+                    detail = (await response.read()).decode("utf-8", errors="replace")
+                    raise RuntimeError(
+                        f"Ollama request failed with status {response.status}: {detail}"
+                    )
+                async for raw_line in response.iter_lines():
+                    event = _consume_stream_line(raw_line, chunks, monitor)
+                    if event.get("done"):
+                        final_event = event
+                        break
+
+        return self._build_result("".join(chunks), final_event, tier)
+
+    def post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        base_url: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        if base_url is None:
+            with self._endpoints.lease() as leased_url:
+                return self._post(leased_url, path, payload, timeout_seconds)
+        return self._post(base_url.rstrip("/"), path, payload, timeout_seconds)
+
+    async def apost(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        timeout_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        with self._endpoints.lease() as base_url:
+            try:
+                status, body = await request_json(
+                    "POST",
+                    f"{base_url}{path}",
+                    payload=payload,
+                    timeout_seconds=timeout_seconds or self._timeout_seconds,
+                )
+            except (OSError, asyncio.TimeoutError) as exc:
+                raise RuntimeError(f"Ollama is unreachable at {base_url}.") from exc
+
+        if status >= 400:
+            detail = body if isinstance(body, str) else json.dumps(body)
+            raise RuntimeError(f"Ollama request failed with status {status}: {detail}")
+        if not isinstance(body, dict):
+            raise RuntimeError("Ollama returned a non-JSON response.")
+        return body
+
+    def endpoint_load(self) -> Dict[str, int]:
+        """Return outstanding requests per Ollama base URL."""
+        return self._endpoints.snapshot()
+
+    def _post(
+        self,
+        base_url: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout_seconds: Optional[float],
+    ) -> Dict[str, Any]:
+        with self._open(base_url, path, payload, timeout_seconds) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def _open(
+        self,
+        base_url: str,
+        path: str,
+        payload: Dict[str, Any],
+        timeout_seconds: Optional[float],
+    ) -> Any:
         http_request = request.Request(
-            url=f"{self._base_url}/api/generate",
-            data=payload,
+            url=f"{base_url}{path}",
+            data=json.dumps(payload).encode("utf-8"),
             headers={"Content-Type": "application/json"},
             method="POST",
         )
 
         try:
-            with request.urlopen(http_request, timeout=self._timeout_seconds) as response:
-                response_payload = json.loads(response.read().decode("utf-8"))
+            return request.urlopen(http_request, timeout=timeout_seconds or self._timeout_seconds)
         except error.HTTPError as exc:
             detail = exc.read().decode("utf-8", errors="replace")
             raise RuntimeError(f"Ollama request failed with status {exc.code}: {detail}") from exc
         except error.URLError as exc:
-            raise RuntimeError(f"Ollama is unreachable at {self._base_url}.") from exc
+            raise RuntimeError(f"Ollama is unreachable at {base_url}.") from exc
 
-        answer = str(response_payload.get("response", "")).strip()
-        if not answer:
-            raise ValueError("Ollama returned an empty response.")
-        return answer
+
+def _consume_stream_line(
+    raw_line: bytes,
+    chunks: List[str],
+    monitor: StreamMonitor,
+) -> Dict[str, Any]:
+    """Append one streamed chunk and raise once the monitor reports a refusal."""
+    if not raw_line.strip():
+        return {}
+    event = json.loads(raw_line.decode("utf-8"))
+    if event.get("error"):
+        raise RuntimeError(f"Ollama stream failed: {event['error']}")
+    chunk = str((event.get("message") or {}).get("content", ""))
+    chunks.append(chunk)
+    risk = monitor.feed(chunk)
+    if risk is not None:
+        raise GenerationAborted("".join(chunks).strip(), risk)
+    return event
+
+
+def parse_generation_telemetry(
+    payload: Dict[str, Any],
+    model: str,
+    cold_load_threshold_ms: float = 500.0,
+    tier: str = "",
+) -> GenerationTelemetry:
+    """Convert Ollama nanosecond counters into millisecond telemetry."""
+    load_duration_ms = _ns_to_ms(payload.get("load_duration"))
+    return GenerationTelemetry(
+        model=str(payload.get("model") or model),
+        total_duration_ms=_ns_to_ms(payload.get("total_duration")),
+        load_duration_ms=load_duration_ms,
+        prompt_eval_count=int(payload.get("prompt_eval_count") or 0),
+        prompt_eval_duration_ms=_ns_to_ms(payload.get("prompt_eval_duration")),
+        eval_count=int(payload.get("eval_count") or 0),
+        eval_duration_ms=_ns_to_ms(payload.get("eval_duration")),
+        cold_load=load_duration_ms >= cold_load_threshold_ms,
+        tier=tier,
+    )
+
+
+def _ns_to_ms(value: Any) -> float:
+    return round(int(value or 0) / 1_000_000, 3)
+
+
+def parse_keep_alive(value: Union[str, int, float]) -> Union[str, int, float]:
+    """Convert numeric keep-alive strings to numbers; Ollama treats negatives as forever."""
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return int(number) if number.is_integer() else number
@@ -0,0 +1,97 @@
+"""Per-request query analysis shared by the decision engine, tools, and guardrail."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+STOPWORDS = {
+    "a", "an", "and", "are", "can", "for", "how", "i", "is", "me", "of",
+    "on", "our", "please", "tell", "the", "this", "to", "what", "when", "who", "why",
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_USER_ID = re.compile(r"\b\d{3,}\b")
+
+
+def normalize_text(value: Any) -> str:
+    """Lowercase with runs of whitespace collapsed to one space."""
+    if value is None:
+        return ""
+    return " ".join(str(value).lower().split())
+
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    """Everything derived from the query text, computed once per request.
+
+    `tokens` are all alphanumeric runs of the normalized text; `terms` drop
+    stopwords and single characters and feed the matcher's scoring, with
+    `phrases` the 3- then 2-term windows over them. Keyword tests go through
+    `contains`, which remembers each keyword's result, so the decision engine
+    and the guardrail pre-check share their scans.
+    """
+
+    query: str
+    normalized: str
+    tokens: Tuple[str, ...]
+    token_set: FrozenSet[str]
+    terms: Tuple[str, ...]
+    term_set: FrozenSet[str]
+    phrases: Tuple[str, ...]
+    user_ids: Tuple[str, ...]
+    _hits: Dict[str, bool] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> Optional["QueryAnalysis"]:
+        """The analysis passed in tool params, if it was built for their `query`."""
+        analysis = params.get("analysis")
+        if isinstance(analysis, cls) and analysis.query == params.get("query"):
+            return analysis
+        return None
+
+    def contains(self, keyword: str) -> bool:
+        """Whether `keyword` occurs anywhere in the normalized text."""
+        hit = self._hits.get(keyword)
+        if hit is None:
+            hit = self._hits[keyword] = keyword in self.normalized
+        return hit
+
+    def contains_any(self, keywords: Iterable[str]) -> bool:
+        return any(self.contains(keyword) for keyword in keywords)
+
+    def has_keyword(self, keyword: str) -> bool:
+        """Whole-token match for single words, substring match for phrases."""
+        if " " in keyword:
+            return self.contains(keyword)
+        return keyword in self.token_set
+
+
+def analyze_query(query: str) -> QueryAnalysis:
+    normalized = normalize_text(query)
+    tokens = tuple(_TOKEN.findall(normalized))
+    terms = tuple(token for token in tokens if len(token) > 1 and token not in STOPWORDS)
+    return QueryAnalysis(
+        query=query,
+        normalized=normalized,
+        tokens=tokens,
+        token_set=frozenset(tokens),
+        terms=terms,
+        term_set=frozenset(terms),
+        phrases=_phrase_windows(terms),
+        user_ids=tuple(_USER_ID.findall(normalized)),
+    )
+
+
+def params_analysis(params: Dict[str, Any]) -> QueryAnalysis:
+    """The request's analysis from tool params, or a fresh one for `params["query"]`."""
+    return QueryAnalysis.from_params(params) or analyze_query(str(params.get("query", "")))
+
+
+def _phrase_windows(terms: Tuple[str, ...]) -> Tuple[str, ...]:
+    phrases = []
+    for size in (3, 2):
+        for index in range(0, max(len(terms) - size + 1, 0)):
+            phrases.append(" ".join(terms[index : index + size]))
+    return tuple(phrases)
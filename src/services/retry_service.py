@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
-from typing import Callable, Optional, TypeVar
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
 T = TypeVar("T")
 
 
 class RetryService:
-    """Execute operation with deterministic retry behavior."""
+    """Execute operation with deterministic retry behavior.
+
+    `retry_counter`, when given, is a metrics counter bumped on every retry.
+    """
+
+    def __init__(self, retry_counter: Any = None) -> None:
+        self._retry_counter = retry_counter
 
     def execute(
         self,
@@ -26,10 +32,45 @@ class RetryService:
                 return operation()
             except Exception as exc:  # noqa: BLE001 - re-raised at the end.
                 last_error = exc
-                if attempt <= retries and on_retry is not None:
-                    on_retry(attempt, exc)
+                if attempt <= retries:
+                    self._note_retry(attempt, exc, on_retry)
+                if attempt > retries:
+                    break
+
+        assert last_error is not None
+        raise last_error
+
+    async def aexecute(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        retries: int,
+        on_retry: Optional[Callable[[int, Exception], None]] = None,
+    ) -> T:
+        """Async counterpart of `execute` for coroutine operations."""
+        if retries < 0:
+            raise ValueError("retries must be >= 0")
+
+        last_error: Optional[Exception] = None
+        for attempt in range(1, retries + 2):
+            try:
+                return await operation()
+            except Exception as exc:  # noqa: BLE001 - re-raised at the end.
+                last_error = exc
+                if attempt <= retries:
+                    self._note_retry(attempt, exc, on_retry)
                 if attempt > retries:
                     break
 
         assert last_error is not None
         raise last_error
+
+    def _note_retry(
+        self,
+        attempt: int,
+        exc: Exception,
+        on_retry: Optional[Callable[[int, Exception], None]],
+    ) -> None:
+        if self._retry_counter is not None:
+            self._retry_counter.inc()
+        if on_retry is not None:
+            on_retry(attempt, exc)
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
-from typing import Callable, TypeVar
+from typing import Awaitable, Callable, TypeVar
 
 T = TypeVar("T")
 
@@ -23,3 +24,21 @@ class TimeoutService:
                 f"Operation timed out after {elapsed:.3f}s (limit={timeout_seconds:.3f}s)."
             )
         return result
+
+    async def arun_with_timeout(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        timeout_seconds: float,
+    ) -> T:
+        """Await operation and cancel it once the timeout threshold passes."""
+        if timeout_seconds <= 0:
+            raise ValueError("timeout_seconds must be > 0")
+
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(operation(), timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            elapsed = time.monotonic() - started
+            raise TimeoutError(
+                f"Operation timed out after {elapsed:.3f}s (limit={timeout_seconds:.3f}s)."
+            ) from exc
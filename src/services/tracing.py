@@ -0,0 +1,161 @@
+"""Lightweight per-request tracing with nested stage spans.
+
+A trace is opened once per request by `Tracer.trace`. Code anywhere below it
+(tools, retrieval, the LLM client) opens child spans with the module-level
+`span` helper; when no trace is active the helper does nothing, so library
+code can be instrumented unconditionally. The active trace and span live in
+context variables, so they follow asyncio tasks automatically. Work handed to
+a thread pool must be submitted through `bind_context` to stay attached.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol
+
+_ACTIVE_TRACE: ContextVar[Optional["Trace"]] = ContextVar("agent_trace", default=None)
+_ACTIVE_SPAN: ContextVar[Optional[int]] = ContextVar("agent_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed stage. Times are milliseconds relative to the trace start."""
+
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start_ms: float
+    duration_ms: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": self.start_ms,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """Spans recorded for a single request, safe to append from worker threads."""
+
+    def __init__(self, request_id: str) -> None:
+        self.request_id = request_id
+        self.started_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Span] = []
+        self._origin_ns = time.perf_counter_ns()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter_ns() - self._origin_ns) / 1_000_000, 3)
+
+    def open_span(self, name: str, parent_id: Optional[int], attributes: Dict[str, Any]) -> Span:
+        with self._lock:
+            record = Span(name, next(self._ids), parent_id, self.elapsed_ms(), attributes=attributes)
+            self.spans.append(record)
+        return record
+
+    def close_span(self, record: Span) -> None:
+        record.duration_ms = round(self.elapsed_ms() - record.start_ms, 3)
+
+    def finish(self) -> None:
+        self.duration_ms = self.elapsed_ms()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [record.to_dict() for record in self.spans]
+        return {
+            "request_id": self.request_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "spans": spans,
+        }
+
+
+class JsonlTraceExporter:
+    """Appends one JSON line per finished trace."""
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_dict(), ensure_ascii=True, default=str)
+        with self._lock:
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+class TraceExporter(Protocol):
+    def export(self, trace: Trace) -> None:
+        ...
+
+
+class Tracer:
+    """Opens request traces and hands finished ones to each exporter."""
+
+    def __init__(self, *exporters: TraceExporter) -> None:
+        self._exporters = exporters
+
+    @contextmanager
+    def trace(self, name: str = "request", request_id: Optional[str] = None, **attributes: Any) -> Iterator[Trace]:
+        current = Trace(request_id or uuid.uuid4().hex)
+        trace_token = _ACTIVE_TRACE.set(current)
+        span_token = _ACTIVE_SPAN.set(None)
+        try:
+            with span(name, **attributes):
+                yield current
+        finally:
+            _ACTIVE_SPAN.reset(span_token)
+            _ACTIVE_TRACE.reset(trace_token)
+            current.finish()
+            for exporter in self._exporters:
+                exporter.export(current)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a stage under the active span; a no-op outside of a trace."""
+    current = _ACTIVE_TRACE.get()
+    if current is None:
+        yield None
+        return
+
+    record = current.open_span(name, _ACTIVE_SPAN.get(), attributes)
+    token = _ACTIVE_SPAN.set(record.span_id)
+    try:
+        yield record
+    except BaseException as exc:
+        record.attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        _ACTIVE_SPAN.reset(token)
+        current.close_span(record)
+
+
+def current_trace() -> Optional[Trace]:
+    return _ACTIVE_TRACE.get()
+
+
+def bind_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap `fn` so it runs in a copy of the caller's context on another thread.
+
+    The copy carries the active trace and any other context-scoped state,
+    such as a batch's shared structured retrieval.
+    """
+    context = copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
@@ -6,6 +6,7 @@ import json
 from typing import Any, Dict, Optional
 from urllib import parse, request
 
+from src.services.async_http import request_json
 
 try:
     import requests  # type: ignore
@@ -42,3 +43,18 @@ class UrllibRequester:
 
 def build_requester(requester: Any = None) -> Any:
     return requester or requests or UrllibRequester()
+
+
+class AsyncRequester:
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 5.0,
+    ) -> UrllibResponse:
+        status, payload = await request_json("GET", url, params=params, timeout_seconds=timeout)
+        return UrllibResponse(status, payload)
+
+
+def build_async_requester(requester: Any = None) -> Any:
+    return requester or AsyncRequester()
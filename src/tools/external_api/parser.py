@@ -5,6 +5,7 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, List
 
+from src.services.query_analysis import QueryAnalysis, normalize_text
 
 GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
 FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
@@ -36,7 +37,8 @@ def normalize_query(params: Dict[str, Any]) -> str:
     query = params.get("query")
     if not isinstance(query, str) or not query.strip():
         raise ValueError("external_api_tool requires non-empty string 'query'.")
-    return " ".join(query.lower().split())
+    analysis = QueryAnalysis.from_params(params)
+    return analysis.normalized if analysis is not None else normalize_text(query)
 
 
 def extract_city(query: str) -> str:
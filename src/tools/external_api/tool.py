@@ -6,8 +6,9 @@ from typing import Any, Callable, Dict, Optional
 
 from src.services.retry_service import RetryService
 from src.services.timeout_service import TimeoutService
+from src.services.tracing import span
 
-from .client import build_requester
+from .client import build_async_requester, build_requester
 from .parser import (
     FORECAST_URL,
     GEOCODE_URL,
@@ -41,24 +42,20 @@ class ExternalAPITool:
         timeout_service: Optional[TimeoutService] = None,
         logger: Optional[LoggerFn] = None,
         requester: Any = None,
+        async_requester: Any = None,
     ) -> None:
         self._retry = retry_service or RetryService()
         self._timeout = timeout_service or TimeoutService()
         self._logger = logger
         self._requester = build_requester(requester)
+        self._async_requester = build_async_requester(async_requester)
         self._geocode_url = GEOCODE_URL
         self._forecast_url = FORECAST_URL
 
     def run(self, params: Dict[str, Any]) -> Dict[str, Any]:
         query = normalize_query(params)
         if not self._is_weather_query(query):
-            return {
-                "status": "fallback",
-                "message": "External API tool currently supports weather queries only.",
-                "error": "unsupported_external_query",
-                "data": {},
-                "query": query,
-            }
+            return self._unsupported_response(query)
 
         city = extract_city(query)
         timeout_seconds = float(params.get("timeout_seconds", 5.0))
@@ -66,37 +63,80 @@ class ExternalAPITool:
 
         def operation() -> Dict[str, Any]:
             location = self._lookup_location(city, timeout_seconds)
-            data = self._fetch_weather(location, timeout_seconds)
-            return {
-                "status": "ok",
-                "message": f"Cuaca saat ini di {data['city']}: {data['temperature_c']}C, {data['condition']}.",
-                "data": data,
-                "query": query,
-            }
-
-        try:
-            return self._retry.execute(
-                operation=lambda: self._timeout.run_with_timeout(operation, timeout_seconds),
-                retries=max_retries,
-                on_retry=self._on_retry,
-            )
-        except Exception as exc:
-            return {
-                "status": "fallback",
-                "message": f"External weather API unavailable for {city}. Please retry later.",
-                "error": str(exc),
-                "data": {},
-            }
+            return self._success_response(query, self._fetch_weather(location, timeout_seconds))
+
+        with span("external_api.run", city=city) as record:
+            try:
+                response = self._retry.execute(
+                    operation=lambda: self._timeout.run_with_timeout(operation, timeout_seconds),
+                    retries=max_retries,
+                    on_retry=self._on_retry,
+                )
+            except Exception as exc:
+                response = self._failure_response(city, exc)
+            if record is not None:
+                record.attributes["status"] = response["status"]
+            return response
+
+    async def arun(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of `run` using the non-blocking requester."""
+        query = normalize_query(params)
+        if not self._is_weather_query(query):
+            return self._unsupported_response(query)
+
+        city = extract_city(query)
+        timeout_seconds = float(params.get("timeout_seconds", 5.0))
+        max_retries = int(params.get("max_retries", 2))
+
+        async def operation() -> Dict[str, Any]:
+            location = await self._alookup_location(city, timeout_seconds)
+            return self._success_response(query, await self._afetch_weather(location, timeout_seconds))
+
+        with span("external_api.run", city=city) as record:
+            try:
+                response = await self._retry.aexecute(
+                    operation=lambda: self._timeout.arun_with_timeout(operation, timeout_seconds),
+                    retries=max_retries,
+                    on_retry=self._on_retry,
+                )
+            except Exception as exc:
+                response = self._failure_response(city, exc)
+            if record is not None:
+                record.attributes["status"] = response["status"]
+            return response
+
+    @staticmethod
+    def _unsupported_response(query: str) -> Dict[str, Any]:
+        return {
+            "status": "fallback",
+            "message": "External API tool currently supports weather queries only.",
+            "error": "unsupported_external_query",
+            "data": {},
+            "query": query,
+        }
+
+    @staticmethod
+    def _success_response(query: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "message": f"Cuaca saat ini di {data['city']}: {data['temperature_c']}C, {data['condition']}.",
+            "data": data,
+            "query": query,
+        }
+
+    @staticmethod
+    def _failure_response(city: str, exc: Exception) -> Dict[str, Any]:
+        return {
+            "status": "fallback",
+            "message": f"External weather API unavailable for {city}. Please retry later.",
+            "error": str(exc),
+            "data": {},
+        }
 
     def _lookup_location(self, city: str, timeout_seconds: float) -> Dict[str, Any]:
         response = self._requester.get(
             self._geocode_url,
-            params={
-                "name": city,
-                "count": 5,
-                "language": "en",
-                "format": "json",
-            },
+            params=self._geocode_params(city),
             timeout=timeout_seconds,
         )
         response.raise_for_status()
@@ -105,20 +145,51 @@ class ExternalAPITool:
     def _fetch_weather(self, location: Dict[str, Any], timeout_seconds: float) -> Dict[str, Any]:
         response = self._requester.get(
             self._forecast_url,
-            params={
-                "latitude": location["latitude"],
-                "longitude": location["longitude"],
-                "current": (
-                    "temperature_2m,apparent_temperature,relative_humidity_2m,"
-                    "weather_code,wind_speed_10m"
-                ),
-                "timezone": "auto",
-            },
+            params=self._forecast_params(location),
             timeout=timeout_seconds,
         )
         response.raise_for_status()
         return parse_weather(response.json(), location)
 
+    async def _alookup_location(self, city: str, timeout_seconds: float) -> Dict[str, Any]:
+        response = await self._async_requester.get(
+            self._geocode_url,
+            params=self._geocode_params(city),
+            timeout=timeout_seconds,
+        )
+        response.raise_for_status()
+        return parse_location(response.json(), city)
+
+    async def _afetch_weather(self, location: Dict[str, Any], timeout_seconds: float) -> Dict[str, Any]:
+        response = await self._async_requester.get(
+            self._forecast_url,
+            params=self._forecast_params(location),
+            timeout=timeout_seconds,
+        )
+        response.raise_for_status()
+        return parse_weather(response.json(), location)
+
+    @staticmethod
+    def _geocode_params(city: str) -> Dict[str, Any]:
+        return {
+            "name": city,
+            "count": 5,
+            "language": "en",
+            "format": "json",
+        }
+
+    @staticmethod
+    def _forecast_params(location: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+            "current": (
+                "temperature_2m,apparent_temperature,relative_humidity_2m,"
+                "weather_code,wind_speed_10m"
+            ),
+            "timezone": "auto",
+        }
+
     def _on_retry(self, attempt: int, error: Exception) -> None:
         if self._logger is not None:
             self._logger(
@@ -126,6 +197,11 @@ class ExternalAPITool:
                 {"attempt": attempt, "error": str(error), "tool": "external_api_tool"},
             )
 
+    @classmethod
+    def supports_query(cls, query: str) -> bool:
+        """Whether a lowercased query asks for something this tool answers (weather)."""
+        return cls._is_weather_query(query)
+
     @classmethod
     def _is_weather_query(cls, query: str) -> bool:
         return any(keyword in query for keyword in cls._WEATHER_KEYWORDS)
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import re
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
 
 from src.schemas.risk_schema import RiskAssessment
+from src.services.query_analysis import QueryAnalysis, normalize_text
+
+_WHITESPACE = re.compile(r"\s+")
 
 
 class GuardrailTool:
@@ -12,13 +16,17 @@ class GuardrailTool:
 
     _REFUSAL_KEYWORDS = ("delete", "bypass", "drop", "disable security", "wipe")
     _ESCALATION_KEYWORDS = ("override", "admin access", "production access")
+    # Query-only rules, checked when there is no proposed answer yet (the agent's
+    # pre-check). The decision engine routes these queries to a tool like any other.
+    _SECRET_KEYWORDS = (
+        "admin password", "password for", "password of", "kata sandi admin", "kata sandi untuk",
+        "credentials for", "api key", "secret key", "access token", "private key",
+    )
 
     def run(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        query = self._to_text(params.get("query"))
-        proposed = self._to_text(params.get("proposed_answer"))
-        combined = f"{query} {proposed}".strip()
+        matches = self._keyword_matcher(params)
 
-        if any(keyword in combined for keyword in self._REFUSAL_KEYWORDS):
+        if matches(self._REFUSAL_KEYWORDS):
             return RiskAssessment(
                 status="refused",
                 risk_level="high",
@@ -26,7 +34,15 @@ class GuardrailTool:
                 escalation_required=True,
             ).to_dict()
 
-        if any(keyword in combined for keyword in self._ESCALATION_KEYWORDS):
+        if not params.get("proposed_answer") and matches(self._SECRET_KEYWORDS):
+            return RiskAssessment(
+                status="refused",
+                risk_level="high",
+                reason="Request for credentials or secrets refused by guardrail policy.",
+                escalation_required=True,
+            ).to_dict()
+
+        if matches(self._ESCALATION_KEYWORDS):
             return RiskAssessment(
                 status="approved",
                 risk_level="medium",
@@ -41,8 +57,53 @@ class GuardrailTool:
             escalation_required=False,
         ).to_dict()
 
+    def stream_monitor(self) -> "StreamingGuardrail":
+        """Return a fresh incremental checker for one streamed answer."""
+        return StreamingGuardrail(self._REFUSAL_KEYWORDS)
+
+    @classmethod
+    def _keyword_matcher(cls, params: Dict[str, Any]) -> Callable[[Iterable[str]], bool]:
+        analysis = QueryAnalysis.from_params(params)
+        proposed = cls._to_text(params.get("proposed_answer"))
+        if analysis is not None and not proposed:
+            # Pre-check: the text is the query alone, already scanned by the decision engine.
+            return analysis.contains_any
+        query = analysis.normalized if analysis is not None else cls._to_text(params.get("query"))
+        combined = f"{query} {proposed}".strip()
+        return lambda keywords: any(keyword in combined for keyword in keywords)
+
     @staticmethod
     def _to_text(value: Any) -> str:
-        if value is None:
-            return ""
-        return " ".join(str(value).lower().split())
+        return normalize_text(value)
+
+
+class StreamingGuardrail:
+    """Incremental refusal-keyword scan over streamed answer chunks.
+
+    Only a rolling tail of the normalized text is kept, sized so a keyword
+    split across chunk boundaries is still detected.
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self._keywords = tuple(keywords)
+        self._tail_size = max((len(keyword) for keyword in self._keywords), default=1) - 1
+        self._tail = ""
+        self._refusal: Optional[Dict[str, Any]] = None
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Scan the next chunk and return a refusal assessment once a keyword appears."""
+        if self._refusal is not None:
+            return self._refusal
+
+        window = _WHITESPACE.sub(" ", f"{self._tail}{chunk}".lower())
+        if any(keyword in window for keyword in self._keywords):
+            self._refusal = RiskAssessment(
+                status="refused",
+                risk_level="high",
+                reason="Unsafe content detected in generated answer.",
+                escalation_required=True,
+            ).to_dict()
+            return self._refusal
+
+        self._tail = window[-self._tail_size :] if self._tail_size > 0 else ""
+        return None
@@ -0,0 +1,156 @@
+"""Entity index for explicit structured-data matches.
+
+Built once per loaded candidate list, it answers the same question as the
+matcher's linear explicit-match scan — which candidates does the query name
+outright — with one pass over the query and direct lookups:
+
+- user IDs map to account positions;
+- an Aho-Corasick automaton over every lowercased SLA service name, policy
+  ID, and policy title finds each name that occurs in the query;
+- role keywords map to the policies scoped to them;
+- system-status candidates match whenever a system keyword occurs.
+
+Matches come back in candidate-list order, so results equal the scan's.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.services.query_analysis import QueryAnalysis
+
+from .matcher import ROLE_KEYWORDS, SYSTEM_KEYWORDS
+
+KeepFn = Callable[[int], bool]
+# An index plus the filter its positions must pass for one query, if any.
+IndexPart = Tuple["EntityIndex", Optional[KeepFn]]
+
+
+class _Automaton:
+    """Aho-Corasick automaton: every pattern occurrence in one pass over the text."""
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[int]] = [[]]
+        self._fail: List[int] = [0]
+
+    def add(self, pattern: str, value: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append(value)
+
+    def build(self) -> None:
+        """Compute failure links; each node's outputs absorb those of its failure node."""
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def search(self, text: str) -> set[int]:
+        """Values of every added pattern that occurs in `text`; call `build` first."""
+        found: set[int] = set()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+
+class EntityIndex:
+    """Explicit-match lookups over one candidate list, built when the list is loaded."""
+
+    def __init__(self, candidates: Sequence[Dict[str, Any]]) -> None:
+        self.candidates = candidates
+        self._accounts: Dict[str, List[int]] = {}
+        self._roles: Dict[str, List[int]] = {}
+        self._system: List[int] = []
+        # An empty service name is "in" every query, as with the linear scan.
+        self._always: List[int] = []
+        self._automaton = _Automaton()
+        for position, candidate in enumerate(candidates):
+            self._add(position, candidate["source"], candidate["record"])
+        self._automaton.build()
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def match(self, analysis: QueryAnalysis, keep: Optional[KeepFn] = None) -> List[Dict[str, Any]]:
+        """Candidates the query names, in list order; `keep` filters positions."""
+        positions = set(self._always)
+        positions.update(self._automaton.search(analysis.normalized))
+        for user_id in set(analysis.user_ids):
+            positions.update(self._accounts.get(user_id, ()))
+        for role in ROLE_KEYWORDS.intersection(analysis.term_set):
+            positions.update(self._roles.get(role, ()))
+        if self._system and analysis.contains_any(SYSTEM_KEYWORDS):
+            positions.update(self._system)
+        return [
+            self.candidates[position]
+            for position in sorted(positions)
+            if keep is None or keep(position)
+        ]
+
+    def _add(self, position: int, source: str, record: Dict[str, Any]) -> None:
+        if source == "accounts":
+            self._accounts.setdefault(record.get("user_id"), []).append(position)
+        elif source == "sla_lookup":
+            service_name = str(record.get("service_name", "")).lower()
+            if service_name:
+                self._automaton.add(service_name, position)
+            else:
+                self._always.append(position)
+        elif source == "policies":
+            role_scope = {value.lower() for value in record.get("role_scope", [])}
+            for role in ROLE_KEYWORDS.intersection(role_scope):
+                self._roles.setdefault(role, []).append(position)
+            for name in (str(record.get("policy_id", "")).lower(), str(record.get("title", "")).lower()):
+                if name:
+                    self._automaton.add(name, position)
+        elif source == "system_status":
+            self._system.append(position)
+
+
+class IndexView:
+    """Several indexed lists, each optionally filtered, read as one concatenated list.
+
+    `match` only visits the matched positions; `candidates` runs the filters over
+    every position and is left for queries that name nothing explicitly.
+    """
+
+    def __init__(self, parts: Sequence[IndexPart]) -> None:
+        self._parts = parts
+
+    def match(self, analysis: QueryAnalysis) -> List[Dict[str, Any]]:
+        matched: List[Dict[str, Any]] = []
+        for index, keep in self._parts:
+            matched.extend(index.match(analysis, keep))
+        return matched
+
+    def candidates(self) -> List[Dict[str, Any]]:
+        selected: List[Dict[str, Any]] = []
+        for index, keep in self._parts:
+            if keep is None:
+                selected.extend(index.candidates)
+            else:
+                selected.extend(candidate for position, candidate in enumerate(index.candidates) if keep(position))
+        return selected
@@ -3,35 +3,52 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Union
 
+from src.services.query_analysis import STOPWORDS, QueryAnalysis, analyze_query
+
+if TYPE_CHECKING:
+    from .entity_index import IndexView
 
-STOPWORDS = {"a","an","and","are","can","for","how","i","is","me",
-             "of","on","our","please","tell","the","this","to","what","when","who","why",}
 ROLE_KEYWORDS = {"employee", "manager", "admin", "support"}
 SYSTEM_KEYWORDS = ("system status", "system load", "health", "incidents", "maintenance")
 EXPLICIT_MATCH_SCORE = 100
+_TOKEN = re.compile(r"[a-z0-9]+")
 
 
 def tokenize(text: str) -> List[str]:
-    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    tokens = _TOKEN.findall(text.lower())
     return [token for token in tokens if len(token) > 1 and token not in STOPWORDS]
 
 
-def match_candidates(query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    query_tokens = tokenize(query)
-    query_token_set = set(query_tokens)
-    query_phrases = _phrase_windows(query_tokens)
-    explicit_matches = _match_explicit_candidates(query, candidates)
+def match_candidates(
+    query: Union[str, QueryAnalysis],
+    candidates: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    analysis = query if isinstance(query, QueryAnalysis) else analyze_query(query)
+    explicit_matches = _match_explicit_candidates(analysis, candidates)
+    if explicit_matches:
+        return explicit_matches
+    return _select_ranked_candidates(analysis.normalized, analysis.term_set, analysis.phrases, candidates)
+
+
+def match_indexed(query: Union[str, QueryAnalysis], view: "IndexView") -> List[Dict[str, Any]]:
+    """`match_candidates` over an indexed view: explicit matches come from index lookups."""
+    analysis = query if isinstance(query, QueryAnalysis) else analyze_query(query)
+    explicit_matches = deduplicate_candidates(
+        [_with_score(candidate, EXPLICIT_MATCH_SCORE) for candidate in view.match(analysis)]
+    )
     if explicit_matches:
         return explicit_matches
-    return _select_ranked_candidates(query, query_token_set, query_phrases, candidates)
+    return _select_ranked_candidates(analysis.normalized, analysis.term_set, analysis.phrases, view.candidates())
 
 
-def _match_explicit_candidates(query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _match_explicit_candidates(analysis: QueryAnalysis, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     matched: List[Dict[str, Any]] = []
-    user_ids = set(re.findall(r"\b\d{3,}\b", query))
-    query_tokens = set(tokenize(query))
+    query = analysis.normalized
+    user_ids = set(analysis.user_ids)
+    query_tokens = analysis.term_set
+    system_query = analysis.contains_any(SYSTEM_KEYWORDS)
 
     for candidate in candidates:
         source = candidate["source"]
@@ -45,13 +62,13 @@ def _match_explicit_candidates(query: str, candidates: List[Dict[str, Any]]) ->
         if source == "policies" and _matches_policy(query, query_tokens, record):
             matched.append(_with_score(candidate, EXPLICIT_MATCH_SCORE))
             continue
-        if source == "system_status" and any(keyword in query for keyword in SYSTEM_KEYWORDS):
+        if source == "system_status" and system_query:
             matched.append(_with_score(candidate, EXPLICIT_MATCH_SCORE))
 
     return deduplicate_candidates(matched)
 
 
-def _matches_policy(query: str, query_tokens: set[str], record: Dict[str, Any]) -> bool:
+def _matches_policy(query: str, query_tokens: frozenset[str], record: Dict[str, Any]) -> bool:
     role_scope = {value.lower() for value in record.get("role_scope", [])}
     if ROLE_KEYWORDS.intersection(role_scope).intersection(query_tokens):
         return True
@@ -62,8 +79,8 @@ def _matches_policy(query: str, query_tokens: set[str], record: Dict[str, Any])
 
 def _select_ranked_candidates(
     query: str,
-    query_token_set: set[str],
-    query_phrases: List[str],
+    query_token_set: frozenset[str],
+    query_phrases: Sequence[str],
     candidates: List[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     scored = [
@@ -85,8 +102,8 @@ def _select_ranked_candidates(
 
 def _score_candidate(
     query: str,
-    query_token_set: set[str],
-    query_phrases: List[str],
+    query_token_set: frozenset[str],
+    query_phrases: Sequence[str],
     match_text: str,
 ) -> int:
     candidate_tokens = set(tokenize(match_text))
@@ -130,10 +147,3 @@ def _with_score(candidate: Dict[str, Any], score: int) -> Dict[str, Any]:
     enriched["score"] = score
     return enriched
 
-
-def _phrase_windows(tokens: List[str]) -> List[str]:
-    phrases: List[str] = []
-    for size in (3, 2):
-        for index in range(0, max(len(tokens) - size + 1, 0)):
-            phrases.append(" ".join(tokens[index : index + size]))
-    return phrases
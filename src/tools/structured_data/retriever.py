@@ -2,8 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Any, Callable, Dict, Iterable, List, Optional
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .entity_index import EntityIndex, IndexPart, IndexView
+
+QueryBuilder = Callable[[str, Optional[Dict[str, Any]]], Tuple[str, List[Any]]]
+CandidateBuilder = Callable[[Sequence[Sequence[Any]]], List[Dict[str, Any]]]
+RowFilter = Callable[[Sequence[Any]], bool]
 
 
 def connect_live_db(config: Dict[str, Any]) -> Any | None:
@@ -28,13 +36,37 @@ def connect_live_db(config: Dict[str, Any]) -> Any | None:
         return None
 
 
+async def connect_live_db_async(config: Dict[str, Any]) -> Any | None:
+    try:
+        import psycopg  # type: ignore
+    except Exception:
+        return None
+
+    try:
+        dsn = str(config.get("db_dsn", "")).strip()
+        if dsn:
+            return await psycopg.AsyncConnection.connect(
+                dsn,
+                connect_timeout=int(config["db_connect_timeout"]),
+            )
+        return await psycopg.AsyncConnection.connect(
+            host=config["db_host"],
+            port=int(config["db_port"]),
+            dbname=config["db_name"],
+            user=config["db_user"],
+            password=config["db_password"],
+            connect_timeout=int(config["db_connect_timeout"]),
+        )
+    except Exception:
+        return None
+
+
 def collect_all_candidates(conn: Any, schema: str) -> List[Dict[str, Any]]:
-    candidates: List[Dict[str, Any]] = []
-    candidates.extend(_collect_sla_candidates(conn, schema))
-    candidates.extend(_collect_policy_candidates(conn, schema))
-    candidates.extend(_collect_account_candidates(conn, schema))
-    candidates.extend(_collect_system_status_candidates(conn, schema))
-    return candidates
+    return collect_candidates_by_sources(
+        conn,
+        schema,
+        ("sla_lookup", "policies", "accounts", "system_status"),
+    )
 
 
 def collect_candidates_by_sources(
@@ -43,26 +75,154 @@ def collect_candidates_by_sources(
     sources: Iterable[str],
     query_hints: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
-    collectors: Dict[str, Callable[[Any, str, Optional[Dict[str, Any]]], List[Dict[str, Any]]]] = {
-        "sla_lookup": _collect_sla_candidates,
-        "policies": _collect_policy_candidates,
-        "accounts": _collect_account_candidates,
-        "system_status": _collect_system_status_candidates,
-    }
-
     candidates: List[Dict[str, Any]] = []
     for source in sources:
-        collector = collectors.get(source)
-        if collector is not None:
-            candidates.extend(collector(conn, schema, query_hints))
+        collector = _COLLECTORS.get(source)
+        if collector is None:
+            continue
+        rows = _fetch_rows(conn, *collector.build_query(schema, query_hints))
+        candidates.extend(collector.build_candidates(rows))
     return candidates
 
 
-def _collect_sla_candidates(
+async def acollect_candidates_by_sources(
     conn: Any,
     schema: str,
+    sources: Iterable[str],
     query_hints: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
+    """Async counterpart of `collect_candidates_by_sources` for async connections."""
+    candidates: List[Dict[str, Any]] = []
+    for source in sources:
+        collector = _COLLECTORS.get(source)
+        if collector is None:
+            continue
+        rows = await _afetch_rows(conn, *collector.build_query(schema, query_hints))
+        candidates.extend(collector.build_candidates(rows))
+    return candidates
+
+
+def row_filter(source: str, query_hints: Dict[str, Any]) -> Optional[RowFilter]:
+    """In-Python equivalent of the WHERE clause `source`'s query builds from `query_hints`, if any."""
+    collector = _COLLECTORS.get(source)
+    return collector.row_filter(query_hints) if collector is not None else None
+
+
+class SharedRetrieval:
+    """One retrieval pass per source, shared by every query in a batch.
+
+    Each source table is read once without filters, and its candidates and
+    `EntityIndex` are built from those rows once. Per-query hints are then
+    applied in memory by predicates that mirror the SQL `WHERE` clauses, so
+    every query sees the same rows it would have fetched on its own.
+    """
+
+    def __init__(self, conn: Any, schema: str) -> None:
+        self.conn = conn
+        self.closed = False
+        self._schema = schema
+        self._loaded: Dict[str, _LoadedSource] = {}
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def collect(
+        self,
+        sources: Iterable[str],
+        query_hints: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.collect_indexed(sources, query_hints).candidates()
+
+    async def acollect(
+        self,
+        sources: Iterable[str],
+        query_hints: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        return (await self.acollect_indexed(sources, query_hints)).candidates()
+
+    def collect_indexed(
+        self,
+        sources: Iterable[str],
+        query_hints: Optional[Dict[str, Any]] = None,
+    ) -> IndexView:
+        """The hint-filtered candidates of `sources` as an indexed view, built lazily."""
+        parts = []
+        for source in sources:
+            collector = _COLLECTORS.get(source)
+            if collector is None:
+                continue
+            with self._lock:
+                if source not in self._loaded:
+                    rows = _fetch_rows(self.conn, *collector.build_query(self._schema, None))
+                    self._loaded[source] = _load_source(collector, rows)
+            parts.append(self._loaded[source].part(collector, query_hints))
+        return IndexView(parts)
+
+    async def acollect_indexed(
+        self,
+        sources: Iterable[str],
+        query_hints: Optional[Dict[str, Any]] = None,
+    ) -> IndexView:
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        parts = []
+        for source in sources:
+            collector = _COLLECTORS.get(source)
+            if collector is None:
+                continue
+            async with self._async_lock:
+                if source not in self._loaded:
+                    rows = await _afetch_rows(self.conn, *collector.build_query(self._schema, None))
+                    self._loaded[source] = _load_source(collector, rows)
+            parts.append(self._loaded[source].part(collector, query_hints))
+        return IndexView(parts)
+
+
+class _LoadedSource(NamedTuple):
+    index: EntityIndex
+    # The row each candidate was built from; for policies, the first row of its group.
+    rows: Sequence[Sequence[Any]]
+
+    def part(self, collector: "_Collector", query_hints: Optional[Dict[str, Any]]) -> IndexPart:
+        row_filter = collector.row_filter(query_hints or {})
+        if row_filter is None:
+            return self.index, None
+        rows = self.rows
+        return self.index, lambda position: row_filter(rows[position])
+
+
+def _load_source(collector: "_Collector", rows: Sequence[Sequence[Any]]) -> _LoadedSource:
+    candidates = collector.build_candidates(rows)
+    return _LoadedSource(EntityIndex(candidates), _candidate_rows(rows, len(candidates)))
+
+
+def _candidate_rows(rows: Sequence[Sequence[Any]], count: int) -> Sequence[Sequence[Any]]:
+    """Rows lined up with their candidates; the row filters only read per-candidate columns."""
+    if len(rows) == count:
+        return rows
+    first_rows: Dict[str, Sequence[Any]] = {}
+    for row in rows:
+        first_rows.setdefault(str(row[0]), row)
+    if len(first_rows) == count:
+        return list(first_rows.values())
+    return rows[:count]
+
+
+def _fetch_rows(conn: Any, query: str, params: List[Any]) -> List[Sequence[Any]]:
+    with conn.cursor() as cur:
+        cur.execute(query, params or None)
+        return list(cur.fetchall())
+
+
+async def _afetch_rows(conn: Any, query: str, params: List[Any]) -> List[Sequence[Any]]:
+    async with conn.cursor() as cur:
+        await cur.execute(query, params or None)
+        return list(await cur.fetchall())
+
+
+def _sla_query(
+    schema: str,
+    query_hints: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, List[Any]]:
     query = f"""
             SELECT
                 service_name,
@@ -83,11 +243,19 @@ def _collect_sla_candidates(
             """
         patterns = [f"%{term}%" for term in service_terms]
         params.extend([patterns, patterns])
+    return query, params
+
+
+def _sla_row_filter(query_hints: Dict[str, Any]) -> Optional[RowFilter]:
+    service_terms = list(query_hints.get("service_terms", []))
+    if not service_terms:
+        return None
+    return lambda row: any(
+        term in str(row[0]).lower() or term in str(row[1]).lower() for term in service_terms
+    )
 
-    with conn.cursor() as cur:
-        cur.execute(query, params or None)
-        rows = cur.fetchall()
 
+def _sla_candidates(rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
     return [
         _build_candidate(
             "sla_lookup",
@@ -116,11 +284,10 @@ def _collect_sla_candidates(
     ]
 
 
-def _collect_policy_candidates(
-    conn: Any,
+def _policy_query(
     schema: str,
     query_hints: Optional[Dict[str, Any]] = None,
-) -> List[Dict[str, Any]]:
+) -> Tuple[str, List[Any]]:
     query = f"""
             SELECT p.policy_id, p.title, p.category, p.description, p.role_scope, pr.rule_text
             FROM {schema}.policies p
@@ -148,11 +315,26 @@ def _collect_policy_candidates(
     query += """
             ORDER BY p.policy_id, pr.rule_order
             """
+    return query, params
 
-    with conn.cursor() as cur:
-        cur.execute(query, params or None)
-        rows = cur.fetchall()
 
+def _policy_row_filter(query_hints: Dict[str, Any]) -> Optional[RowFilter]:
+    policy_terms = [
+        term
+        for term in query_hints.get("policy_terms", [])
+        if term not in {"policy", "policies"}
+    ]
+    if not policy_terms:
+        return None
+    return lambda row: any(
+        term in str(row[1]).lower()
+        or term in str(row[0]).lower()
+        or any(str(role).lower() == term for role in row[4])
+        for term in policy_terms
+    )
+
+
+def _policy_candidates(rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
     grouped: Dict[str, Dict[str, Any]] = {}
     for row in rows:
         policy_id = str(row[0])
@@ -189,11 +371,10 @@ def _collect_policy_candidates(
     ]
 
 
-def _collect_account_candidates(
-    conn: Any,
+def _account_query(
     schema: str,
     query_hints: Optional[Dict[str, Any]] = None,
-) -> List[Dict[str, Any]]:
+) -> Tuple[str, List[Any]]:
     query = f"""
             SELECT user_id, name, role, status, service_plan, last_login
             FROM {schema}.accounts
@@ -205,11 +386,17 @@ def _collect_account_candidates(
             WHERE user_id = ANY(%s)
             """
         params.append(user_ids)
+    return query, params
 
-    with conn.cursor() as cur:
-        cur.execute(query, params or None)
-        rows = cur.fetchall()
 
+def _account_row_filter(query_hints: Dict[str, Any]) -> Optional[RowFilter]:
+    user_ids = set(query_hints.get("user_ids", []))
+    if not user_ids:
+        return None
+    return lambda row: str(row[0]) in user_ids
+
+
+def _account_candidates(rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
     return [
         _build_candidate(
             "accounts",
@@ -237,24 +424,23 @@ def _collect_account_candidates(
     ]
 
 
-def _collect_system_status_candidates(
-    conn: Any,
+def _system_status_query(
     schema: str,
     query_hints: Optional[Dict[str, Any]] = None,
-) -> List[Dict[str, Any]]:
-    with conn.cursor() as cur:
-        cur.execute(
-            f"""
+) -> Tuple[str, List[Any]]:
+    query = f"""
             SELECT current_load_percentage, active_incidents, system_health, maintenance_mode, last_updated
             FROM {schema}.system_status
             WHERE id = 1
             """
-        )
-        row = cur.fetchone()
+    return query, []
 
-    if row is None:
+
+def _system_status_candidates(rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    if not rows:
         return []
 
+    row = rows[0]
     record = {
         "current_load_percentage": int(row[0]),
         "active_incidents": int(row[1]),
@@ -274,6 +460,20 @@ def _collect_system_status_candidates(
     ]
 
 
+class _Collector(NamedTuple):
+    build_query: QueryBuilder
+    build_candidates: CandidateBuilder
+    row_filter: Callable[[Dict[str, Any]], Optional[RowFilter]]
+
+
+_COLLECTORS: Dict[str, _Collector] = {
+    "sla_lookup": _Collector(_sla_query, _sla_candidates, _sla_row_filter),
+    "policies": _Collector(_policy_query, _policy_candidates, _policy_row_filter),
+    "accounts": _Collector(_account_query, _account_candidates, _account_row_filter),
+    "system_status": _Collector(_system_status_query, _system_status_candidates, lambda hints: None),
+}
+
+
 def _build_candidate(source: str, match_text: str, record: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "source": source,
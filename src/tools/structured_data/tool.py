@@ -3,12 +3,22 @@
 from __future__ import annotations
 
 import os
-import re
-from typing import Any, Dict, List
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional
 
+from src.services.query_analysis import QueryAnalysis, params_analysis
+from src.services.tracing import span
+
+from .entity_index import IndexView
 from .formatter import build_match_message, error_response, group_candidates, success_response
-from .matcher import match_candidates
-from .retriever import collect_candidates_by_sources, connect_live_db
+from .matcher import match_candidates, match_indexed
+from .retriever import (
+    SharedRetrieval,
+    acollect_candidates_by_sources,
+    collect_candidates_by_sources,
+    connect_live_db,
+    connect_live_db_async,
+)
 
 
 class StructuredDataTool:
@@ -32,27 +42,99 @@ class StructuredDataTool:
             "db_connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "3").strip() or "3"),
             "db_schema": os.getenv("DB_SCHEMA", "intern_task").strip(),
         }
+        # Scoped to the batch that installed it: only code running in that
+        # batch's context (its tasks, or threads submitted with a copy of it)
+        # sees the shared pass; concurrent single queries do not.
+        self._batch_retrieval: ContextVar[Optional[SharedRetrieval]] = ContextVar(
+            "structured_batch_retrieval", default=None
+        )
+
+    def batch_session(self) -> "StructuredBatchSession":
+        """Share one connection and one read per source across a batch of queries.
+
+        Usable as a sync or async context manager. The shared pass is visible
+        only in the entering context and copies of it; a session nested in
+        another reuses the outer pass.
+        """
+        return StructuredBatchSession(self)
 
     def run(self, params: Dict[str, Any]) -> Dict[str, Any]:
         return self.search_relevant(params)
 
     def search_relevant(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        query = self._normalize_query(params)
-        conn = self._connect_live_db()
-        if conn is None:
-            return error_response("Live database unavailable. Check DB config and postgres container.")
+        analysis = self._analyze(params)
+        shared = self._current_batch_retrieval()
+        with span("structured.search_relevant", shared=shared is not None):
+            if shared is not None:
+                with span("structured.retrieve"):
+                    view = shared.collect_indexed(self._select_sources(analysis), self._build_query_hints(analysis))
+                return self._build_indexed_result(analysis, view)
+
+            with span("structured.connect"):
+                conn = self._connect_live_db()
+            if conn is None:
+                return error_response("Live database unavailable. Check DB config and postgres container.")
+
+            try:
+                with span("structured.retrieve"):
+                    candidates = collect_candidates_by_sources(
+                        conn,
+                        str(self._db_config["db_schema"]),
+                        self._select_sources(analysis),
+                        self._build_query_hints(analysis),
+                    )
+            finally:
+                conn.close()
+
+            return self._build_result(analysis, candidates)
+
+    async def arun(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.asearch_relevant(params)
+
+    async def asearch_relevant(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of `search_relevant` over an async DB connection."""
+        analysis = self._analyze(params)
+        shared = self._current_batch_retrieval()
+        with span("structured.search_relevant", shared=shared is not None):
+            if shared is not None:
+                with span("structured.retrieve"):
+                    view = await shared.acollect_indexed(
+                        self._select_sources(analysis), self._build_query_hints(analysis)
+                    )
+                return self._build_indexed_result(analysis, view)
+
+            with span("structured.connect"):
+                conn = await self._aconnect_live_db()
+            if conn is None:
+                return error_response("Live database unavailable. Check DB config and postgres container.")
+
+            try:
+                with span("structured.retrieve"):
+                    candidates = await acollect_candidates_by_sources(
+                        conn,
+                        str(self._db_config["db_schema"]),
+                        self._select_sources(analysis),
+                        self._build_query_hints(analysis),
+                    )
+            finally:
+                await conn.close()
+
+            return self._build_result(analysis, candidates)
 
-        try:
-            candidates = collect_candidates_by_sources(
-                conn,
-                str(self._db_config["db_schema"]),
-                self._select_sources(query),
-                self._build_query_hints(query),
-            )
-        finally:
-            conn.close()
+    @staticmethod
+    def _build_result(analysis: QueryAnalysis, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with span("structured.match", candidates=len(candidates)):
+            matched_candidates = match_candidates(analysis, candidates)
+        return StructuredDataTool._format_matches(matched_candidates)
+
+    @staticmethod
+    def _build_indexed_result(analysis: QueryAnalysis, view: IndexView) -> Dict[str, Any]:
+        with span("structured.match", indexed=True):
+            matched_candidates = match_indexed(analysis, view)
+        return StructuredDataTool._format_matches(matched_candidates)
 
-        matched_candidates = match_candidates(query, candidates)
+    @staticmethod
+    def _format_matches(matched_candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
         if not matched_candidates:
             return error_response("No relevant structured data found for fallback lookup.")
 
@@ -62,48 +144,96 @@ class StructuredDataTool:
     def _connect_live_db(self) -> Any | None:
         return connect_live_db(self._db_config)
 
+    async def _aconnect_live_db(self) -> Any | None:
+        return await connect_live_db_async(self._db_config)
+
+    def _current_batch_retrieval(self) -> Optional[SharedRetrieval]:
+        shared = self._batch_retrieval.get()
+        return shared if shared is not None and not shared.closed else None
+
     @staticmethod
-    def _normalize_query(params: Dict[str, Any]) -> str:
+    def _analyze(params: Dict[str, Any]) -> QueryAnalysis:
+        """The request's `QueryAnalysis` from `params`, built here when the caller passed none."""
         query = params.get("query")
         if not isinstance(query, str) or not query.strip():
             raise ValueError("structured_data_tool requires non-empty string 'query'.")
-        return " ".join(query.lower().split())
+        return params_analysis(params)
 
     @classmethod
-    def _select_sources(cls, query: str) -> List[str]:
-        matched_sources: List[str] = []
-        token_set = set(re.findall(r"[a-z0-9]+", query))
-
-        for source, keywords in cls._SOURCE_RULES:
-            if any(cls._matches_keyword(query, token_set, keyword) for keyword in keywords):
-                matched_sources.append(source)
-
+    def _select_sources(cls, analysis: QueryAnalysis) -> List[str]:
+        matched_sources = [
+            source
+            for source, keywords in cls._SOURCE_RULES
+            if any(analysis.has_keyword(keyword) for keyword in keywords)
+        ]
         if matched_sources:
             return matched_sources
 
         return [source for source, _ in cls._SOURCE_RULES]
 
     @staticmethod
-    def _matches_keyword(query: str, token_set: set[str], keyword: str) -> bool:
-        if " " in keyword:
-            return keyword in query
-        return keyword in token_set
-
-    @staticmethod
-    def _build_query_hints(query: str) -> Dict[str, Any]:
-        token_set = set(re.findall(r"[a-z0-9]+", query))
+    def _build_query_hints(analysis: QueryAnalysis) -> Dict[str, Any]:
         return {
-            "query": query,
-            "tokens": token_set,
-            "user_ids": re.findall(r"\b\d{3,}\b", query),
-            "service_terms": _extract_service_terms(token_set),
-            "policy_terms": _extract_policy_terms(token_set),
+            "query": analysis.normalized,
+            "tokens": analysis.token_set,
+            "user_ids": list(analysis.user_ids),
+            "service_terms": _extract_service_terms(analysis.token_set),
+            "policy_terms": _extract_policy_terms(analysis.token_set),
         }
 
 
-def _extract_service_terms(tokens: set[str]) -> List[str]:
+def _extract_service_terms(tokens: frozenset[str]) -> List[str]:
     return sorted(tokens.intersection({"premium", "basic", "enterprise", "support", "service"}))
 
 
-def _extract_policy_terms(tokens: set[str]) -> List[str]:
+def _extract_policy_terms(tokens: frozenset[str]) -> List[str]:
     return sorted(tokens.intersection({"policy", "policies", "manager", "admin", "employee", "support"}))
+
+
+class StructuredBatchSession:
+    """Context manager returned by `StructuredDataTool.batch_session`."""
+
+    def __init__(self, tool: StructuredDataTool) -> None:
+        self._tool = tool
+        self._shared: Optional[SharedRetrieval] = None
+        self._token: Optional[Token[Optional[SharedRetrieval]]] = None
+
+    def __enter__(self) -> "StructuredBatchSession":
+        if self._tool._current_batch_retrieval() is None:
+            self._install(self._tool._connect_live_db())
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        conn = self._release()
+        if conn is not None:
+            conn.close()
+
+    async def __aenter__(self) -> "StructuredBatchSession":
+        if self._tool._current_batch_retrieval() is None:
+            self._install(await self._tool._aconnect_live_db())
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        conn = self._release()
+        if conn is not None:
+            await conn.close()
+
+    def _install(self, conn: Any) -> None:
+        if conn is None:
+            return
+        self._shared = SharedRetrieval(conn, str(self._tool._db_config["db_schema"]))
+        self._token = self._tool._batch_retrieval.set(self._shared)
+
+    def _release(self) -> Any | None:
+        """Uninstall this session's pass and return its connection to close."""
+        shared, self._shared = self._shared, None
+        if shared is None:
+            return None
+        # Context copies taken during the batch still hold the pass; closing
+        # it makes them fall back to their own connections.
+        shared.closed = True
+        try:
+            self._tool._batch_retrieval.reset(self._token)  # type: ignore[arg-type]
+        except ValueError:
+            pass  # Exited from a different context than it was entered in.
+        return shared.conn
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 
 class FakeCursor:
-    def __init__(self, responses):
+    def __init__(self, responses, executed=None):
         self._responses = responses
+        self._executed = executed if executed is not None else []
         self._key = None
 
     def __enter__(self):
@@ -15,6 +16,7 @@ class FakeCursor:
         return False
 
     def execute(self, query, params=None):
+        self._executed.append((query, params))
         query_lower = query.lower()
         if "from intern_task.sla_lookup" in query_lower:
             self._key = "sla"
@@ -22,6 +24,8 @@ class FakeCursor:
             self._key = "policies"
         elif "from intern_task.accounts" in query_lower:
             self._key = "accounts"
+        elif "from intern_task.system_status" in query_lower:
+            self._key = "system_status"
         else:
             self._key = None
 
@@ -38,9 +42,11 @@ class FakeCursor:
 class FakeConn:
     def __init__(self, responses):
         self._responses = responses
+        self.executed = []
+        self.closed = False
 
     def cursor(self):
-        return FakeCursor(self._responses)
+        return FakeCursor(self._responses, self.executed)
 
     def close(self):
-        return None
+        self.closed = True
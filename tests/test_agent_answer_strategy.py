@@ -0,0 +1,79 @@
+"""Unit tests for template-versus-LLM answer strategy."""
+
+import unittest
+
+from src.agent import AgentDependencies, AnswerStrategy, ToolEnabledAgent
+from src.tools.guardrail_tool import GuardrailTool
+
+ACCOUNT_OUTPUT = {
+    "status": "ok",
+    "message": "Found fallback structured data from accounts.",
+    "data": {
+        "source": "accounts",
+        "record": {
+            "user_id": "1002",
+            "name": "Brian Lim",
+            "role": "Manager",
+            "status": "Active",
+            "service_plan": "Premium Support",
+        },
+        "score": 100,
+    },
+}
+
+
+class AnswerStrategyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.logs = []
+        self.llm_calls = []
+        self.strategy = AnswerStrategy(max_concurrent_generations=1)
+        self.agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: ACCOUNT_OUTPUT,
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=GuardrailTool().run,
+                contextual_answer=self._llm,
+                logger=lambda e, p: self.logs.append((e, p)),
+                answer_strategy=self.strategy,
+            )
+        )
+
+    def _llm(self, query, context):
+        self.llm_calls.append(query)
+        return "llm answer"
+
+    def test_agent_strategy_single_record_lookup_uses_template(self) -> None:
+        result = self.agent.handle_query("check account status 1002", include_debug=True)
+        self.assertEqual(
+            result["message"],
+            "Account 1002 for Brian Lim is Active on plan Premium Support.",
+        )
+        self.assertEqual(self.llm_calls, [])
+        self.assertEqual(result["debug"]["answer_strategy"]["strategy"], "template")
+        selected = [p for e, p in self.logs if e == "answer_strategy_selected"]
+        self.assertEqual(selected[0]["strategy"], "template")
+
+    def test_agent_strategy_query_outside_template_fields_uses_llm(self) -> None:
+        result = self.agent.handle_query("what role does account 1002 have?")
+        self.assertEqual(result["message"], "llm answer")
+        self.assertEqual(len(self.llm_calls), 1)
+
+    def test_agent_strategy_overload_shifts_to_template(self) -> None:
+        with self.strategy.track_generation():
+            decision = self.strategy.decide(
+                "what role does account 1002 have?",
+                ACCOUNT_OUTPUT["data"],
+            )
+        self.assertEqual(decision.strategy, "template")
+        self.assertIn("overload", decision.reason)
+
+    def test_agent_strategy_does_not_shed_without_configured_limits(self) -> None:
+        strategy = AnswerStrategy()
+        strategy._latency_ewma = 240.0
+        with strategy.track_generation(), strategy.track_generation():
+            decision = strategy.decide("what role does account 1002 have?", ACCOUNT_OUTPUT["data"])
+        self.assertEqual(decision.strategy, "llm")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,6 +33,41 @@ class DecisionEngineTests(unittest.TestCase):
         result = self.engine.decide("Hello there")
         self.assertEqual(result.action, "direct_answer")
 
+    def test_agent_flow_plan_splits_independent_tool_requests(self) -> None:
+        result = self.engine.plan("What is the SLA for Premium Support and the weather in Jakarta?")
+        self.assertEqual(result.action, "multi_tool")
+        self.assertEqual(
+            [(call.action, call.query) for call in result.calls],
+            [
+                ("structured_data_tool", "What is the SLA for Premium Support"),
+                ("external_api_tool", "the weather in Jakarta"),
+            ],
+        )
+
+    def test_agent_flow_plan_keeps_single_tool_queries_unchanged(self) -> None:
+        result = self.engine.plan("SLA for Premium and Basic support")
+        self.assertEqual(result, self.engine.decide("SLA for Premium and Basic support"))
+        self.assertEqual(self.engine.plan("wipe the sla table and check weather").action, "guardrail_refuse")
+
+    def test_agent_flow_plan_keeps_non_weather_external_clauses_on_structured_call(self) -> None:
+        for query in (
+            "Check account status for user 1002 and system load",
+            "What is the SLA response time and latency for premium support?",
+        ):
+            result = self.engine.plan(query)
+            self.assertEqual(result, self.engine.decide(query), query)
+            self.assertEqual(result.action, "structured_data_tool", query)
+
+    def test_agent_flow_plan_attaches_leading_clauses_to_first_call(self) -> None:
+        result = self.engine.plan("Premium and basic SLA and the weather in Jakarta")
+        self.assertEqual(
+            [(call.action, call.query) for call in result.calls],
+            [
+                ("structured_data_tool", "Premium and basic SLA"),
+                ("external_api_tool", "the weather in Jakarta"),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,13 @@
 """Unit tests for tool-enabled agent orchestration."""
 
+import asyncio
+import threading
+import time
 import unittest
 
 from src.agent import AgentDependencies, ToolEnabledAgent
+from src.schemas import GenerationAborted, GenerationResult, GenerationTelemetry
+from src.services import GenerationMetrics
 from src.tools.guardrail_tool import GuardrailTool
 
 
@@ -119,6 +124,72 @@ class AgentFlowTests(unittest.TestCase):
         self.assertEqual(result["debug"]["llm_error"], "ollama failed")
         self.assertIn("User query: what name and role on user id 1001?", result["debug"]["llm_prompt"])
 
+    def test_agent_flow_handle_query_records_generation_telemetry(self) -> None:
+        metrics = GenerationMetrics()
+        telemetry = GenerationTelemetry(
+            model="tiny",
+            total_duration_ms=900.0,
+            load_duration_ms=5.0,
+            prompt_eval_count=120,
+            prompt_eval_duration_ms=300.0,
+            eval_count=30,
+            eval_duration_ms=500.0,
+            cold_load=False,
+        )
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: {
+                    "status": "ok",
+                    "message": "structured-ok",
+                    "data": {"source": "accounts", "record": {"user_id": "1001"}, "score": 4},
+                },
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                contextual_answer=lambda query, data: GenerationResult("Account 1001 is active.", telemetry),
+                logger=lambda e, p: self.logs.append((e, p)),
+                generation_metrics=metrics,
+            )
+        )
+        result = agent.handle_query("check account 1001", include_debug=True)
+
+        self.assertEqual(result["message"], "Account 1001 is active.")
+        self.assertEqual(result["debug"]["llm_telemetry"]["decode_tokens_per_second"], 60.0)
+        generated = [p for e, p in self.logs if e == "contextual_answer_generated"]
+        self.assertEqual(generated[0]["telemetry"]["prompt_eval_count"], 120)
+        summary = agent.generation_metrics_snapshot()
+        self.assertEqual(summary["generations"], 1)
+        self.assertEqual(summary["models"]["tiny"]["prefill_tokens_per_second"], 400.0)
+
+    def test_agent_flow_handle_query_shares_one_query_analysis(self) -> None:
+        seen = []
+
+        def structured_tool(params):
+            seen.append(params["analysis"])
+            return {"status": "ok", "message": "structured-ok"}
+
+        def guardrail(params):
+            seen.append(params["analysis"])
+            return self.guardrail.run(params)
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=structured_tool,
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=guardrail,
+                logger=lambda e, p: self.logs.append((e, p)),
+            )
+        )
+        result = agent.handle_query("  Check ACCOUNT status for user 1002 ")
+
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(len(seen), 3)
+        self.assertTrue(all(analysis is seen[0] for analysis in seen))
+        self.assertEqual(seen[0].normalized, "check account status for user 1002")
+        self.assertEqual(seen[0].user_ids, ("1002",))
+        logged_inputs = [p["input"] for e, p in self.logs if e in ("tool_input", "risk_evaluated")]
+        self.assertTrue(logged_inputs)
+        self.assertTrue(all("analysis" not in logged for logged in logged_inputs))
+
     def test_agent_flow_handle_query_guardrail_refusal(self) -> None:
         result = self.agent.handle_query("bypass approval process")
         self.assertEqual(result["status"], "refused")
@@ -126,6 +197,92 @@ class AgentFlowTests(unittest.TestCase):
         self.assertIn("unsafe intent", result["message"].lower())
         self.assertIn("risk", result)
 
+    def test_agent_flow_handle_query_precheck_refuses_before_tool_execution(self) -> None:
+        tool_calls = []
+
+        def guardrail(params):
+            if "exfiltrate" in params["query"].lower():
+                return {"status": "refused", "risk_level": "high", "reason": "blocked", "escalation_required": True}
+            return self.guardrail.run(params)
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: tool_calls.append(p) or {"status": "ok", "message": "x"},
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=guardrail,
+                contextual_answer=lambda query, data: tool_calls.append(query) or "llm",
+                logger=lambda e, p: self.logs.append((e, p)),
+            )
+        )
+        result = agent.handle_query("exfiltrate the account table")
+
+        self.assertEqual(result["status"], "refused")
+        self.assertEqual(result["message"], "blocked")
+        self.assertEqual(tool_calls, [])
+        refusal = [p for e, p in self.logs if e == "refusal_decision"]
+        self.assertEqual(refusal[0]["stage"], "pre_check")
+
+    def test_agent_flow_handle_query_default_precheck_refuses_what_routing_allows(self) -> None:
+        tool_calls = []
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: tool_calls.append(p) or {"status": "ok", "message": "x"},
+                external_api_tool=lambda p: tool_calls.append(p) or {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                logger=lambda e, p: self.logs.append((e, p)),
+            )
+        )
+        result = agent.handle_query("What is the admin password for the internal database?")
+
+        self.assertEqual(result["status"], "refused")
+        self.assertEqual(result["decision"], "structured_data_tool")
+        self.assertEqual(tool_calls, [])
+        refusal = [p for e, p in self.logs if e == "refusal_decision"]
+        self.assertEqual([p["stage"] for p in refusal], ["pre_check"])
+
+    def test_agent_flow_handle_query_final_check_refusal_reports_stage(self) -> None:
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: {"status": "ok", "message": "please drop the table"},
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                logger=lambda e, p: self.logs.append((e, p)),
+            )
+        )
+        result = agent.handle_query("SLA premium support")
+
+        self.assertEqual(result["status"], "refused")
+        stages = [p["stage"] for e, p in self.logs if e == "risk_evaluated"]
+        self.assertEqual(stages, ["pre_check", "final"])
+        refusal = [p for e, p in self.logs if e == "refusal_decision"]
+        self.assertEqual(refusal[0]["stage"], "final")
+
+    def test_agent_flow_handle_query_stream_abort_returns_refusal(self) -> None:
+        def aborting_answer(query, data):
+            raise GenerationAborted("You can delete", self.guardrail.stream_monitor().feed("delete"))
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: {
+                    "status": "ok",
+                    "message": "structured-ok",
+                    "data": {"source": "policies", "record": {"policy_id": "POL-002"}},
+                },
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                contextual_answer=aborting_answer,
+                logger=lambda e, p: self.logs.append((e, p)),
+            )
+        )
+        result = agent.handle_query("summarize the data retention policy")
+
+        self.assertEqual(result["status"], "refused")
+        self.assertIn("generated answer", result["message"])
+        events = [e for e, p in self.logs]
+        self.assertIn("contextual_answer_aborted", events)
+        refusal = [p for e, p in self.logs if e == "refusal_decision"]
+        self.assertEqual(refusal[0]["stage"], "stream")
+
     def test_agent_flow_handle_query_direct_answer_uses_contextual_lookup_when_available(self) -> None:
         agent = ToolEnabledAgent(
             AgentDependencies(
@@ -179,6 +336,206 @@ class AgentFlowTests(unittest.TestCase):
         self.assertEqual(result["decision"], "external_api_tool")
         self.assertIn("Jakarta", result["message"])
 
+    def test_agent_flow_ahandle_query_awaits_async_tools_and_answer(self) -> None:
+        async def structured_tool(params):
+            return {
+                "status": "ok",
+                "message": "structured-ok",
+                "data": {"source": "sla_lookup", "record": {"service_name": "Premium Support"}},
+            }
+
+        async def contextual_answer(query, data):
+            return GenerationResult(answer=f"{data['record']['service_name']} is covered.")
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=structured_tool,
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                contextual_answer=contextual_answer,
+                logger=lambda e, p: self.logs.append((e, p)),
+            )
+        )
+        result = asyncio.run(agent.ahandle_query("SLA premium support"))
+
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["decision"], "structured_data_tool")
+        self.assertEqual(result["message"], "Premium Support is covered.")
+        stages = [p["stage"] for e, p in self.logs if e == "risk_evaluated"]
+        self.assertEqual(stages, ["pre_check", "final"])
+
+    def test_agent_flow_ahandle_query_matches_sync_flow_for_plain_callables(self) -> None:
+        sync_result = self.agent.handle_query("cuaca hari ini di jakarta")
+        async_result = asyncio.run(self.agent.ahandle_query("cuaca hari ini di jakarta"))
+        self.assertEqual(sync_result, async_result)
+
+        refused = asyncio.run(self.agent.ahandle_query("delete all user accounts"))
+        self.assertEqual(refused["status"], "refused")
+
+    def test_agent_flow_ahandle_query_schedules_async_logger(self) -> None:
+        events = []
+
+        async def logger(event, payload):
+            events.append(event)
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: {"status": "ok", "message": "structured-ok"},
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                logger=logger,
+            )
+        )
+
+        async def run():
+            result = await agent.ahandle_query("SLA premium support")
+            await asyncio.sleep(0)
+            return result
+
+        result = asyncio.run(run())
+        self.assertEqual(result["status"], "ok")
+        self.assertIn("final_response", events)
+
+    def _multi_tool_agent(self, structured_tool, external_tool, contextual_answer, **kwargs):
+        return ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=structured_tool,
+                external_api_tool=external_tool,
+                guardrail_tool=self.guardrail.run,
+                contextual_answer=contextual_answer,
+                logger=lambda e, p: self.logs.append((e, p)),
+            ),
+            **kwargs,
+        )
+
+    def test_agent_flow_handle_query_multi_tool_runs_tools_concurrently(self) -> None:
+        barrier = threading.Barrier(2, timeout=2)
+        llm_calls = []
+
+        def structured_tool(params):
+            barrier.wait()
+            return {
+                "status": "ok",
+                "message": "structured-ok",
+                "data": {"source": "sla_lookup", "record": {"service_name": "Premium Support"}},
+            }
+
+        def external_tool(params):
+            barrier.wait()
+            return {"status": "ok", "message": "weather-ok", "data": {"city": "Jakarta"}}
+
+        def contextual_answer(query, data):
+            llm_calls.append(data)
+            return "Premium Support and Jakarta weather."
+
+        agent = self._multi_tool_agent(structured_tool, external_tool, contextual_answer)
+        result = agent.handle_query(
+            "What is the SLA for Premium Support and the weather in Jakarta?", include_debug=True
+        )
+
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["decision"], "multi_tool")
+        self.assertEqual(len(llm_calls), 1)
+        self.assertEqual(
+            [entry["source"] for entry in llm_calls[0]["sources"]],
+            ["sla_lookup", "external_api_tool"],
+        )
+        tool_inputs = [p["input"]["query"] for e, p in self.logs if e == "tool_input"]
+        self.assertCountEqual(tool_inputs, ["What is the SLA for Premium Support", "the weather in Jakarta"])
+        self.assertEqual(len(result["debug"]["tool_calls"]), 2)
+
+    def test_agent_flow_handle_query_multi_tool_times_out_slow_tool(self) -> None:
+        release = threading.Event()
+
+        def slow_external(params):
+            release.wait(2)
+            return {"status": "ok", "message": "weather-ok", "data": {"city": "Jakarta"}}
+
+        agent = self._multi_tool_agent(
+            lambda p: {"status": "ok", "message": "structured-ok", "data": {"source": "sla_lookup"}},
+            slow_external,
+            lambda query, data: ", ".join(entry["source"] for entry in data["sources"]),
+            tool_timeout_seconds=0.05,
+        )
+        started = time.monotonic()
+        result = agent.handle_query("SLA for Premium Support and the weather in Jakarta")
+        release.set()
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(result["message"], "sla_lookup")
+        self.assertIn("tool_timeout", [e for e, p in self.logs])
+
+    def test_agent_flow_ahandle_query_multi_tool_gathers_async_tools(self) -> None:
+        async def structured_tool(params):
+            await asyncio.sleep(0.2)
+            return {"status": "ok", "message": "structured-ok", "data": {"source": "sla_lookup"}}
+
+        async def external_tool(params):
+            await asyncio.sleep(0.2)
+            return {"status": "ok", "message": "weather-ok", "data": {"city": "Jakarta"}}
+
+        agent = self._multi_tool_agent(
+            structured_tool,
+            external_tool,
+            lambda query, data: f"{len(data['sources'])} sources",
+        )
+        started = time.monotonic()
+        result = asyncio.run(agent.ahandle_query("SLA for Premium Support and the weather in Jakarta"))
+
+        self.assertLess(time.monotonic() - started, 0.35)
+        self.assertEqual(result["decision"], "multi_tool")
+        self.assertEqual(result["message"], "2 sources")
+
+    def test_agent_flow_handle_batch_dedupes_and_tags_indexes(self) -> None:
+        calls = []
+        sessions = []
+
+        class Session:
+            def __enter__(self):
+                sessions.append("enter")
+
+            def __exit__(self, exc_type, exc, tb):
+                sessions.append("exit")
+
+        def structured_tool(params):
+            calls.append(params["query"])
+            return {"status": "ok", "message": f"structured:{params['query']}"}
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=structured_tool,
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+                batch_session=Session,
+            )
+        )
+        queries = ["SLA premium support", "sla   Premium support", "delete everything", "SLA basic"]
+        results = dict(agent.handle_batch(queries, max_parallel=2))
+
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[2]["status"], "refused")
+        self.assertCountEqual(calls, ["SLA premium support", "SLA basic"])
+        self.assertEqual(sessions, ["enter", "exit"])
+
+    def test_agent_flow_ahandle_batch_yields_in_completion_order(self) -> None:
+        async def structured_tool(params):
+            await asyncio.sleep(0.1 if "premium" in params["query"] else 0)
+            return {"status": "ok", "message": params["query"]}
+
+        agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=structured_tool,
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=self.guardrail.run,
+            )
+        )
+
+        async def collect():
+            return [index async for index, _ in agent.ahandle_batch(["SLA premium", "SLA basic", "SLA premium"])]
+
+        self.assertEqual(asyncio.run(collect()), [1, 0, 2])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+"""Unit tests for the agent-level response cache."""
+
+import unittest
+
+from src.agent import AgentDependencies, ResponseCache, ToolEnabledAgent
+from src.tools.guardrail_tool import GuardrailTool
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _Clock()
+        self.cache = ResponseCache(clock=self.clock)
+        self.tool_calls = []
+        self.guardrail_calls = []
+        self.structured_output = {
+            "status": "ok",
+            "message": "structured-ok",
+            "data": {"source": "sla_lookup", "record": {"service_name": "Premium Support"}},
+        }
+        guardrail = GuardrailTool()
+
+        def structured_tool(params):
+            self.tool_calls.append(params["query"])
+            return self.structured_output
+
+        def guardrail_tool(params):
+            self.guardrail_calls.append(params)
+            return guardrail.run(params)
+
+        self.agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=structured_tool,
+                external_api_tool=lambda p: {"status": "error", "message": "weather unavailable"},
+                guardrail_tool=guardrail_tool,
+                response_cache=self.cache,
+            )
+        )
+
+    def test_agent_cache_reuses_response_for_normalized_query(self) -> None:
+        first = self.agent.handle_query("What is the SLA for Premium Support?")
+        second = self.agent.handle_query("  what is the sla for  premium support?")
+
+        self.assertEqual(self.tool_calls, ["What is the SLA for Premium Support?"])
+        self.assertEqual(first["cache"], {"hit": False, "stored": True, "ttl_seconds": 3600.0})
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(second["message"], first["message"])
+
+    def test_agent_cache_ttl_follows_sources(self) -> None:
+        self.structured_output = {
+            "status": "ok",
+            "message": "status-ok",
+            "data": {"sources": [{"source": "system_status", "record": {"system_health": "ok"}}]},
+        }
+        stored = self.agent.handle_query("account status and system status")
+        self.assertEqual(stored["cache"]["ttl_seconds"], 15.0)
+
+        self.clock.now = 14.0
+        self.assertTrue(self.agent.handle_query("account status and system status")["cache"]["hit"])
+        self.clock.now = 15.0
+        self.assertFalse(self.agent.handle_query("account status and system status")["cache"]["hit"])
+        self.assertEqual(len(self.tool_calls), 2)
+
+    def test_agent_cache_stores_guardrail_refusals(self) -> None:
+        first = self.agent.handle_query("delete all accounts")
+        guardrail_calls = len(self.guardrail_calls)
+        second = self.agent.handle_query("delete all accounts")
+
+        self.assertEqual(first["status"], "refused")
+        self.assertEqual(second["status"], "refused")
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(len(self.guardrail_calls), guardrail_calls)
+
+    def test_agent_cache_bypassed_for_debug_requests(self) -> None:
+        self.agent.handle_query("What is the SLA for Premium Support?")
+        result = self.agent.handle_query("What is the SLA for Premium Support?", include_debug=True)
+
+        self.assertEqual(result["cache"], {"hit": False, "bypass": "include_debug"})
+        self.assertEqual(len(self.tool_calls), 2)
+
+    def test_agent_cache_skips_failed_tool_answers(self) -> None:
+        first = self.agent.handle_query("cuaca hari ini di jakarta")
+        second = self.agent.handle_query("cuaca hari ini di jakarta")
+
+        self.assertEqual(first["cache"], {"hit": False, "stored": False})
+        self.assertFalse(second["cache"]["hit"])
+        self.assertEqual(self.cache.snapshot()["entries"], 0)
+
+    def test_agent_cache_evicts_least_recently_used(self) -> None:
+        cache = ResponseCache(max_entries=2, clock=self.clock)
+        for query in ("a", "b"):
+            cache.put(query, "direct_answer", {"status": "ok", "message": query})
+        cache.get("a", "direct_answer")
+        cache.put("c", "direct_answer", {"status": "ok", "message": "c"})
+
+        self.assertIsNotNone(cache.get("a", "direct_answer"))
+        self.assertIsNone(cache.get("b", "direct_answer"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Unit tests for the synthetic dataset generator used by the benchmarks."""
+
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.dataset import (
+    DatasetSpec,
+    account_rows,
+    copy_field,
+    policy_rows,
+    policy_rule_rows,
+    sla_rows,
+    write_copy_files,
+)
+
+SEED_SQL = Path(__file__).resolve().parents[1] / "data" / "internal_database_seed.sql"
+_INSERT = re.compile(r"INSERT INTO (\w+) \(.*?\)\s*VALUES(.*?)ON CONFLICT", re.S)
+_LITERAL = re.compile(r"'((?:[^']|'')*)'(?:::\w+)?|ARRAY\[(.*?)\]::text\[\]|\b(true|false)\b|(-?\d+)|([()])", re.S)
+
+
+def seed_sql_rows() -> dict:
+    """Rows of every `INSERT ... VALUES` in the seed SQL, keyed by table."""
+    tables: dict = {}
+    for table, values in _INSERT.findall(SEED_SQL.read_text(encoding="utf-8")):
+        row: list = []
+        for text, array, boolean, number, paren in _LITERAL.findall(values):
+            if paren == "(":
+                row = []
+            elif paren == ")":
+                tables.setdefault(table, []).append(tuple(row))
+            elif array:
+                row.append([item.replace("''", "'") for item in re.findall(r"'((?:[^']|'')*)'", array)])
+            elif boolean:
+                row.append(boolean == "true")
+            elif number:
+                row.append(int(number))
+            else:
+                row.append(text.replace("''", "'"))
+    return tables
+
+
+class DatasetGeneratorTests(unittest.TestCase):
+    def test_benchmarks_dataset_copy_field_escapes_text_format(self) -> None:
+        self.assertEqual(copy_field(None), "\\N")
+        self.assertEqual(copy_field(True), "t")
+        self.assertEqual(copy_field(False), "f")
+        self.assertEqual(copy_field(7), "7")
+        self.assertEqual(copy_field("a\tb\nc\\d\re"), "a\\tb\\nc\\\\d\\re")
+        self.assertEqual(
+            copy_field(["Email", 'Say "hi"', "back\\slash", None]),
+            '{"Email","Say \\\\"hi\\\\"","back\\\\\\\\slash",NULL}',
+        )
+        self.assertEqual(copy_field([]), "{}")
+
+    def test_benchmarks_dataset_starts_with_the_seed_sql_rows(self) -> None:
+        seed = seed_sql_rows()
+        spec = DatasetSpec(accounts=50, policies=10, sla_tiers=10)
+        generated = {
+            "sla_lookup": list(sla_rows(spec)),
+            "policies": list(policy_rows(spec)),
+            "policy_rules": list(policy_rule_rows(spec)),
+            "accounts": list(account_rows(spec)),
+        }
+        for table, rows in generated.items():
+            self.assertEqual(rows[:3], seed[table][:3], table)
+
+    def test_benchmarks_dataset_is_reproducible_per_seed(self) -> None:
+        spec = DatasetSpec(accounts=200, policies=8, sla_tiers=12, seed=7)
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            self.assertEqual(write_copy_files(spec, first), write_copy_files(spec, second))
+            for path in sorted(Path(first).iterdir()):
+                self.assertEqual(path.read_bytes(), (Path(second) / path.name).read_bytes(), path.name)
+        self.assertNotEqual(list(account_rows(spec)), list(account_rows(DatasetSpec(200, 8, sla_tiers=12, seed=8))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Unit tests for the bulk JSONL CLI mode."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.cli import LatencyStats, run_bulk
+
+
+class BulkCLITests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.input_path = self.root / "queries.jsonl"
+        self.output_path = self.root / "results.jsonl"
+        self.handled = []
+
+    def _handle(self, query):
+        self.handled.append(query)
+        return {"status": "ok", "decision": "direct_answer", "message": query.upper()}
+
+    def _write_input(self, lines):
+        self.input_path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+    def _read_output(self):
+        return [json.loads(line) for line in self.output_path.read_text(encoding="utf-8").splitlines()]
+
+    def test_cli_bulk_writes_one_result_per_input_line(self) -> None:
+        self._write_input(
+            [
+                json.dumps({"request_id": "a", "query": "first"}),
+                "",
+                json.dumps("second"),
+                "not json",
+                json.dumps({"title": "missing query"}),
+            ]
+        )
+
+        summary = run_bulk(self._handle, str(self.input_path), str(self.output_path), workers=2)
+
+        results = sorted(self._read_output(), key=lambda record: record["offset"])
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]["id"], "a")
+        self.assertEqual(results[0]["result"]["message"], "FIRST")
+        self.assertEqual(results[1]["result"]["message"], "SECOND")
+        self.assertEqual(results[2]["result"]["decision"], "invalid_input")
+        self.assertEqual(summary["processed"], 4)
+        self.assertEqual(summary["statuses"], {"error": 2, "ok": 2})
+        checkpoint = json.loads(Path(str(self.output_path) + ".checkpoint").read_text())
+        self.assertEqual(checkpoint["offset"], self.input_path.stat().st_size)
+
+    def test_cli_bulk_resume_skips_written_lines_and_repairs_tail(self) -> None:
+        lines = [json.dumps({"query": name}) for name in ("one", "two", "three")]
+        self._write_input(lines)
+        second_offset = len(lines[0]) + 1
+        self.output_path.write_text(
+            json.dumps({"offset": second_offset, "result": {"status": "ok"}}) + "\n" + '{"offset": 0, "res',
+            encoding="utf-8",
+        )
+        Path(str(self.output_path) + ".checkpoint").write_text(json.dumps({"offset": 0}))
+
+        summary = run_bulk(self._handle, str(self.input_path), str(self.output_path), resume=True)
+
+        self.assertEqual(sorted(self.handled), ["one", "three"])
+        self.assertEqual(summary["processed"], 2)
+        offsets = sorted(record["offset"] for record in self._read_output())
+        self.assertEqual(len(offsets), 3)
+        self.assertEqual(offsets[:2], [0, second_offset])
+
+    def test_cli_bulk_latency_stats_keep_bounded_reservoir(self) -> None:
+        stats = LatencyStats(reservoir_size=10, seed=7)
+        for value in range(1, 1001):
+            stats.record(value / 1000.0, "ok")
+
+        summary = stats.summary(elapsed_seconds=2.0)
+        self.assertEqual(summary["processed"], 1000)
+        self.assertEqual(summary["throughput_per_second"], 500.0)
+        self.assertEqual(summary["latency_ms"]["max"], 1000.0)
+        self.assertEqual(len(stats._reservoir), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Unit tests for the warm CLI daemon and its client."""
+
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from src.cli.daemon import AgentDaemon, DaemonUnavailable, send_query
+
+
+class DaemonCLITests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.socket_path = os.path.join(self._tmp.name, "agent.sock")
+        self.calls = []
+
+    def _start(self, handler):
+        daemon = AgentDaemon(self.socket_path, handler)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            daemon.shutdown()
+            daemon.server_close()
+            thread.join(timeout=2)
+
+        self.addCleanup(stop)
+        return daemon
+
+    def test_cli_daemon_forwards_queries_to_warm_handler(self) -> None:
+        def handler(query, include_debug):
+            self.calls.append((query, include_debug))
+            return {"status": "ok", "decision": "direct_answer", "message": query[::-1]}
+
+        self._start(handler)
+
+        first = send_query("abc", self.socket_path, timeout_seconds=2)
+        second = send_query("xyz", self.socket_path, include_debug=True, timeout_seconds=2)
+
+        self.assertEqual(first["message"], "cba")
+        self.assertEqual(second["message"], "zyx")
+        self.assertEqual(self.calls, [("abc", False), ("xyz", True)])
+
+    def test_cli_daemon_reports_handler_and_request_errors(self) -> None:
+        def handler(query, include_debug):
+            raise RuntimeError("runtime exploded")
+
+        self._start(handler)
+        result = send_query("abc", self.socket_path, timeout_seconds=2)
+        self.assertEqual(result["decision"], "daemon_error")
+        self.assertIn("runtime exploded", result["message"])
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(2)
+            conn.connect(self.socket_path)
+            conn.sendall(b'{"text": "no query"}\n')
+            self.assertIn(b"invalid_input", conn.makefile("rb").readline())
+
+    def test_cli_daemon_client_raises_when_daemon_is_down(self) -> None:
+        with self.assertRaises(DaemonUnavailable):
+            send_query("abc", self.socket_path, timeout_seconds=1)
+
+    def test_cli_daemon_replaces_stale_socket_file(self) -> None:
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+
+        self._start(lambda query, include_debug: {"status": "ok", "message": query})
+        self.assertEqual(send_query("ping", self.socket_path, timeout_seconds=2)["message"], "ping")
+
+
+if __name__ == "__main__":
+    unittest.main()
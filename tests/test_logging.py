@@ -1,10 +1,21 @@
 """Unit tests for structured logger behavior."""
 
+import hashlib
 import json
+import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 
+from src.agent.response_utils import build_response
 from src.logging import AgentLogger
+from src.logging.analytics import LogAnalyzer, QuantileSketch, analyze_logs
+from src.logging.history import LogFileIndex
+from src.logging.policies import DEFAULT_EVENT_POLICIES, EventPolicy, PayloadPolicies
+from src.logging.segments import RotationPolicy, SegmentedLogFile, SegmentReader, apply_retention, list_segments
+from src.logging.writer import BufferedLogWriter
+from src.services.tracing import Tracer
 
 
 class AgentLoggerTests(unittest.TestCase):
@@ -29,6 +40,477 @@ class AgentLoggerTests(unittest.TestCase):
 
         log_path.unlink()
 
+    def test_tools_logger_buffered_mode_writes_in_background_and_flushes_on_close(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = Path(tmp) / "history.jsonl"
+            logger = AgentLogger(
+                name="tool_agent_test_buffered_logger",
+                file_path=str(log_path),
+                buffered=True,
+                flush_interval_seconds=60.0,
+            )
+            payload = {"status": "ok"}
+            for index in range(50):
+                logger.log("tool_output", {"index": index})
+            logger.log("final_response", payload)
+            payload["cache"] = {"hit": False}
+            logger.close()
+
+            lines = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+            stats = logger.writer_stats()
+
+        self.assertEqual(len(lines), 51)
+        self.assertEqual([line["payload"].get("index") for line in lines[:3]], [0, 1, 2])
+        self.assertEqual(lines[-1]["payload"], {"status": "ok"})
+        self.assertEqual(stats["written"], 51)
+        self.assertEqual(stats["dropped"], 0)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_tools_log_writer_flushes_on_interval(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = Path(tmp) / "history.jsonl"
+            writer = BufferedLogWriter(SegmentedLogFile(log_path), flush_interval_seconds=0.05)
+            writer.submit({"event": "decision_made", "payload": {}})
+
+            deadline = time.monotonic() + 2.0
+            while time.monotonic() < deadline and not log_path.read_text(encoding="utf-8"):
+                time.sleep(0.01)
+            content = log_path.read_text(encoding="utf-8")
+            writer.close()
+
+        self.assertIn("decision_made", content)
+
+    def test_tools_log_writer_drops_and_counts_when_queue_is_full(self) -> None:
+        release = threading.Event()
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = BufferedLogWriter(
+                SegmentedLogFile(Path(tmp) / "history.jsonl"),
+                emit=lambda line: release.wait(2.0),
+                queue_size=2,
+                batch_size=1,
+            )
+            results = [writer.submit({"event": "tool_input", "payload": {"n": n}}) for n in range(10)]
+            dropped = writer.stats()["dropped"]
+            release.set()
+            writer.close()
+
+        self.assertGreaterEqual(dropped, 7)
+        self.assertEqual(results.count(False), dropped)
+        self.assertEqual(writer.stats()["written"], 10 - dropped)
+
+    def test_tools_log_writer_survives_a_failing_sink(self) -> None:
+        class FlakySink:
+            def __init__(self) -> None:
+                self.chunks: list = []
+                self.failures = 1
+
+            def write(self, chunk: str) -> None:
+                if self.failures:
+                    self.failures -= 1
+                    raise OSError("No space left on device")
+                self.chunks.append(chunk)
+
+            def flush(self, fsync: bool = False) -> None:
+                pass
+
+        sink = FlakySink()
+        writer = BufferedLogWriter(sink, batch_size=1)
+        writer.submit({"event": "tool_input", "payload": {"n": 0}})
+        writer.submit({"event": "tool_input", "payload": {"n": 1}})
+        writer.close()
+
+        stats = writer.stats()
+        self.assertEqual(stats["write_errors"], 1)
+        self.assertEqual(stats["written"], 1)
+        self.assertEqual(len(sink.chunks), 1)
+        self.assertIn('"n": 1', sink.chunks[0])
+
+    def test_tools_log_writer_survives_a_payload_mutated_while_serializing(self) -> None:
+        class MutatedDict(dict):
+            def items(self):
+                raise RuntimeError("dictionary changed size during iteration")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = Path(tmp) / "history.jsonl"
+            writer = BufferedLogWriter(SegmentedLogFile(log_path), batch_size=1)
+            writer.submit({"event": "tool_output", "payload": {"output": MutatedDict(status="ok")}})
+            writer.submit({"event": "tool_output", "payload": {"n": 1}})
+            writer.close()
+            lines = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+
+        stats = writer.stats()
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["written"], 1)
+        self.assertEqual([line["payload"] for line in lines], [{"n": 1}])
+
+
+class LogHistoryQueryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.log_path = Path(self._tmp.name) / "history.jsonl"
+
+    def _logger(self, max_entries: int = 5) -> AgentLogger:
+        return AgentLogger(name="tool_agent_test_query_logger", file_path=str(self.log_path), max_entries=max_entries)
+
+    def test_tools_logger_history_is_a_bounded_ring(self) -> None:
+        logger = self._logger()
+        for index in range(12):
+            logger.log("tool_input", {"index": index})
+
+        self.assertEqual([entry["seq"] for entry in logger.get_history()], [8, 9, 10, 11, 12])
+        self.assertEqual(len(self.log_path.read_text(encoding="utf-8").splitlines()), 12)
+
+    def test_tools_logger_query_pages_from_file_into_ring(self) -> None:
+        logger = self._logger()
+        for index in range(12):
+            logger.log("tool_input" if index % 2 else "tool_output", {"index": index})
+
+        tail = logger.query(limit=3)
+        self.assertEqual([entry["seq"] for entry in tail["entries"]], [10, 11, 12])
+
+        first = logger.query(cursor=0, limit=5)
+        second = logger.query(cursor=first["next_cursor"], limit=5)
+        third = logger.query(cursor=second["next_cursor"], limit=5)
+        self.assertEqual([entry["seq"] for entry in first["entries"]], [1, 2, 3, 4, 5])
+        self.assertEqual([entry["seq"] for entry in second["entries"]], [6, 7, 8, 9, 10])
+        self.assertEqual([entry["seq"] for entry in third["entries"]], [11, 12])
+        self.assertTrue(first["has_more"])
+        self.assertFalse(third["has_more"])
+
+        outputs = logger.query(cursor=0, limit=100, event="tool_output")
+        self.assertEqual([entry["payload"]["index"] for entry in outputs["entries"]], [0, 2, 4, 6, 8, 10])
+
+    def test_tools_logger_query_filters_by_request_id_and_since(self) -> None:
+        logger = self._logger(max_entries=100)
+        logger.log("decision_made", {})
+        with Tracer().trace(request_id="req-7"):
+            logger.log("tool_input", {})
+            logger.log("final_response", {})
+        cutoff = time.time()
+        logger.log("decision_made", {})
+
+        by_request = logger.query(cursor=0, request_id="req-7")
+        self.assertEqual([entry["event"] for entry in by_request["entries"]], ["tool_input", "final_response"])
+        self.assertEqual([entry["seq"] for entry in logger.query(since=cutoff)["entries"]], [4])
+
+    def test_tools_logger_seq_continues_across_restarts(self) -> None:
+        first = self._logger()
+        first.log("decision_made", {})
+        first.log("final_response", {})
+
+        second = self._logger()
+        second.log("decision_made", {})
+
+        self.assertEqual(second.get_history()[0]["seq"], 3)
+        self.assertEqual([entry["seq"] for entry in second.query(cursor=0)["entries"]], [1, 2, 3])
+
+    def test_tools_log_file_index_seeks_from_sparse_points(self) -> None:
+        with self.log_path.open("w", encoding="utf-8") as handle:
+            handle.write("legacy line without seq\n")
+            for seq in range(1, 41):
+                handle.write(json.dumps({"seq": seq, "ts": float(seq), "event": "e", "payload": {}}) + "\n")
+            handle.write('{"seq": 41, "ts"')
+
+        index = LogFileIndex(self.log_path, every=8)
+        self.assertEqual(index.last_seq(), 40)
+        self.assertEqual([entry["seq"] for entry in index.scan(after_seq=30)], list(range(31, 41)))
+        self.assertEqual(next(index.scan(since=17.0))["seq"], 17)
+        self.assertLessEqual(len(index._points), 6)
+
+
+class LogSegmentTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.log_path = Path(self._tmp.name) / "history.jsonl"
+
+    def _logger(self, **rotation) -> AgentLogger:
+        policy = RotationPolicy(**{"max_bytes": 2000, "block_entries": 4, **rotation})
+        logger = AgentLogger(
+            name="tool_agent_test_segment_logger",
+            file_path=str(self.log_path),
+            max_entries=3,
+            rotation=policy,
+        )
+        self.addCleanup(logger.close)
+        return logger
+
+    def test_tools_logger_rotates_and_compresses_segments_by_size(self) -> None:
+        logger = self._logger()
+        for index in range(60):
+            with Tracer().trace(request_id=f"req-{index % 6}"):
+                logger.log("tool_output", {"index": index, "padding": "x" * 40})
+        logger._file.wait_for_sealing()
+
+        segments = list_segments(self.log_path)
+        self.assertGreaterEqual(len(segments), 2)
+        self.assertTrue(all(segment.compressed for segment in segments))
+        self.assertTrue(all(segment.data_path.name.endswith(".jsonl.gz") for segment in segments))
+        index = json.loads(segments[0].index_path.read_text(encoding="utf-8"))
+        self.assertEqual(index["first_seq"], 1)
+        self.assertIn("req-1", index["request_ids"])
+
+        page = logger.query(cursor=0, limit=100)
+        self.assertEqual([entry["seq"] for entry in page["entries"]], list(range(1, 61)))
+
+        by_request = logger.query(cursor=0, limit=100, request_id="req-2")
+        self.assertEqual([entry["payload"]["index"] for entry in by_request["entries"]], list(range(2, 60, 6)))
+
+    def test_tools_log_segments_skip_blocks_without_matching_request(self) -> None:
+        logger = self._logger()
+        for index in range(40):
+            with Tracer().trace(request_id="rare" if index == 33 else "common"):
+                logger.log("tool_output", {"index": index, "padding": "x" * 40})
+        logger._file.rotate()
+        logger._file.wait_for_sealing()
+
+        reader = SegmentReader(self.log_path)
+        seqs = [entry["seq"] for entry in reader.scan(after_seq=0, request_id="rare")]
+        self.assertIn(34, seqs)
+        self.assertLessEqual(len(seqs), 4)
+        self.assertEqual(reader.last_seq(), 40)
+
+    def test_tools_log_segments_rotate_by_age_and_apply_retention(self) -> None:
+        policy = RotationPolicy(max_bytes=0, max_age_seconds=60.0, retention_segments=2, compression="xz")
+        log_file = SegmentedLogFile(self.log_path, policy, compress_in_background=False)
+        self.addCleanup(log_file.close)
+        for seq in range(1, 7):
+            log_file.write(json.dumps({"seq": seq, "ts": time.time(), "event": "e", "payload": {}}) + "\n")
+            log_file._opened_at -= 120.0
+
+        segments = list_segments(self.log_path)
+        self.assertEqual([segment.first_seq for segment in segments], [3, 5])
+        self.assertTrue(segments[0].data_path.name.endswith(".jsonl.xz"))
+        self.assertEqual(self.log_path.stat().st_size, 0)
+
+        removed = apply_retention(self.log_path, RotationPolicy(retention_seconds=1.0), now=time.time() + 60)
+        self.assertEqual(len(removed), 4)
+        self.assertEqual(list_segments(self.log_path), [])
+
+    def test_tools_log_segment_reader_bounds_and_prunes_cached_indexes(self) -> None:
+        policy = RotationPolicy(max_bytes=0, max_age_seconds=60.0, compression="gzip")
+        log_file = SegmentedLogFile(self.log_path, policy, compress_in_background=False)
+        self.addCleanup(log_file.close)
+        for seq in range(1, 5):
+            log_file.write(json.dumps({"seq": seq, "ts": time.time(), "event": "e", "payload": {}}) + "\n")
+            log_file._opened_at -= 120.0
+
+        reader = SegmentReader(self.log_path, max_cached_indexes=2)
+        self.assertEqual([entry["seq"] for entry in reader.scan(after_seq=0)], [1, 2, 3, 4])
+        self.assertEqual(len(reader._indexes), 2)
+
+        apply_retention(self.log_path, RotationPolicy(retention_seconds=1.0), now=time.time() + 60)
+        self.assertEqual(list(reader.scan(after_seq=0)), [])
+        self.assertEqual(len(reader._indexes), 0)
+
+
+class LogPolicyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.log_path = Path(self._tmp.name) / "policies.jsonl"
+
+    def _logger(self, policies: PayloadPolicies) -> AgentLogger:
+        return AgentLogger(name="tool_agent_test_policy_logger", file_path=str(self.log_path), policies=policies)
+
+    def test_tools_logger_policies_store_large_values_once_and_truncate(self) -> None:
+        policy = EventPolicy(max_field_chars=20, dedupe_min_chars=200)
+        logger = self._logger(PayloadPolicies({"tool_output": policy, "final_response": policy}))
+        records = [{"id": index, "text": "x" * 50} for index in range(5)]
+        answer = "Jawaban " + "panjang " * 10
+
+        logger.log("tool_output", {"tool": "structured_data_tool", "output": {"status": "ok", "data": records}})
+        logger.log("final_response", {"status": "ok", "message": answer, "data": records})
+
+        events = [entry["event"] for entry in logger.get_history()]
+        self.assertEqual(events, ["payload_blob", "tool_output", "final_response"])
+        blob, tool_output, final = logger.get_history()
+        self.assertEqual(blob["payload"]["value"], records)
+        self.assertEqual(tool_output["payload"]["output"]["data"], {"$ref": blob["payload"]["digest"]})
+        self.assertEqual(final["payload"]["data"], {"$ref": blob["payload"]["digest"]})
+        self.assertEqual(final["payload"]["message"], answer[:20] + f"...[truncated {len(answer) - 20} chars]")
+        self.assertEqual(logger.policy_stats()["deduplicated"], 1)
+
+    def test_tools_logger_policies_rewrite_blobs_after_rotation_and_drops(self) -> None:
+        policies = PayloadPolicies({"tool_output": EventPolicy(dedupe_min_chars=100)})
+        logger = self._logger(policies)
+        records = [{"id": index, "text": "x" * 50} for index in range(3)]
+        digest = "sha256:" + hashlib.sha256(json.dumps(records, sort_keys=True).encode("utf-8")).hexdigest()
+
+        logger.log("tool_output", {"data": records})
+        logger.log("tool_output", {"data": records})
+        logger._file.rotate()
+        logger._file.wait_for_sealing()
+        logger.log("tool_output", {"data": records})
+        policies.forget_blobs([digest])
+        logger.log("tool_output", {"data": records})
+
+        events = [entry["event"] for entry in logger.get_history()]
+        self.assertEqual(events.count("payload_blob"), 3)
+        self.assertEqual(logger.get_history()[0]["payload"]["digest"], digest)
+
+    def test_tools_logger_default_policies_keep_identifying_fields_inline(self) -> None:
+        policies = PayloadPolicies(DEFAULT_EVENT_POLICIES)
+        records = [{"service_name": f"Service {index}", "tier": "premium", "notes": "n" * 60} for index in range(8)]
+        tool_output = {
+            "tool": "structured_data_tool",
+            "output": {"status": "ok", "message": "Found 8 SLA records.", "data": {"sla_lookup": records}},
+        }
+        final = build_response(
+            status="ok",
+            decision="structured_lookup",
+            message="Layanan premium memiliki waktu respons satu jam. " * 7,
+            risk={"status": "ok", "reason": "No risk detected."},
+        )
+        self.assertGreater(len(final["message"]), 330)
+
+        shaped_tool, tool_blobs = policies.apply("tool_output", tool_output)
+        shaped_final, _ = policies.apply("final_response", final)
+
+        self.assertEqual(shaped_tool["tool"], "structured_data_tool")
+        self.assertEqual(shaped_tool["output"]["status"], "ok")
+        self.assertEqual(shaped_tool["output"]["message"], "Found 8 SLA records.")
+        self.assertEqual(shaped_tool["output"]["data"]["sla_lookup"], {"$ref": tool_blobs[0]["digest"]})
+        self.assertEqual(tool_blobs[0]["value"], records)
+        self.assertEqual(shaped_final, final)
+
+    def test_tools_logger_policies_sample_but_keep_refusals_and_errors(self) -> None:
+        draws = iter([0.9, 0.1, 0.9, 0.9])
+        verbose = EventPolicy(sample_rate=0.5, max_field_chars=5)
+        policies = PayloadPolicies(
+            {"tool_input": verbose, "refusal_decision": verbose, "tool_output": verbose},
+            rng=lambda: next(draws),
+        )
+        logger = self._logger(policies)
+
+        logger.log("tool_input", {"index": 0})
+        logger.log("tool_input", {"index": 1})
+        logger.log("refusal_decision", {"decision": "guardrail_refuse", "message": "Tidak dapat membantu."})
+        logger.log("tool_output", {"tool": "external_api_tool", "output": {"status": "error", "message": "timeout"}})
+
+        history = logger.get_history()
+        self.assertEqual([entry["event"] for entry in history], ["tool_input", "refusal_decision", "tool_output"])
+        self.assertEqual(history[0]["payload"], {"index": 1})
+        self.assertEqual(history[0]["sample_rate"], 0.5)
+        self.assertEqual(history[1]["payload"]["message"], "Tidak dapat membantu.")
+        self.assertEqual(history[2]["payload"]["output"]["message"], "timeout")
+        self.assertEqual(logger.policy_stats()["sampled_out"], {"tool_input": 1})
+
+    def test_tools_logger_policies_rate_limit_per_second(self) -> None:
+        now = [100.0]
+        policies = PayloadPolicies({"tool_input": EventPolicy(max_per_second=2)}, clock=lambda: now[0])
+        logger = self._logger(policies)
+        for index in range(5):
+            logger.log("tool_input", {"index": index})
+        now[0] += 1.0
+        logger.log("tool_input", {"index": 5})
+
+        self.assertEqual([entry["payload"]["index"] for entry in logger.get_history()], [0, 1, 5])
+        self.assertEqual(logger.policy_stats()["sampled_out"], {"tool_input": 3})
+
+
+class LogAnalyticsTests(unittest.TestCase):
+    def test_tools_log_quantile_sketch_stays_within_relative_error(self) -> None:
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in range(1, 10001):
+            sketch.add(float(value))
+
+        self.assertAlmostEqual(sketch.quantile(0.5), 5000, delta=50)
+        self.assertAlmostEqual(sketch.quantile(0.99), 9900, delta=99)
+        self.assertEqual(sketch.quantile(1.0), 10000)
+        self.assertLess(len(sketch._buckets), 500)
+
+    def test_tools_log_analyzer_reports_latency_fallbacks_and_storms(self) -> None:
+        entries = []
+
+        def add(ts: float, event: str, request_id: str, **payload) -> None:
+            entries.append(
+                {"seq": len(entries) + 1, "ts": ts, "event": event, "request_id": request_id, "payload": payload}
+            )
+
+        add(0.0, "decision_made", "r1", query="SLA premium", action="structured_data_tool")
+        add(0.01, "tool_input", "r1", tool="structured_data_tool")
+        add(0.05, "tool_output", "r1", tool="structured_data_tool", output={"status": "ok"})
+        add(0.1, "contextual_answer_generated", "r1")
+        add(0.2, "final_response", "r1", status="ok", decision="structured_data_tool")
+        add(1.0, "decision_made", "r2", query="cuaca jakarta", action="external_api_tool")
+        add(1.0, "tool_input", "r2", tool="external_api_tool")
+        for offset in (0.1, 0.2, 0.3):
+            add(1.0 + offset, "retry_attempt", "r2", attempt=1, tool="external_api_tool")
+        add(2.0, "tool_output", "r2", tool="external_api_tool", output={"status": "error"})
+        add(3.0, "final_response", "r2", status="ok", decision="external_api_tool")
+        add(4.0, "decision_made", "r3", query="kebijakan refund", action="structured_data_tool")
+        add(4.5, "contextual_answer_failed", "r3", error="timeout")
+        add(4.6, "final_response", "r3", status="ok", decision="structured_data_tool")
+        add(5.0, "decision_made", "r4", query="never answered", action="direct_answer")
+
+        log_path = Path(self._tmp_dir()) / "history.jsonl"
+        log_path.write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
+        report = analyze_logs([str(log_path)], top_n=2, storm_threshold=3, storm_window_seconds=1.0)
+
+        self.assertEqual(report["requests"]["completed"], 3)
+        self.assertEqual(report["requests"]["unfinished"], 1)
+        self.assertEqual(report["decision_latency_ms"]["structured_data_tool"]["count"], 2)
+        self.assertAlmostEqual(report["decision_latency_ms"]["external_api_tool"]["p50"], 2000, delta=20)
+        self.assertAlmostEqual(report["tool_latency_ms"]["structured_data_tool"]["max"], 40, delta=1)
+        self.assertEqual(report["tool_error_rates"]["external_api_tool"]["rate"], 1.0)
+        self.assertEqual(report["fallback_rates"]["structured_data_tool"], {"total": 2, "count": 1, "rate": 0.5})
+        self.assertEqual(report["contextual_answer_failures"], {"total": 2, "count": 1, "rate": 0.5})
+        self.assertEqual(report["retries"]["total"], 3)
+        self.assertEqual(report["retries"]["storms"], [{"start_ts": 1.1, "end_ts": 1.3, "retries": 3}])
+        self.assertEqual([item["request_id"] for item in report["slowest_requests"]], ["r2", "r3"])
+        self.assertEqual(report["slowest_requests"][0]["query"], "cuaca jakarta")
+
+    def test_tools_log_analyzer_bounds_open_requests(self) -> None:
+        analyzer = LogAnalyzer(max_open_requests=2)
+        for index in range(5):
+            analyzer.add({"seq": index + 1, "ts": float(index), "event": "decision_made", "request_id": f"r{index}"})
+
+        self.assertEqual(len(analyzer._open), 2)
+        self.assertEqual(analyzer.report()["requests"]["unfinished"], 5)
+
+    def test_tools_log_analyzer_resolves_deduplicated_payloads(self) -> None:
+        log_path = Path(self._tmp_dir()) / "history.jsonl"
+        logger = AgentLogger(
+            name="tool_agent_test_analytics_logger",
+            file_path=str(log_path),
+            policies=PayloadPolicies(DEFAULT_EVENT_POLICIES),
+        )
+        self.addCleanup(logger.close)
+        records = [{"service_name": f"Service {index}", "notes": "n" * 80} for index in range(8)]
+        output = {"status": "ok", "data": {"sla_lookup": records}}
+        for request_id in ("r1", "r2"):
+            with Tracer().trace(request_id=request_id):
+                logger.log("decision_made", {"query": "SLA premium", "action": "structured_data_tool"})
+                logger.log("tool_input", {"tool": "structured_data_tool", "params": {"query": "SLA premium"}})
+                logger.log("tool_output", {"tool": "structured_data_tool", "output": output})
+                logger.log("final_response", {"status": "ok", "decision": "structured_data_tool", "message": "ok"})
+        self.assertIn("payload_blob", [entry["event"] for entry in logger.get_history()])
+
+        report = analyze_logs([str(log_path)])
+        self.assertEqual(report["tool_error_rates"]["structured_data_tool"], {"total": 2, "count": 0, "rate": 0.0})
+        self.assertEqual(report["fallback_rates"]["structured_data_tool"], {"total": 2, "count": 0, "rate": 0.0})
+        self.assertEqual(report["unresolved_refs"], 0)
+
+        # Logs written before identifying fields were kept inline reference whole outputs.
+        analyzer = LogAnalyzer()
+        blob = {"digest": "sha256:kept", "value": {"status": "ok", "data": records}}
+        analyzer.add({"seq": 1, "ts": 0.0, "event": "payload_blob", "request_id": "r3", "payload": blob})
+        for seq, (request_id, digest) in enumerate((("r3", "sha256:kept"), ("r4", "sha256:gone")), start=2):
+            payload = {"tool": "structured_data_tool", "output": {"$ref": digest}}
+            analyzer.add({"seq": seq, "ts": 0.1, "event": "tool_output", "request_id": request_id, "payload": payload})
+            analyzer.add({"seq": seq, "ts": 0.2, "event": "final_response", "request_id": request_id, "payload": {}})
+        report = analyzer.report()
+        self.assertEqual(report["tool_error_rates"]["structured_data_tool"], {"total": 1, "count": 0, "rate": 0.0})
+        self.assertEqual(report["fallback_rates"]["unknown"], {"total": 2, "count": 0, "rate": 0.0})
+        self.assertEqual(report["unresolved_refs"], 1)
+
+    def _tmp_dir(self) -> str:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return tmp.name
+
 
 if __name__ == "__main__":
     unittest.main()
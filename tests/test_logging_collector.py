@@ -0,0 +1,93 @@
+"""Unit tests for the central log collector and its worker client."""
+
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.logging import AgentLogger
+from src.logging.collector import CollectorLogger, CollectorUnavailable, LogCollector
+from src.services.tracing import Tracer
+
+
+class LogCollectorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.socket_path = os.path.join(self._tmp.name, "logs.sock")
+        self.log_path = Path(self._tmp.name) / "history.jsonl"
+
+    def _start(self) -> AgentLogger:
+        logger = AgentLogger(name="tool_agent_test_collector", file_path=str(self.log_path), max_entries=100)
+        collector = LogCollector(self.socket_path, logger)
+        thread = threading.Thread(target=collector.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            collector.shutdown()
+            collector.server_close()
+            thread.join(timeout=2)
+            logger.close()
+
+        self.addCleanup(stop)
+        return logger
+
+    def _client(self) -> CollectorLogger:
+        client = CollectorLogger(self.socket_path, flush_interval_seconds=0.01, timeout_seconds=2)
+        self.addCleanup(client.close)
+        return client
+
+    def test_logging_collector_orders_entries_from_many_workers(self) -> None:
+        logger = self._start()
+        workers = [self._client() for _ in range(3)]
+
+        def work(index: int, client: CollectorLogger) -> None:
+            with Tracer().trace(request_id=f"req-{index}"):
+                for step in range(20):
+                    client.log("tool_input", {"worker": index, "step": step})
+
+        threads = [threading.Thread(target=work, args=(index, client)) for index, client in enumerate(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for client in workers:
+            client.close()
+
+        history = logger.get_history()
+        self.assertEqual([entry["seq"] for entry in history], list(range(1, 61)))
+        for index in range(3):
+            steps = [entry["payload"]["step"] for entry in history if entry["request_id"] == f"req-{index}"]
+            self.assertEqual(steps, list(range(20)))
+        self.assertEqual(len(self.log_path.read_text(encoding="utf-8").splitlines()), 60)
+
+        reader = self._client()
+        page = reader.query(cursor=0, limit=10, request_id="req-1")
+        self.assertEqual([entry["payload"]["step"] for entry in page["entries"]], list(range(10)))
+        self.assertTrue(page["has_more"])
+        self.assertEqual(len(reader.get_history()), 60)
+        self.assertEqual(reader.get_log_file_path(), str(self.log_path))
+        self.assertEqual(reader.writer_stats()["lost"], 0)
+
+        requests = []
+        send = reader._request
+        reader._request = lambda request: requests.append(request["op"]) or send(request)  # type: ignore[method-assign]
+        stats = reader.stats()
+        self.assertEqual(requests, ["stats"])
+        self.assertEqual(stats["log_file"], str(self.log_path))
+        self.assertEqual(stats["writer"]["lost"], 0)
+        self.assertEqual(stats["policies"], logger.policy_stats())
+
+    def test_logging_collector_client_survives_missing_collector(self) -> None:
+        client = CollectorLogger(self.socket_path, flush_interval_seconds=0.01, timeout_seconds=1)
+        client.log("tool_input", {"index": 0})
+        client.close()
+
+        self.assertEqual(client._sink.lost_lines, 1)
+        with self.assertRaises(CollectorUnavailable):
+            client.query(limit=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
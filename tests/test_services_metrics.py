@@ -0,0 +1,130 @@
+"""Unit tests for the in-process metrics registry and agent metrics."""
+
+import threading
+import unittest
+
+from src.agent import AgentDependencies, ResponseCache, ToolEnabledAgent
+from src.services.metrics import AgentMetrics, MetricsRegistry
+from src.services.retry_service import RetryService
+from src.services.tracing import Tracer
+from src.tools.guardrail_tool import GuardrailTool
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_metrics_registry_renders_prometheus_text(self) -> None:
+        registry = MetricsRegistry()
+        requests = registry.counter("demo_requests_total", "Requests.", ("status",))
+        in_flight = registry.gauge("demo_in_flight", "In flight.")
+        latency = registry.histogram("demo_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+        requests.inc(status="ok")
+        requests.inc(2, status='bad "quote"')
+        in_flight.set(3)
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        text = registry.render()
+        self.assertIn("# TYPE demo_requests_total counter", text)
+        self.assertIn('demo_requests_total{status="ok"} 1.0', text)
+        self.assertIn('demo_requests_total{status="bad \\"quote\\""} 2.0', text)
+        self.assertIn("demo_in_flight 3.0", text)
+        self.assertIn('demo_latency_seconds_bucket{le="0.1"} 1.0', text)
+        self.assertIn('demo_latency_seconds_bucket{le="1.0"} 2.0', text)
+        self.assertIn('demo_latency_seconds_bucket{le="+Inf"} 3.0', text)
+        self.assertIn("demo_latency_seconds_count 3.0", text)
+        self.assertIn("demo_latency_seconds_sum 5.55", text)
+
+    def test_metrics_registry_rejects_conflicting_registration_and_labels(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo.", ("tool",))
+        self.assertIs(registry.counter("demo_total", "Demo.", ("tool",)), counter)
+        with self.assertRaises(ValueError):
+            registry.gauge("demo_total", "Demo.")
+        with self.assertRaises(ValueError):
+            counter.inc(status="ok")
+
+    def test_metrics_histogram_merges_per_thread_shards(self) -> None:
+        histogram = MetricsRegistry().histogram("demo_seconds", "Demo.", ("stage",), buckets=(1.0,))
+
+        def observe() -> None:
+            for _ in range(1000):
+                histogram.observe(0.5, stage="tool")
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snapshot = histogram.snapshot(stage="tool")
+        self.assertEqual(snapshot["count"], 4000)
+        self.assertEqual(snapshot["buckets"], {"1.0": 4000, "+Inf": 4000})
+
+    def test_metrics_histogram_folds_shards_of_exited_threads(self) -> None:
+        histogram = MetricsRegistry().histogram("demo_seconds", "Demo.", ("stage",), buckets=(1.0,))
+        for _ in range(20):
+            thread = threading.Thread(target=lambda: histogram.observe(2.0, stage="tool"))
+            thread.start()
+            thread.join()
+        histogram.observe(0.5, stage="tool")
+
+        self.assertEqual(len(histogram._shards), 1)
+        snapshot = histogram.snapshot(stage="tool")
+        self.assertEqual(snapshot["count"], 21)
+        self.assertEqual(snapshot["sum"], 40.5)
+        self.assertEqual(snapshot["buckets"], {"1.0": 1, "+Inf": 21})
+
+    def test_metrics_retry_service_counts_retries(self) -> None:
+        metrics = AgentMetrics()
+        attempts = []
+
+        def flaky() -> str:
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("try again")
+            return "ok"
+
+        self.assertEqual(RetryService(retry_counter=metrics.retries).execute(flaky, retries=2), "ok")
+        self.assertEqual(metrics.retries.value(), 2.0)
+
+
+class AgentMetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.metrics = AgentMetrics()
+        self.agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: {"status": "ok", "message": "structured-ok"},
+                external_api_tool=lambda p: {"status": "error", "message": "weather unavailable"},
+                guardrail_tool=GuardrailTool().run,
+                response_cache=ResponseCache(),
+                tracer=Tracer(self.metrics),
+                metrics=self.metrics,
+            )
+        )
+
+    def test_agent_metrics_count_requests_tools_and_cache(self) -> None:
+        self.agent.handle_query("SLA premium support")
+        self.agent.handle_query("SLA premium support")
+        self.agent.handle_query("cuaca hari ini di jakarta")
+
+        requests = self.metrics.requests
+        self.assertEqual(requests.value(action="structured_data_tool", status="ok"), 2.0)
+        self.assertEqual(requests.value(action="external_api_tool", status="ok"), 1.0)
+        self.assertEqual(self.metrics.tool_calls.value(tool="structured_data_tool", status="ok"), 1.0)
+        self.assertEqual(self.metrics.tool_calls.value(tool="external_api_tool", status="error"), 1.0)
+        self.assertEqual(self.metrics.fallbacks.value(reason="tool_error"), 1.0)
+        self.assertAlmostEqual(self.metrics.cache_hit_ratio.value(), 1 / 3)
+        self.assertEqual(self.metrics.in_flight.value(), 0.0)
+
+    def test_agent_metrics_record_stage_latency_from_traces(self) -> None:
+        self.agent.handle_query("SLA premium support")
+
+        self.assertEqual(self.metrics.stage_duration.snapshot(stage="tool.structured_data_tool")["count"], 1)
+        self.assertEqual(self.metrics.stage_duration.snapshot(stage="guardrail.final")["count"], 1)
+        text = self.agent.render_metrics()
+        self.assertIn('agent_stage_duration_seconds_count{stage="decide"} 1.0', text)
+        self.assertIn("agent_requests_in_flight 0.0", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Unit tests for model tier routing and endpoint balancing."""
+
+import unittest
+
+from src.services.model_router import EndpointPool, ModelRouter, ModelTier
+
+
+class ModelRouterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.router = ModelRouter(
+            [
+                ModelTier(
+                    name="small",
+                    model="tiny",
+                    max_context_chars=400,
+                    max_records=1,
+                    latency_budget_seconds=10,
+                    sources=("accounts", "sla_lookup"),
+                ),
+                ModelTier(
+                    name="large",
+                    model="big",
+                    max_context_chars=0,
+                    max_records=0,
+                    latency_budget_seconds=240,
+                ),
+            ]
+        )
+
+    def test_services_router_sends_single_record_lookup_to_small_tier(self) -> None:
+        tier = self.router.select({"source": "accounts", "record": {"user_id": "1002"}})
+        self.assertEqual(tier.model, "tiny")
+
+    def test_services_router_sends_multi_record_and_unlisted_sources_to_large_tier(self) -> None:
+        multi = self.router.select(
+            {"source": "accounts", "records": [{"user_id": "1001"}, {"user_id": "1002"}]}
+        )
+        policy = self.router.select({"source": "policies", "record": {"policy_id": "POL-001"}})
+        mixed = self.router.select(
+            {
+                "sources": [
+                    {"source": "sla_lookup", "records": [{}], "match_count": 1},
+                    {"source": "policies", "records": [{}], "match_count": 1},
+                ]
+            }
+        )
+        self.assertEqual({multi.model, policy.model, mixed.model}, {"big"})
+
+    def test_services_endpoint_pool_prefers_least_outstanding_instance(self) -> None:
+        pool = EndpointPool(["http://a:11434", "http://b:11434/"])
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertNotEqual(first, second)
+
+        pool.release(first)
+        self.assertEqual(pool.acquire(), first)
+        self.assertEqual(pool.snapshot(), {"http://a:11434": 1, "http://b:11434": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
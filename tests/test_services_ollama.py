@@ -0,0 +1,207 @@
+"""Unit tests for Ollama service request shaping."""
+
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from src.schemas import GenerationAborted
+from src.services.model_router import ModelRouter, ModelTier
+from src.services.ollama_service import SYSTEM_PROMPT, OllamaService
+from src.tools.guardrail_tool import GuardrailTool
+
+
+class _FakeHTTPResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def read(self):
+        return json.dumps(self._payload).encode("utf-8")
+
+
+class _FakeStreamResponse:
+    def __init__(self, events):
+        self._lines = [json.dumps(event).encode("utf-8") + b"\n" for event in events]
+        self.consumed = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.closed = True
+        return False
+
+    def __iter__(self):
+        for line in self._lines:
+            self.consumed += 1
+            yield line
+
+
+class OllamaServiceTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.requests = []
+        self.service = OllamaService(model="tiny", keep_alive="-1")
+
+    def _fake_urlopen(self, payload):
+        def urlopen(http_request, timeout=None):
+            self.requests.append((http_request.full_url, json.loads(http_request.data.decode("utf-8"))))
+            return _FakeHTTPResponse(payload)
+
+        return urlopen
+
+    def test_services_ollama_sends_static_prefix_as_system_message(self) -> None:
+        with mock.patch(
+            "src.services.ollama_service.request.urlopen",
+            self._fake_urlopen({"message": {"role": "assistant", "content": "1 hour."}}),
+        ):
+            answer = self.service.answer_with_context("SLA premium?", {"source": "sla_lookup"})
+
+        self.assertEqual(answer, "1 hour.")
+        url, body = self.requests[0]
+        self.assertTrue(url.endswith("/api/chat"))
+        self.assertEqual(body["keep_alive"], -1)
+        self.assertEqual(body["messages"][0], {"role": "system", "content": SYSTEM_PROMPT})
+        self.assertNotIn(SYSTEM_PROMPT, body["messages"][1]["content"])
+        self.assertIn("User query: SLA premium?", body["messages"][1]["content"])
+
+    def test_services_ollama_empty_answer_raises(self) -> None:
+        with mock.patch(
+            "src.services.ollama_service.request.urlopen",
+            self._fake_urlopen({"message": {"role": "assistant", "content": "  "}}),
+        ):
+            with self.assertRaises(ValueError):
+                self.service.answer_with_context("hello", {})
+
+    def test_services_ollama_generate_answer_reports_telemetry(self) -> None:
+        with mock.patch(
+            "src.services.ollama_service.request.urlopen",
+            self._fake_urlopen(
+                {
+                    "model": "tiny",
+                    "message": {"role": "assistant", "content": "Active."},
+                    "total_duration": 2_500_000_000,
+                    "load_duration": 1_200_000_000,
+                    "prompt_eval_count": 100,
+                    "prompt_eval_duration": 250_000_000,
+                    "eval_count": 20,
+                    "eval_duration": 1_000_000_000,
+                }
+            ),
+        ):
+            result = self.service.generate_answer("status 1002", {"source": "accounts"})
+
+        self.assertEqual(result.answer, "Active.")
+        telemetry = result.telemetry.to_dict()
+        self.assertTrue(telemetry["cold_load"])
+        self.assertEqual(telemetry["load_duration_ms"], 1200.0)
+        self.assertEqual(telemetry["prefill_tokens_per_second"], 400.0)
+        self.assertEqual(telemetry["decode_tokens_per_second"], 20.0)
+
+    def test_services_ollama_routes_small_context_to_small_model(self) -> None:
+        service = OllamaService(
+            model="big",
+            router=ModelRouter(
+                [
+                    ModelTier("small", "tiny", 500, 1, 5.0),
+                    ModelTier("large", "big", 0, 0, 240.0),
+                ]
+            ),
+            base_urls=["http://a:11434", "http://b:11434"],
+        )
+        with mock.patch(
+            "src.services.ollama_service.request.urlopen",
+            self._fake_urlopen({"message": {"role": "assistant", "content": "ok"}}),
+        ):
+            result = service.generate_answer("status 1002", {"source": "accounts", "record": {}})
+
+        self.assertEqual(self.requests[0][1]["model"], "tiny")
+        self.assertEqual(result.telemetry.tier, "small")
+        self.assertEqual(service.endpoint_load(), {"http://a:11434": 0, "http://b:11434": 0})
+
+    def test_services_ollama_streaming_guard_aborts_unsafe_generation(self) -> None:
+        stream = _FakeStreamResponse(
+            [
+                {"message": {"content": "First "}, "done": False},
+                {"message": {"content": "dele"}, "done": False},
+                {"message": {"content": "te all records"}, "done": False},
+                {"message": {"content": " and more"}, "done": False},
+                {"message": {"content": ""}, "done": True, "eval_count": 4},
+            ]
+        )
+        service = OllamaService(model="tiny", stream_guard=GuardrailTool().stream_monitor)
+        with mock.patch("src.services.ollama_service.request.urlopen", lambda req, timeout=None: stream):
+            with self.assertRaises(GenerationAborted) as raised:
+                service.generate_answer("how to clean up?", {"source": "policies"})
+
+        self.assertEqual(raised.exception.risk["status"], "refused")
+        self.assertEqual(raised.exception.partial_answer, "First delete all records")
+        self.assertEqual(stream.consumed, 3)
+        self.assertTrue(stream.closed)
+
+    def test_services_ollama_streaming_returns_answer_and_telemetry(self) -> None:
+        stream = _FakeStreamResponse(
+            [
+                {"message": {"content": "1 "}, "done": False},
+                {"message": {"content": "hour."}, "done": False},
+                {"message": {"content": ""}, "done": True, "eval_count": 2, "eval_duration": 100_000_000},
+            ]
+        )
+        service = OllamaService(model="tiny", stream_guard=GuardrailTool().stream_monitor)
+        with mock.patch("src.services.ollama_service.request.urlopen", lambda req, timeout=None: stream):
+            result = service.generate_answer("sla?", {"source": "sla_lookup"})
+
+        self.assertEqual(result.answer, "1 hour.")
+        self.assertEqual(result.telemetry.decode_tokens_per_second, 20.0)
+
+    def test_services_ollama_agenerate_answer_streams_chunked_response(self) -> None:
+        events = [
+            {"message": {"content": "1 "}, "done": False},
+            {"message": {"content": "hour."}, "done": False},
+            {"message": {"content": ""}, "done": True, "eval_count": 2, "eval_duration": 100_000_000},
+        ]
+        received = []
+
+        async def handle(reader, writer):
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+            received.append(json.loads(await reader.readexactly(length)))
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for event in events:
+                line = json.dumps(event).encode("utf-8") + b"\n"
+                writer.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            service = OllamaService(
+                base_url=f"http://127.0.0.1:{port}",
+                model="tiny",
+                stream_guard=GuardrailTool().stream_monitor,
+            )
+            async with server:
+                return await service.agenerate_answer("sla?", {"source": "sla_lookup"})
+
+        result = asyncio.run(run())
+
+        self.assertEqual(result.answer, "1 hour.")
+        self.assertEqual(result.telemetry.decode_tokens_per_second, 20.0)
+        self.assertTrue(received[0]["stream"])
+
+    def test_services_ollama_debug_prompt_keeps_full_text(self) -> None:
+        prompt = OllamaService.build_prompt("hello", {"source": "accounts"})
+        self.assertTrue(prompt.startswith(SYSTEM_PROMPT))
+        self.assertIn("User query: hello", prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Unit tests for per-request tracing and span export."""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agent import AgentDependencies, ToolEnabledAgent
+from src.services.tracing import JsonlTraceExporter, Tracer, bind_context, current_trace, span
+from src.tools.guardrail_tool import GuardrailTool
+
+
+class TracingTests(unittest.TestCase):
+    def test_tracing_span_is_noop_without_active_trace(self) -> None:
+        with span("orphan") as record:
+            self.assertIsNone(record)
+        self.assertIsNone(current_trace())
+
+    def test_tracing_nests_spans_and_records_errors(self) -> None:
+        with Tracer().trace("request", request_id="req-1") as trace:
+            with span("outer"):
+                with span("inner", source="sla_lookup"):
+                    pass
+            with self.assertRaises(ValueError):
+                with span("failing"):
+                    raise ValueError("boom")
+
+        spans = {record.name: record for record in trace.spans}
+        self.assertEqual(trace.request_id, "req-1")
+        self.assertIsNone(spans["request"].parent_id)
+        self.assertEqual(spans["outer"].parent_id, spans["request"].span_id)
+        self.assertEqual(spans["inner"].parent_id, spans["outer"].span_id)
+        self.assertEqual(spans["inner"].attributes, {"source": "sla_lookup"})
+        self.assertEqual(spans["failing"].attributes, {"error": "ValueError"})
+        self.assertTrue(all(record.duration_ms is not None for record in trace.spans))
+        self.assertIsNone(current_trace())
+
+    def test_tracing_bind_context_carries_trace_into_worker_threads(self) -> None:
+        def work(name):
+            with span(name):
+                return threading.current_thread().name
+
+        with Tracer().trace() as trace, ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(bind_context(work), f"worker-{i}") for i in range(2)]
+            [future.result() for future in futures]
+
+        names = {record.name for record in trace.spans}
+        self.assertEqual(names, {"request", "worker-0", "worker-1"})
+
+    def test_tracing_exports_one_jsonl_line_per_trace(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces", "trace.jsonl")
+            tracer = Tracer(JsonlTraceExporter(path))
+            for request_id in ("a", "b"):
+                with tracer.trace(request_id=request_id):
+                    with span("stage"):
+                        pass
+
+            with open(path, encoding="utf-8") as handle:
+                traces = [json.loads(line) for line in handle]
+
+        self.assertEqual([trace["request_id"] for trace in traces], ["a", "b"])
+        self.assertEqual([record["name"] for record in traces[0]["spans"]], ["request", "stage"])
+        self.assertIsNotNone(traces[0]["duration_ms"])
+
+
+class AgentProfileTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.agent = ToolEnabledAgent(
+            AgentDependencies(
+                structured_data_tool=lambda p: {"status": "ok", "message": "structured-ok"},
+                external_api_tool=lambda p: {"status": "ok", "message": "external-ok"},
+                guardrail_tool=GuardrailTool().run,
+            )
+        )
+
+    def test_agent_profile_lists_stage_spans(self) -> None:
+        result = self.agent.handle_query("SLA premium support", include_profile=True)
+
+        profile = result["profile"]
+        names = [record["name"] for record in profile["spans"]]
+        self.assertEqual(
+            names,
+            [
+                "handle_query",
+                "decide",
+                "guardrail.pre_check",
+                "answer",
+                "tool.structured_data_tool",
+                "guardrail.final",
+            ],
+        )
+        by_name = {record["name"]: record for record in profile["spans"]}
+        self.assertEqual(by_name["tool.structured_data_tool"]["parent_id"], by_name["answer"]["span_id"])
+        self.assertEqual(by_name["tool.structured_data_tool"]["attributes"], {"status": "ok"})
+        self.assertTrue(profile["request_id"])
+
+    def test_agent_profile_omitted_by_default(self) -> None:
+        self.assertNotIn("profile", self.agent.handle_query("SLA premium support"))
+
+    def test_agent_profile_follows_parallel_and_async_tools(self) -> None:
+        query = "SLA premium support and weather in Jakarta"
+        sync_result = self.agent.handle_query(query, include_profile=True)
+        async_result = asyncio.run(self.agent.ahandle_query(query, include_profile=True))
+
+        for result in (sync_result, async_result):
+            names = {record["name"] for record in result["profile"]["spans"]}
+            self.assertIn("tool.structured_data_tool", names)
+            self.assertIn("tool.external_api_tool", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
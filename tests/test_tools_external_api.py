@@ -1,5 +1,6 @@
 """Unit tests for external API tool behavior."""
 
+import asyncio
 import unittest
 
 from src.tools.external_api_tool import ExternalAPITool
@@ -31,6 +32,10 @@ class ExternalAPIToolTests(unittest.TestCase):
                 raise payload
             return ExternalAPIToolTests._FakeResponse(payload)
 
+    class _FakeAsyncRequester(_FakeRequester):
+        async def get(self, url, params=None, timeout=None):
+            return ExternalAPIToolTests._FakeRequester.get(self, url, params=params, timeout=timeout)
+
     def test_tools_external_api_success(self) -> None:
         tool = ExternalAPITool(
             requester=self._FakeRequester(
@@ -215,6 +220,22 @@ class ExternalAPIToolTests(unittest.TestCase):
         self.assertEqual(result["status"], "fallback")
         self.assertIn("timed out", result["error"].lower())
 
+    def test_tools_external_api_arun_matches_run(self) -> None:
+        responses = {
+            "geocode": {
+                "results": [
+                    {"name": "Jakarta", "country": "Indonesia", "latitude": -6.175, "longitude": 106.827}
+                ]
+            },
+            "forecast": {"current": {"temperature_2m": 31.2, "weather_code": 2}},
+        }
+        tool = ExternalAPITool(
+            requester=self._FakeRequester(responses),
+            async_requester=self._FakeAsyncRequester(responses),
+        )
+        query = {"query": "cuaca hari ini di jakarta"}
+        self.assertEqual(asyncio.run(tool.arun(query)), tool.run(query))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,7 @@
 
 import unittest
 
+from src.services.query_analysis import analyze_query
 from src.tools.guardrail_tool import GuardrailTool
 
 
@@ -14,6 +15,38 @@ class GuardrailToolTests(unittest.TestCase):
         self.assertEqual(result["status"], "refused")
         self.assertTrue(result["escalation_required"])
 
+    def test_tools_guardrail_uses_passed_analysis_only_for_its_query(self) -> None:
+        query = "Please DISABLE security checks"
+        analysis = analyze_query(query)
+
+        self.assertEqual(self.tool.run({"query": query, "analysis": analysis})["status"], "refused")
+        self.assertTrue(analysis.contains("disable security"))
+        stale = {"query": "What is SLA for Premium Support?", "analysis": analysis}
+        self.assertEqual(self.tool.run(stale)["status"], "approved")
+        # A keyword spanning the query and the proposed answer is still found.
+        split_query = "please disable"
+        split = {"query": split_query, "proposed_answer": "Security now", "analysis": analyze_query(split_query)}
+        self.assertEqual(self.tool.run(split)["status"], "refused")
+
+    def test_tools_guardrail_refuses_secret_requests_only_before_an_answer(self) -> None:
+        query = "What is the admin password for the internal database?"
+        self.assertEqual(self.tool.run({"query": query, "analysis": analyze_query(query)})["status"], "refused")
+        self.assertEqual(self.tool.run({"query": "What does the Password Policy require?"})["status"], "approved")
+        answer = {"query": "Who can rotate an API key?", "proposed_answer": "Admins rotate the API key."}
+        self.assertEqual(self.tool.run(answer)["status"], "approved")
+
+    def test_tools_guardrail_stream_monitor_catches_keyword_split_across_chunks(self) -> None:
+        monitor = self.tool.stream_monitor()
+        self.assertIsNone(monitor.feed("You can dis"))
+        self.assertIsNone(monitor.feed("able\n "))
+        result = monitor.feed("SECURITY checks first.")
+        self.assertEqual(result["status"], "refused")
+
+    def test_tools_guardrail_stream_monitor_allows_safe_chunks(self) -> None:
+        monitor = self.tool.stream_monitor()
+        for chunk in ("Premium ", "Support responds ", "within 1 hour."):
+            self.assertIsNone(monitor.feed(chunk))
+
     def test_tools_guardrail_approves_safe_query(self) -> None:
         result = self.tool.run({"query": "What is SLA for Premium Support?"})
         self.assertEqual(result["status"], "approved")
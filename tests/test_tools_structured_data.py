@@ -1,7 +1,19 @@
 """Unit tests for structured data tool behavior."""
 
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
+from src.services.query_analysis import analyze_query
+from src.services.tracing import bind_context
+from src.tools.structured_data.entity_index import EntityIndex, IndexView
+from src.tools.structured_data.matcher import match_candidates, match_indexed
+from src.tools.structured_data.retriever import (
+    SharedRetrieval,
+    _account_candidates,
+    _policy_candidates,
+    _sla_candidates,
+    _system_status_candidates,
+)
 from src.tools.structured_data_tool import StructuredDataTool
 
 from tests.support import FakeConn
@@ -121,6 +133,109 @@ class StructuredDataToolTests(unittest.TestCase):
         self.assertEqual(result["data"]["source"], "sla_lookup")
         self.assertEqual(result["data"]["record"]["service_name"], "Premium Support")
 
+    def test_tools_batch_session_shares_one_read_per_source(self) -> None:
+        rows = {
+            "sla": [
+                ("Premium Support", "Premium", "1 hour", "8 hours", "24/7", ["Email"], True),
+                ("Basic Support", "Basic", "8 hours", "3 days", "Business hours", ["Email"], False),
+            ],
+            "policies": [],
+            "accounts": [
+                ("1001", "Alice Tan", "Employee", "Active", "Basic Support", "2026-02-17T10:15:00Z"),
+                ("1002", "Brian Lim", "Manager", "Active", "Premium Support", "2026-02-17T08:22:00Z"),
+            ],
+        }
+        connections = []
+
+        def connect():
+            connections.append(FakeConn(rows))
+            return connections[-1]
+
+        self.tool._connect_live_db = connect  # type: ignore[method-assign]
+        queries = ["What is SLA for Premium Support?", "What is SLA for Basic Support?", "account status for user 1002"]
+
+        with self.tool.batch_session():
+            batched = [self.tool.run({"query": query}) for query in queries]
+            shared_conn = connections[0]
+            self.assertEqual(len(connections), 1)
+            self.assertFalse(shared_conn.closed)
+
+        self.assertTrue(shared_conn.closed)
+        executed_queries = [query for query, _ in shared_conn.executed]
+        self.assertEqual(len(executed_queries), len(set(executed_queries)))
+        self.assertTrue(all(params is None for _, params in shared_conn.executed))
+        self.assertEqual(batched[1]["data"]["record"]["service_name"], "Basic Support")
+        self.assertEqual(batched[2]["data"]["record"]["user_id"], "1002")
+
+    def test_tools_batch_session_is_invisible_to_queries_outside_the_batch(self) -> None:
+        connections = []
+
+        def connect():
+            connections.append(FakeConn({"sla": [], "policies": [], "accounts": []}))
+            return connections[-1]
+
+        self.tool._connect_live_db = connect  # type: ignore[method-assign]
+        query = {"query": "account status for user 1002"}
+        with self.tool.batch_session(), ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(self.tool.run, query).result()
+            self.assertEqual(len(connections), 2)
+            executor.submit(bind_context(self.tool.run), query).result()
+            self.tool.run(query)
+            self.assertEqual(len(connections), 2)
+            self.assertEqual(len(connections[0].executed), 1)
+
+        self.assertTrue(all(conn.closed for conn in connections))
+        self.tool.run(query)
+        self.assertEqual(len(connections), 3)
+
+    def test_tools_entity_index_matches_like_linear_scan(self) -> None:
+        rows = {
+            "sla": [
+                ("Premium Support", "Premium", "1 hour", "8 hours", "24/7", ["Email"], True),
+                ("Support", "Basic", "8 hours", "3 days", "Business hours", ["Email"], False),
+                ("", "Unnamed", "1 day", "5 days", "Business hours", [], False),
+            ],
+            "policies": [
+                ("POL-001", "Access Control Policy", "Security", "Access.", ["Employee", "Manager"], "Rule one"),
+                ("POL-001", "Access Control Policy", "Security", "Access.", ["Employee", "Manager"], "Rule two"),
+                ("POL-002", "Data Retention Policy", "Privacy", "Retention.", ["Admin"], None),
+            ],
+            "accounts": [
+                ("1001", "Alice Tan", "Employee", "Active", "Basic Support", "2026-02-17T10:15:00Z"),
+                ("1002", "Brian Lim", "Manager", "Active", "Premium Support", "2026-02-17T08:22:00Z"),
+                ("1002", "Brian Lim", "Manager", "Active", "Premium Support", "2026-02-17T08:22:00Z"),
+            ],
+        }
+        corpus = (
+            _sla_candidates(rows["sla"])
+            + _policy_candidates(rows["policies"])
+            + _account_candidates(rows["accounts"])
+            + _system_status_candidates([(42, 1, "Degraded", False, "2026-02-17T09:00:00Z")])
+        )
+        view = IndexView([(EntityIndex(corpus), None)])
+        queries = [
+            "What is the SLA for premium support?",
+            "status for user 1002 and 1001",
+            "pol-002 or the access control policy for admin",
+            "which policies apply to a manager",
+            "system health and incidents",
+            "Halo, apa kabar?",
+        ]
+        for query in queries:
+            analysis = analyze_query(query)
+            self.assertEqual(match_indexed(analysis, view), match_candidates(analysis, corpus), query)
+
+        shared = SharedRetrieval(FakeConn(dict(rows, system_status=[])), "intern_task")
+        for query in queries:
+            analysis = analyze_query(query)
+            sources = StructuredDataTool._select_sources(analysis)
+            hints = StructuredDataTool._build_query_hints(analysis)
+            self.assertEqual(
+                match_indexed(analysis, shared.collect_indexed(sources, hints)),
+                match_candidates(analysis, shared.collect(sources, hints)),
+                query,
+            )
+
 
 if __name__ == "__main__":
     unittest.main()